@@ -0,0 +1,191 @@
+"""
+pyBrNews offline benchmark suite.
+
+Runs the crawlers against the local stand-in server (benchmarks/server.py) and records, per platform, the end-to-end
+throughput (articles/sec), the parse time per extracted field, the memory peak and the database sink throughput.
+Results are written as JSON to benchmarks/results/<version>.json and appended to benchmarks/results/history.jsonl, to
+be compared across versions.
+
+Usage: python benchmarks/run.py [--pages 3] [--sink-documents 2000] [--mongo-host localhost]
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pymongo  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from pyBrNews.comments import folha_sp as folha_comments, g1 as g1_comments  # noqa: E402
+from pyBrNews.config.database import PyBrNewsDB  # noqa: E402
+from pyBrNews.metrics import METRICS  # noqa: E402
+from pyBrNews.news.exame import ExameNews  # noqa: E402
+from pyBrNews.news.folha_sp import FolhaNews  # noqa: E402
+from pyBrNews.news.g1 import G1News  # noqa: E402
+
+from server import FixtureServer, mount  # noqa: E402
+
+RESULTS = Path(__file__).resolve().parent / "results"
+
+
+def _version() -> str:
+    setup = (ROOT / "setup.py").read_text(encoding="utf-8")
+    version = setup.split("version='")[1].split("'")[0]
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return version
+
+    return f"{version}+{commit}"
+
+
+def _measure(function: Callable[[], int], memory: bool = False) -> dict:
+    if memory:
+        tracemalloc.start()
+
+    METRICS.reset()
+    start = time.perf_counter()
+    total = function()
+    elapsed = time.perf_counter() - start
+
+    result = {"items": total, "seconds": round(elapsed, 4), "items_per_second": round(total / elapsed, 2)}
+    if memory:
+        result["memory_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    else:
+        result["parse_time"] = {
+            field: {"count": histogram.count, "mean_ms": round(1000 * histogram.sum / histogram.count, 4)}
+            for field, histogram in METRICS.parse_time.items() if histogram.count
+        }
+
+    return result
+
+
+def _news_benchmark(crawler, address: str, pages: int, discover: Callable) -> Callable[[], int]:
+    def run() -> int:
+        mount(crawler.SESSION, address)
+        items = discover(crawler, pages)
+        return sum(1 for _ in crawler.parse_news(news_urls=items, parse_body=True, save_html=False))
+
+    return run
+
+
+def _comments_benchmark(crawler, news_list: list) -> Callable[[], int]:
+    def run() -> int:
+        return sum(1 for _ in crawler.parse_comments(news_list=news_list))
+
+    return run
+
+
+def _sink_benchmark(documents: int, mongo_host: Optional[str]) -> Optional[dict]:
+    if mongo_host is None:
+        try:
+            import mongomock
+        except ImportError:
+            logger.warning("mongomock is not installed and no --mongo-host was given. Skipping the sink benchmark.")
+            return None
+
+        # Only the benchmark database uses mongomock, the crawlers of the other benchmarks keep the real client.
+        with mock.patch.object(pymongo, "MongoClient", mongomock.MongoClient):
+            database = PyBrNewsDB()
+    else:
+        database = PyBrNewsDB()
+        database.set_connection(host=mongo_host)
+        database.collection = database.db.get_collection("benchmark_news")
+        database.collection.drop()
+
+    template = json.loads((Path(__file__).resolve().parent / "fixtures" / "exame_search.json").read_text())[0]
+
+    def run() -> int:
+        for i in range(documents):
+            database.insert_data(parsed_data=dict(template, url=f"{template['link']}{i}", date=i))
+        return documents
+
+    result = _measure(run)
+    result.pop("parse_time", None)
+    result["backend"] = "mongomock" if mongo_host is None else f"mongodb://{mongo_host}"
+    result["write_latency"] = METRICS.db_write_latency.to_dict()
+
+    return result
+
+
+def main(args: Optional[list] = None) -> dict:
+    parser = argparse.ArgumentParser(description="pyBrNews offline benchmark suite.")
+    parser.add_argument("--pages", type=int, default=3, help="Search / listing pages served per platform.")
+    parser.add_argument("--sink-documents", type=int, default=2000, help="Documents inserted in the sink benchmark.")
+    parser.add_argument("--mongo-host", default=None, help="Local MongoDB host. If not set, uses mongomock.")
+    options = parser.parse_args(args)
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    METRICS.set_item_logging(False)
+
+    results = {
+        "version": _version(), "date": datetime.now().isoformat(), "python": platform.python_version(),
+        "platform": platform.platform(), "benchmarks": {},
+    }
+
+    with FixtureServer(pages=options.pages) as server:
+        mount(g1_comments.SESSION, server.address)
+        mount(folha_comments.SESSION, server.address)
+
+        cases = {
+            "g1_search": (G1News, lambda c, p: c.search_news(keywords=["saneamento"], max_pages=p)),
+            "g1_latest": (G1News, lambda c, p: c.retrieve_latest_news(regions=["sp"], max_pages=p)),
+            "folha_search": (FolhaNews, lambda c, p: c.search_news(keywords=["saneamento"], max_pages=p)),
+            "exame_search": (ExameNews, lambda c, p: c.search_news(keywords=["saneamento"], max_pages=p)),
+        }
+        for name, (crawler_class, discover) in cases.items():
+            timing = _measure(_news_benchmark(crawler_class(use_database=False), server.address, options.pages,
+                                              discover))
+            memory = _measure(_news_benchmark(crawler_class(use_database=False), server.address, options.pages,
+                                              discover), memory=True)
+            timing["memory_peak_bytes"] = memory["memory_peak_bytes"]
+            results["benchmarks"][name] = timing
+
+        g1_news = [{"title": "G1", "region": "SP", "url": f"https://g1.globo.com/sp/noticia/{i}.ghtml"}
+                   for i in range(5)]
+        folha_crawler = FolhaNews(use_database=False)
+        mount(folha_crawler.SESSION, server.address)
+        folha_news = list(folha_crawler.parse_news(
+            news_urls=[f"https://www1.folha.uol.com.br/cotidiano/2022/10/{i}.shtml" for i in range(5)],
+            save_html=False,
+        ))
+        results["benchmarks"]["g1_comments"] = _measure(_comments_benchmark(g1_comments.G1Comments(), g1_news))
+        results["benchmarks"]["folha_comments"] = _measure(
+            _comments_benchmark(folha_comments.FolhaComments(), folha_news)
+        )
+
+    sink = _sink_benchmark(documents=options.sink_documents, mongo_host=options.mongo_host)
+    if sink is not None:
+        results["benchmarks"]["db_sink"] = sink
+
+    results["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    RESULTS.mkdir(exist_ok=True)
+    with open(RESULTS / f"{results['version']}.json", mode="w", encoding="utf-8") as result_file:
+        json.dump(results, result_file, ensure_ascii=False, indent=4)
+    with open(RESULTS / "history.jsonl", mode="a", encoding="utf-8") as history_file:
+        history_file.write(json.dumps(results, ensure_ascii=False) + "\n")
+
+    for name, result in results["benchmarks"].items():
+        print(f"{name:>16}: {result['items']:>6} items in {result['seconds']:>8}s "
+              f"({result['items_per_second']} items/s)")
+
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Local stand-in for the news platforms, serving the recorded fixtures of benchmarks/fixtures over HTTP.
+
+The crawlers keep their real URLs: LocalAdapter, mounted on a crawler session, sends every request to the local
+server with the original host in the X-Original-Host header and restores the original URL in the response.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    pages = 3
+    comment_pages = 3
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, body: str, content_type: str = "text/html; charset=utf-8", status: int = 200) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str) -> None:
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        host = self.headers.get("X-Original-Host", "")
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        route = self.route(host=host, path=url.path, query=query)
+        if route is None:
+            self._send("<html><body>Not found</body></html>", status=404)
+        elif isinstance(route, tuple) and route[0] == "redirect":
+            self._redirect(route[1])
+        else:
+            self._send(*route)
+
+    def route(self, host: str, path: str, query: dict) -> Optional[tuple]:
+        if host == "falkor-cda.bastian.globo.com":
+            page = int(path.rstrip("/").split("/")[-1])
+            if page > self.pages:
+                return None
+            body = _fixture("g1_falkor_page.json").replace("{page}", str(page)).replace("{next}", str(page + 1))
+            return body, "application/json"
+
+        if host == "g1.globo.com" and path.startswith("/busca"):
+            page = int(query.get("page", "1"))
+            if page > self.pages:
+                return "redirect", f"https://g1.globo.com/busca/?q={query.get('q', '')}"
+            return _fixture("g1_search.html").replace("{page}", str(page)),
+
+        if host == "g1.globo.com":
+            return _fixture("g1_article.html"),
+
+        if host == "search.folha.uol.com.br":
+            start = int(query.get("sr", "1"))
+            page = (start - 1) // 25 + 1
+            pagination = ""
+            if page < self.pages:
+                pagination = (f'<li class="c-pagination__arrow"><a href="https://search.folha.uol.com.br/'
+                              f'?q={query.get("q", "")}&amp;site=todos&amp;sr={start + 25}">Próxima</a></li>')
+            body = _fixture("folha_search.html").replace("{page}", str(page)).replace("{pagination}", pagination)
+            return body,
+
+        if host == "www1.folha.uol.com.br":
+            return _fixture("folha_article.html"),
+
+        if host == "content-api.exame.com":
+            page = int(query.get("page", "1"))
+            if page > self.pages:
+                return '{"code": "rest_post_invalid_page_number"}', "application/json", 400
+            return _fixture("exame_search.json").replace("{page}", str(page)), "application/json"
+
+        if host == "exame.com":
+            return _fixture("exame_article.html"),
+
+        if host == "g1.comentarios.globo.com":
+            return _fixture("g1_comments_count.json"), "application/json"
+
+        if host == "ge.comentarios.globo.com":
+            variables = json.loads(query.get("variables", "{}"))
+            page = int(variables.get("after", "0")) + 1
+            body = (_fixture("g1_comments.json").replace("{page}", str(page)).replace("{cursor}", str(page))
+                    .replace('"{has_next}"', "true" if page < self.comment_pages else "false"))
+            return body, "application/json"
+
+        if host == "comentarios1.folha.uol.com.br" and path.endswith(".jsonp"):
+            return _fixture("folha_comments_api.jsonp"), "application/javascript"
+
+        if host == "comentarios1.folha.uol.com.br":
+            page = (int(query.get("sr", "1")) - 1) // 50 + 1
+            if page > self.comment_pages:
+                return '<html><body><ul class="c-list-comments"></ul></body></html>',
+            return _fixture("folha_comments.html").replace("{page}", str(page)),
+
+        return None
+
+
+class FixtureServer:
+    """
+    Runs the FixtureHandler on a free local port, in a background thread.
+    """
+    def __init__(self, pages: int = 3, comment_pages: int = 3) -> None:
+        handler = type("Handler", (FixtureHandler,), {"pages": pages, "comment_pages": comment_pages})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.address = f"127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class LocalAdapter(HTTPAdapter):
+    """
+    Transport adapter sending the requests of a session to the FixtureServer, keeping the original URLs visible to
+    the crawlers.
+    """
+    def __init__(self, address: str, **kwargs) -> None:
+        self.address = address
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        original_url = request.url
+        parts = urlsplit(original_url)
+        request.url = urlunsplit(("http", self.address, parts.path, parts.query, ""))
+        request.headers["X-Original-Host"] = parts.netloc
+        response = super().send(request, **kwargs)
+        response.url = original_url
+        request.url = original_url
+
+        return response
+
+
+def mount(session, address: str) -> None:
+    """
+    Mounts the LocalAdapter on a crawler session for both HTTP and HTTPS URLs.
+    """
+    adapter = LocalAdapter(address=address)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
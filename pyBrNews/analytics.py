@@ -0,0 +1,211 @@
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
+
+from .dates import UTC, parse_date
+from .records import CommentRecord, as_dict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+_NO_DATE = -(2 ** 63)  # NaT as datetime64[s]
+_NO_UPVOTE = -1
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("The comment analytics need NumPy. Install it with: pip install pyBrNews[analytics]")
+
+
+class CommentBatch:
+    """
+    pyBrNews Comment Batch Class, a columnar (NumPy) batch of comments for vectorized analytics: per article, per
+    author and per time bucket aggregations, without Python loops over the comments.
+
+    Columns: article and author as int32 categorical codes (labels in article_urls / authors), upvote as int32 (-1
+    when unknown), date as datetime64[s] (NaT when unknown) and length (characters of the comment) as int32.
+
+    Requires NumPy (and pyarrow for to_arrow), available with the "analytics" extra: pip install pyBrNews[analytics].
+
+    Example:
+        batch = CommentBatch.from_comments(G1Comments().parse_comments(news_list))
+        batch.per_article()
+    """
+    def __init__(self,
+                 article: "np.ndarray",
+                 author: "np.ndarray",
+                 upvote: "np.ndarray",
+                 date: "np.ndarray",
+                 length: "np.ndarray",
+                 article_urls: List[str],
+                 authors: List[Optional[str]]) -> None:
+        _require_numpy()
+
+        self.article = article
+        self.author = author
+        self.upvote = upvote
+        self.date = date
+        self.length = length
+        self.article_urls = article_urls
+        self.authors = authors
+
+    def __len__(self) -> int:
+        return len(self.article)
+
+    @classmethod
+    def from_comments(cls, comments: Iterable[Union[dict, CommentRecord]]) -> "CommentBatch":
+        """
+        Builds a batch from a comment stream, e.g. parse_comments or PyBrNewsDB.find_comments. The comments are
+        encoded into compact typed arrays as they are read, so the stream is never held as Python objects.
+
+        Parameters:
+            comments (Iterable[Union[dict, CommentRecord]]): The parsed comments of any platform.
+        Returns:
+            CommentBatch: The columnar batch of the comments.
+        """
+        _require_numpy()
+
+        article, author, upvote, date, length = array("i"), array("i"), array("i"), array("q"), array("i")
+        article_codes: Dict[str, int] = {}
+        author_codes: Dict[Optional[str], int] = {}
+
+        for comment in comments:
+            if isinstance(comment, CommentRecord):
+                news_url, comment_author, comment_upvote = comment.news_data.url, comment.author, comment.upvote
+                comment_date, comment_text = comment.date, comment.comment
+            else:
+                comment = as_dict(comment)
+                news_url = (comment.get("news_data") or {}).get("url")
+                comment_author, comment_upvote = comment.get("author"), comment.get("upvote")
+                comment_date, comment_text = comment.get("date"), comment.get("comment")
+
+            article.append(article_codes.setdefault(news_url, len(article_codes)))
+            author.append(author_codes.setdefault(comment_author, len(author_codes)))
+            upvote.append(comment_upvote if comment_upvote is not None else _NO_UPVOTE)
+            if isinstance(comment_date, str):
+                comment_date = parse_date(comment_date)
+            if isinstance(comment_date, datetime) and comment_date.tzinfo is None:
+                # Naive dates are UTC (e.g. the ones returned by pymongo), not the local time of the machine.
+                comment_date = comment_date.replace(tzinfo=UTC)
+            date.append(int(comment_date.timestamp()) if isinstance(comment_date, datetime) else _NO_DATE)
+            length.append(len(comment_text) if comment_text else 0)
+
+        return cls(
+            article=np.frombuffer(article, dtype=np.int32), author=np.frombuffer(author, dtype=np.int32),
+            upvote=np.frombuffer(upvote, dtype=np.int32), date=np.frombuffer(date, dtype="datetime64[s]"),
+            length=np.frombuffer(length, dtype=np.int32),
+            article_urls=list(article_codes.keys()), authors=list(author_codes.keys()),
+        )
+
+    def _group(self, codes: "np.ndarray", groups: int) -> Dict[str, "np.ndarray"]:
+        known_upvote = self.upvote != _NO_UPVOTE
+        counts = np.bincount(codes, minlength=groups)
+        rated = np.bincount(codes, weights=known_upvote, minlength=groups)
+        upvotes = np.bincount(codes, weights=np.where(known_upvote, self.upvote, 0), minlength=groups)
+
+        max_upvote = np.full(groups, _NO_UPVOTE, dtype=np.int32)
+        np.maximum.at(max_upvote, codes, self.upvote)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return {
+                "comments": counts,
+                "upvotes": upvotes.astype(np.int64),
+                "mean_upvote": np.where(rated > 0, upvotes / rated, np.nan),
+                "max_upvote": max_upvote,
+                "mean_length": np.bincount(codes, weights=self.length, minlength=groups) / counts,
+            }
+
+    def per_article(self) -> Dict[str, "np.ndarray"]:
+        """
+        Aggregates the comments per article: number of comments and distinct authors, total, mean and maximum
+        upvotes and mean comment length.
+
+        Returns:
+            Dict[str, np.ndarray]: One array per aggregate, aligned with the "url" array.
+        """
+        groups = len(self.article_urls)
+        aggregates = self._group(codes=self.article, groups=groups)
+
+        pairs = np.unique(self.article.astype(np.int64) * max(len(self.authors), 1) + self.author)
+        aggregates["authors"] = np.bincount(pairs // max(len(self.authors), 1), minlength=groups)
+        aggregates["url"] = np.array(self.article_urls, dtype=object)
+
+        return aggregates
+
+    def per_author(self, top: Optional[int] = None) -> Dict[str, "np.ndarray"]:
+        """
+        Aggregates the comments per author: number of comments and articles, total, mean and maximum upvotes and
+        mean comment length. Sorted by the number of comments, most active first.
+
+        Parameters:
+            top (Optional[int]): Number of authors to be returned. If not set, all of them.
+        Returns:
+            Dict[str, np.ndarray]: One array per aggregate, aligned with the "author" array.
+        """
+        groups = len(self.authors)
+        aggregates = self._group(codes=self.author, groups=groups)
+
+        pairs = np.unique(self.author.astype(np.int64) * max(len(self.article_urls), 1) + self.article)
+        aggregates["articles"] = np.bincount(pairs // max(len(self.article_urls), 1), minlength=groups)
+        aggregates["author"] = np.array(self.authors, dtype=object)
+
+        order = np.argsort(-aggregates["comments"], kind="stable")[:top]
+        return {name: values[order] for name, values in aggregates.items()}
+
+    def per_time_bucket(self, bucket: str = "h") -> Dict[str, "np.ndarray"]:
+        """
+        Aggregates the dated comments per time bucket, in chronological order.
+
+        Parameters:
+            bucket (str): NumPy datetime unit of the buckets, e.g. "m" (minute), "h" (hour), "D" (day) or "W" (week).
+        Returns:
+            Dict[str, np.ndarray]: One array per aggregate, aligned with the "bucket" (datetime64) array.
+        """
+        dated = ~np.isnat(self.date)
+        buckets, codes = np.unique(self.date[dated].astype(f"datetime64[{bucket}]"), return_inverse=True)
+
+        subset = CommentBatch(
+            article=self.article[dated], author=self.author[dated], upvote=self.upvote[dated], date=self.date[dated],
+            length=self.length[dated], article_urls=self.article_urls, authors=self.authors,
+        )
+        aggregates = subset._group(codes=codes.reshape(-1), groups=len(buckets))
+        aggregates["bucket"] = buckets
+
+        return aggregates
+
+    def upvote_histogram(self, bins: Union[int, List[int]] = 10) -> Dict[str, "np.ndarray"]:
+        """
+        Builds the distribution of the known upvotes.
+
+        Parameters:
+            bins (Union[int, List[int]]): Number of bins or the bin edges, as in numpy.histogram.
+        Returns:
+            Dict[str, np.ndarray]: The "counts" per bin and the bin "edges".
+        """
+        counts, edges = np.histogram(self.upvote[self.upvote != _NO_UPVOTE], bins=bins)
+        return {"counts": counts, "edges": edges}
+
+    def to_arrow(self) -> "pa.Table":
+        """
+        Converts the batch into an Arrow table, with the article and author columns dictionary-encoded.
+
+        Returns:
+            pa.Table: The comments table.
+        """
+        if pa is None:
+            raise ImportError("The Arrow conversion needs pyarrow. Install it with: pip install pyBrNews[analytics]")
+
+        return pa.table({
+            "article": pa.DictionaryArray.from_arrays(self.article, pa.array(self.article_urls, type=pa.string())),
+            "author": pa.DictionaryArray.from_arrays(self.author, pa.array(self.authors, type=pa.string())),
+            "upvote": pa.array(self.upvote, mask=self.upvote == _NO_UPVOTE),
+            "date": pa.array(self.date, type=pa.timestamp("s", tz="UTC")),
+            "length": pa.array(self.length),
+        })
@@ -0,0 +1,347 @@
+import difflib
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+from loguru import logger
+
+from .config.database import PyBrNewsDB, PyBrNewsFS
+from .metrics import METRICS
+from .records import as_dict
+from .text import tokenize
+
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def text_hash(text: Optional[str]) -> Optional[str]:
+    """
+    Hashes the normalized words (accent folded, lowercase) of a text, so changes of whitespace, punctuation or case
+    do not count as edits.
+
+    Parameters:
+        text (Optional[str]): The text to be hashed, e.g. the title or the body of an article.
+    Returns:
+        Optional[str]: The hex digest of the text. None if the text is not set.
+    """
+    if text is None:
+        return None
+
+    return hashlib.blake2b(" ".join(tokenize(text)).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def split_sentences(body: Optional[str]) -> List[str]:
+    """
+    Splits an article body (normalized by clean_text) into the sentences diffed between versions. Joining them with
+    a space gives the body back.
+
+    Parameters:
+        body (Optional[str]): The body text of the article.
+    Returns:
+        List[str]: The sentences of the body, in order.
+    """
+    return _SENTENCE_PATTERN.split(body) if body else []
+
+
+def make_delta(old: List[str], new: List[str]) -> List[list]:
+    """
+    Builds a compact delta between two sentence lists: only the changed ranges, as [old position, new position, old
+    sentences, new sentences], which is enough to go from one version to the other in both directions.
+
+    Parameters:
+        old (List[str]): The sentences of the previous version.
+        new (List[str]): The sentences of the new version.
+    Returns:
+        List[list]: The changed ranges, in order.
+    """
+    matcher = difflib.SequenceMatcher(a=old, b=new, autojunk=False)
+    return [
+        [i1, j1, old[i1:i2], new[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"
+    ]
+
+
+def revert_delta(new: List[str], delta: List[list]) -> List[str]:
+    """
+    Applies a delta built by make_delta backwards, rebuilding the previous version from the new one.
+
+    Parameters:
+        new (List[str]): The sentences of the new version.
+        delta (List[list]): The delta between the previous and the new version.
+    Returns:
+        List[str]: The sentences of the previous version.
+    """
+    old, position = [], 0
+    for _, new_position, old_sentences, new_sentences in delta:
+        old.extend(new[position:new_position])
+        old.extend(old_sentences)
+        position = new_position + len(new_sentences)
+    old.extend(new[position:])
+
+    return old
+
+
+def _compress(text: Optional[str]) -> Optional[bytes]:
+    return zlib.compress(text.encode("utf-8")) if text is not None else None
+
+
+def _decompress(data: Optional[bytes]) -> Optional[str]:
+    return zlib.decompress(data).decode("utf-8") if data is not None else None
+
+
+class _MongoVersionStore:
+    def __init__(self, database: PyBrNewsDB) -> None:
+        self.states = database.db.get_collection(f"{database.collection.name}_versions")
+        self.changes = database.db.get_collection(f"{database.collection.name}_changes")
+
+    def get(self, url: str) -> Optional[dict]:
+        return self.states.find_one({"_id": url})
+
+    def put(self, url: str, state: dict) -> None:
+        self.states.replace_one({"_id": url}, dict(state, _id=url), upsert=True)
+
+    def add_change(self, change: dict) -> None:
+        self.changes.insert_one(dict(change, _id=f"{change['url']}#{change['version']}"))
+
+    def history(self, url: str) -> List[dict]:
+        return list(self.changes.find({"url": url}, projection={"_id": 0}).sort("version", 1))
+
+
+class _SQLiteVersionStore:
+    _STATE_FIELDS = ("title_hash", "body_hash", "etag", "last_modified", "version", "title", "body")
+
+    def __init__(self, path: str) -> None:
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS versions (url TEXT PRIMARY KEY, title_hash TEXT, body_hash TEXT, etag TEXT, "
+            "last_modified TEXT, version INTEGER, title TEXT, body BLOB)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS changes (url TEXT, version INTEGER, entry_dt TEXT, title TEXT, delta TEXT, "
+            "PRIMARY KEY (url, version))"
+        )
+
+    def get(self, url: str) -> Optional[dict]:
+        row = self.connection.execute(
+            f"SELECT {', '.join(self._STATE_FIELDS)} FROM versions WHERE url = ?", (url,)
+        ).fetchone()
+        return dict(zip(self._STATE_FIELDS, row)) if row is not None else None
+
+    def put(self, url: str, state: dict) -> None:
+        self.connection.execute(
+            f"INSERT OR REPLACE INTO versions VALUES (?, {', '.join('?' for _ in self._STATE_FIELDS)})",
+            (url, *(state[field] for field in self._STATE_FIELDS)),
+        )
+
+    def add_change(self, change: dict) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO changes VALUES (?, ?, ?, ?, ?)",
+            (change["url"], change["version"], change["entry_dt"].isoformat(),
+             json.dumps(change["title"], ensure_ascii=False), json.dumps(change["delta"], ensure_ascii=False)),
+        )
+
+    def history(self, url: str) -> List[dict]:
+        rows = self.connection.execute(
+            "SELECT version, entry_dt, title, delta FROM changes WHERE url = ? ORDER BY version", (url,)
+        )
+        return [
+            {"url": url, "version": version, "entry_dt": datetime.fromisoformat(entry_dt),
+             "title": json.loads(title), "delta": json.loads(delta)}
+            for version, entry_dt, title, delta in rows
+        ]
+
+
+class ChangeTracker:
+    """
+    pyBrNews Change Tracker Class. Detects the edits of re-crawled articles, which check_duplicates (same URL and
+    date) would drop and a plain re-crawl would store again in full.
+
+    Per URL, the tracker keeps the hashes of the normalized title and body, the latest title and (compressed) body,
+    and the ETag / Last-Modified validators of the article page. Re-crawls send them as a conditional GET
+    (If-None-Match / If-Modified-Since), so unchanged pages answer 304 with no body. Downloaded pages are compared by
+    hash, and only real changes are written: a new version holding the changed title and a sentence-level delta of
+    the body. The article itself is only stored by the crawler the first time it is seen, and its state is only saved
+    once that store succeeds (confirm, called by the backend), so a failed store is retried on the next crawl.
+
+    The versions are persisted in the backend ("<collection>_versions" and "<collection>_changes" collections for
+    PyBrNewsDB, a pyBrNews_versions.sqlite3 file in the save path for PyBrNewsFS), or kept in memory without one.
+
+    Example:
+        crawler.track_changes()
+        for news in crawler.parse_news(news_urls, parse_body=True): ...
+        crawler.CHANGES.history(news_url)
+    """
+    def __init__(self, backend: Union[PyBrNewsDB, PyBrNewsFS, None] = None) -> None:
+        self._lock = threading.Lock()
+        self._store: Union[_MongoVersionStore, _SQLiteVersionStore]
+        if isinstance(backend, PyBrNewsDB):
+            self._store = _MongoVersionStore(database=backend)
+        elif isinstance(backend, PyBrNewsFS):
+            self._store = _SQLiteVersionStore(path=f"{backend.save_path}pyBrNews_versions.sqlite3")
+        else:
+            self._store = _SQLiteVersionStore(path=":memory:")
+
+        self._validators: Dict[str, Dict[str, Optional[str]]] = {}
+        self._pending: Dict[str, dict] = {}
+        if backend is not None:
+            backend.add_stored_listener(self.confirm)
+        self.stats = {"new": 0, "unchanged": 0, "changed": 0, "not_modified": 0}
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """
+        Builds the conditional GET headers of an article from the validators of its last download.
+
+        Parameters:
+            url (str): The URL of the news article.
+        Returns:
+            Dict[str, str]: The If-None-Match / If-Modified-Since headers. Empty if the article was never tracked.
+        """
+        with self._lock:
+            state = self._store.get(url)
+        if state is None:
+            return {}
+
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        return headers
+
+    def observe_response(self, url: str, response) -> bool:
+        """
+        Keeps the validators of a downloaded article page until its parsed data is tracked.
+
+        Parameters:
+            url (str): The URL of the news article.
+            response (requests.Response): The response of the conditional GET.
+        Returns:
+            bool: True if the page was not modified (304). False if not.
+        """
+        if response.status_code == 304:
+            with self._lock:
+                self.stats["not_modified"] += 1
+            if METRICS.log_items:
+                logger.info(f"Article not modified since the last crawl: {url}.")
+            return True
+
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        if any(validators.values()):
+            with self._lock:
+                self._validators[url] = validators
+
+        return False
+
+    def track(self, parsed_data: dict) -> str:
+        """
+        Compares an article with its last tracked version, writing a new version when the title or the body changed.
+        The body is only compared when both versions have it (e.g. not in head-only crawls).
+
+        Parameters:
+            parsed_data (dict): Dictionary containing the parsed data from a news article.
+        Returns:
+            str: "new" for articles seen for the first time, "changed" or "unchanged".
+        """
+        parsed_data = as_dict(parsed_data)
+        url, title, body = parsed_data["url"], parsed_data.get("title"), parsed_data.get("body")
+        title_hash, body_hash = text_hash(title), text_hash(body)
+
+        with self._lock:
+            validators = self._validators.pop(url, {"etag": None, "last_modified": None})
+            state = self._store.get(url)
+            if state is None:
+                # Only saved by confirm, once the article is stored: a failed store leaves the URL untracked.
+                self._pending[url] = dict(
+                    validators, title_hash=title_hash, body_hash=body_hash, version=1, title=title,
+                    body=_compress(body),
+                )
+                self.stats["new"] += 1
+                return "new"
+
+            title_changed = title_hash is not None and title_hash != state["title_hash"]
+            body_changed = body_hash is not None and state["body_hash"] is not None and body_hash != state["body_hash"]
+            if not title_changed and not body_changed:
+                if any(validators.values()) or (body_hash is not None and state["body_hash"] is None):
+                    # Same content: only refreshes the validators, or keeps the first body seen of the article.
+                    state.update({field: value for field, value in validators.items() if value is not None})
+                    if state["body_hash"] is None and body_hash is not None:
+                        state.update(body_hash=body_hash, body=_compress(body))
+                    self._store.put(url=url, state=state)
+                self.stats["unchanged"] += 1
+                return "unchanged"
+
+            version = state["version"] + 1
+            self._store.add_change({
+                "url": url, "version": version, "entry_dt": datetime.now(),
+                "title": [state["title"], title] if title_changed else None,
+                "delta": make_delta(split_sentences(_decompress(state["body"])), split_sentences(body))
+                if body_changed else [],
+            })
+            state.update(validators, version=version)
+            if title_changed:
+                state.update(title_hash=title_hash, title=title)
+            if body_changed:
+                state.update(body_hash=body_hash, body=_compress(body))
+            self._store.put(url=url, state=state)
+            self.stats["changed"] += 1
+
+        if METRICS.log_items:
+            logger.info(f"Article changed since the last crawl, version {version} written: {url}.")
+        return "changed"
+
+    def confirm(self, parsed_data: dict) -> None:
+        """
+        Saves the state of a new article once it has been stored. Called by the backend of the tracker after each
+        successful write; custom sinks call it themselves.
+
+        Parameters:
+            parsed_data (dict): Dictionary containing the parsed data of the stored news article.
+        """
+        url = as_dict(parsed_data).get("url")
+        with self._lock:
+            state = self._pending.pop(url, None)
+            if state is not None:
+                self._store.put(url=url, state=state)
+
+    def history(self, url: str) -> List[dict]:
+        """
+        Lists the changes of an article, oldest first. Version 1 (the first crawl) has no change record.
+
+        Parameters:
+            url (str): The URL of the news article.
+        Returns:
+            List[dict]: Per version -> url, version, entry_dt, title ([old, new] or None) and the body delta.
+        """
+        with self._lock:
+            return self._store.history(url)
+
+    def version_text(self, url: str, version: Optional[int] = None) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Rebuilds the title and body of a tracked version of an article, reverting the deltas from the latest one.
+
+        Parameters:
+            url (str): The URL of the news article.
+            version (Optional[int]): The version number. If not set, the latest version.
+        Returns:
+            Optional[Dict[str, Optional[str]]]: The "title" and "body" of the version. None if not tracked.
+        """
+        with self._lock:
+            state = self._store.get(url)
+            changes = self._store.history(url) if state is not None else []
+        if state is None or (version is not None and not 1 <= version <= state["version"]):
+            return None
+
+        title, sentences = state["title"], split_sentences(_decompress(state["body"]))
+        for change in reversed(changes):
+            if version is None or change["version"] <= version:
+                break
+            if change["title"] is not None:
+                title = change["title"][0]
+            sentences = revert_delta(new=sentences, delta=change["delta"])
+
+        return {"title": title, "body": " ".join(sentences) if sentences else None}
@@ -2,9 +2,15 @@ import csv
 import json
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Optional
+
+from ..profiling import CrawlProfiler
 
 
 class Crawler(ABC):
+    def __init__(self, profile: Optional[bool] = None) -> None:
+        self.PROFILER = CrawlProfiler(enabled=profile)
+
     @abstractmethod
     def parse_comments(self, news_urls: list):
         pass
@@ -2,7 +2,7 @@ import json.decoder
 import time
 from datetime import datetime
 from itertools import count
-from typing import List, Iterable, Optional
+from typing import List, Iterable, Optional, Union
 
 import requests.exceptions
 import urllib3.exceptions
@@ -10,12 +10,18 @@ from loguru import logger
 from requests_html import HTMLSession, Element, HTML
 
 from .crawler import Crawler
+from ..dates import parse_local_date
+from ..metrics import METRICS
+from ..records import ArticleRef, CommentRecord
 
 SESSION = HTMLSession()
+METRICS.instrument_session(SESSION)
 
 
 class FolhaComments(Crawler):
-    def __init__(self) -> None:
+    def __init__(self, profile: Optional[bool] = None) -> None:
+        super().__init__(profile=profile)
+
         self._XPATH = {
             'comment_items': '//li[@class="c-list-comments__item"]',
             'comment_author': '//strong[@class="c-list-comments__user"]/text()',
@@ -45,6 +51,7 @@ class FolhaComments(Crawler):
                     return html_data
 
             except self._ERRORS:
+                METRICS.observe_retry(url=target_url)
                 logger.warning(
                     f"Folha de São Paulo servers are trying to break the capture. Waiting 5 seconds before retrying."
                 )
@@ -56,7 +63,8 @@ class FolhaComments(Crawler):
     @staticmethod
     def _gen_pagination() -> Iterable[int]:
         for page_index in count():
-            logger.info(f"Getting comments from Page {page_index+1}.")
+            if METRICS.log_items:
+                logger.info(f"Getting comments from Page {page_index+1}.")
             page_number = 1 + (page_index * 50)
             yield page_number
 
@@ -93,24 +101,30 @@ class FolhaComments(Crawler):
             return None
 
     def _get_comment_data(self, news_id: int) -> Iterable[Element]:
-        logger.warning(f"Starting data extraction for comments from Article ID {news_id}.")
+        if METRICS.log_items:
+            logger.warning(f"Starting data extraction for comments from Article ID {news_id}.")
         total_comments = 0
         for page in self._gen_pagination():
             target_url = str(self._COMMENTS_API).format(news_id, page)
 
-            response = self._make_request(target_url=target_url)
+            with self.PROFILER.phase("fetch"):
+                response = self._make_request(target_url=target_url)
             if not response.xpath(self._XPATH["comment_items"]):
                 break
 
             comments = response.xpath(self._XPATH["comment_items"])
             total_comments += len(comments)
-            logger.info(f"Current number of comments acquired from ID {news_id}: {total_comments}.")
+            if METRICS.log_items:
+                logger.info(f"Current number of comments acquired from ID {news_id}: {total_comments}.")
             yield from comments
 
-        logger.success(
-            f"A total of {total_comments} comments have been extracted from ID {news_id}! Finished at {datetime.now()}."
-        )
+        if METRICS.log_items:
+            logger.success(
+                f"A total of {total_comments} comments have been extracted from ID {news_id}! "
+                f"Finished at {datetime.now()}."
+            )
 
+    @METRICS.timed_field("comment_author")
     def _extract_author(self, comment_node: Element) -> Optional[str]:
         author = comment_node.xpath(self._XPATH['comment_author'], first=True)
         if author is not None:
@@ -118,14 +132,16 @@ class FolhaComments(Crawler):
 
         return None
 
+    @METRICS.timed_field("comment_date")
     def _extract_date(self, comment_node: Element) -> Optional[datetime]:
         raw_date = comment_node.xpath(self._XPATH['comment_date'], first=True)
         if raw_date is not None:
-            published_date = datetime.strptime(raw_date, "%Y-%m-%d %H:%M:%S")
+            published_date = parse_local_date(raw_date)
             return published_date
 
         return None
 
+    @METRICS.timed_field("comment_upvote")
     def _extract_upvote(self, comment_node: Element) -> Optional[int]:
         target_data = comment_node.xpath(self._XPATH['comment_upvote'], first=True)
         if target_data is not None:
@@ -134,6 +150,7 @@ class FolhaComments(Crawler):
 
         return None
 
+    @METRICS.timed_field("comment_text")
     def _extract_comment_text(self, comment_node: Element) -> Optional[str]:
         comment_text = comment_node.xpath(self._XPATH['comment_text'], first=True)
         if comment_text is not None:
@@ -141,6 +158,7 @@ class FolhaComments(Crawler):
 
         return None
 
+    @METRICS.timed_field("comment_id")
     def _extract_comment_id(self, comment_node: Element) -> Optional[int]:
         comment_id = comment_node.xpath(self._XPATH['comment_id'], first=True)
         if comment_id is not None:
@@ -148,42 +166,71 @@ class FolhaComments(Crawler):
 
         return None
 
-    def parse_comments(self, news_list: List[dict]) -> Iterable[dict]:
-        for news_data in news_list:
-            logger.info(f"Checking if \"{news_data['title']}\" have comments.")
-            id_data = news_data["id_data"]
-            if id_data is None:
-                logger.warning(f"No comments found. Proceeding to the next one.")
-                continue
-
-            news_id = self._get_api_id(news_id_data=id_data)
-            if news_id is None:
-                logger.warning(f"No comments found. Proceeding to the next one.")
-                continue
-
-            raw_data = [data for data in self._get_comment_data(news_id=news_id)]
-            if len(raw_data) == 0:
-                continue
-
-            for comment in raw_data:
-                if comment is None:
+    def parse_comments(self, news_list: List[dict], compact: bool = False) -> Iterable[Union[dict, CommentRecord]]:
+        self.PROFILER.start()
+        try:
+            for news_data in news_list:
+                if METRICS.log_items:
+                    logger.info(f"Checking if \"{news_data['title']}\" have comments.")
+                id_data = news_data["id_data"]
+                if id_data is None:
+                    if METRICS.log_items:
+                        logger.warning(f"No comments found. Proceeding to the next one.")
+                    continue
+
+                with self.PROFILER.phase("fetch"):
+                    news_id = self._get_api_id(news_id_data=id_data)
+                if news_id is None:
+                    if METRICS.log_items:
+                        logger.warning(f"No comments found. Proceeding to the next one.")
+                    continue
+
+                raw_data = [data for data in self._get_comment_data(news_id=news_id)]
+                if len(raw_data) == 0:
                     continue
 
-                data = {
-                    "author": self._extract_author(comment_node=comment),
-                    "date": self._extract_date(comment_node=comment),
-                    "upvote": self._extract_upvote(comment_node=comment),
-                    "news_data": {
-                        "title": news_data["title"],
-                        "region": news_data["region"],
-                        "news_id": news_data["id_data"]["article_id"],
-                        "api_id": news_id,
-                        "api_url": f"https://comentarios1.folha.uol.com.br/comentarios/{news_id}",
-                        "url": news_data["url"],
-                    },
-                    "comment": self._extract_comment_text(comment_node=comment),
-                    "comment_id": self._extract_comment_id(comment_node=comment),
-                    "platform": news_data["platform"],
-                }
-
-                yield data
+                article = ArticleRef(
+                    title=news_data["title"], region=news_data["region"], url=news_data["url"],
+                    news_id=news_data["id_data"]["article_id"], api_id=news_id,
+                    api_url=f"https://comentarios1.folha.uol.com.br/comentarios/{news_id}",
+                ) if compact else None
+
+                for comment in raw_data:
+                    if comment is None:
+                        continue
+
+                    with self.PROFILER.phase("parse"):
+                        if compact:
+                            data = CommentRecord(
+                                author=self._extract_author(comment_node=comment),
+                                date=self._extract_date(comment_node=comment),
+                                upvote=self._extract_upvote(comment_node=comment),
+                                news_data=article,
+                                comment=self._extract_comment_text(comment_node=comment),
+                                comment_id=self._extract_comment_id(comment_node=comment),
+                                platform=news_data["platform"],
+                            )
+                        else:
+                            data = {
+                                "author": self._extract_author(comment_node=comment),
+                                "date": self._extract_date(comment_node=comment),
+                                "upvote": self._extract_upvote(comment_node=comment),
+                                "news_data": {
+                                    "title": news_data["title"],
+                                    "region": news_data["region"],
+                                    "news_id": news_data["id_data"]["article_id"],
+                                    "api_id": news_id,
+                                    "api_url": f"https://comentarios1.folha.uol.com.br/comentarios/{news_id}",
+                                    "url": news_data["url"],
+                                },
+                                "comment": self._extract_comment_text(comment_node=comment),
+                                "comment_id": self._extract_comment_id(comment_node=comment),
+                                "platform": news_data["platform"],
+                            }
+
+                    # The consumer stores the comment (e.g. insert_data) before resuming the crawl.
+                    with self.PROFILER.phase("store"):
+                        yield data
+        finally:
+            self.PROFILER.stop()
+            self.PROFILER.log_report()
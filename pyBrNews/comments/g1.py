@@ -1,6 +1,6 @@
 import json
-from datetime import datetime
-from typing import List, Optional, Iterable
+from itertools import count
+from typing import List, Optional, Iterable, Union
 
 import requests.exceptions
 from loguru import logger
@@ -8,20 +8,42 @@ from requests_html import HTMLSession, HTML
 
 from .crawler import Crawler
 from ..config import g1_api
+from ..dates import parse_date
+from ..metrics import METRICS
+from ..records import ArticleRef, CommentRecord
 
 SESSION = HTMLSession()
+METRICS.instrument_session(SESSION)
 
 
 class G1Comments(Crawler):
     _COMMENTS_API: str
     _API_CONFIG: dict
 
-    def __init__(self) -> None:
+    def __init__(self,
+                 page_size: Optional[int] = None,
+                 max_pages: Optional[int] = None,
+                 profile: Optional[bool] = None) -> None:
+        """
+        Crawler for the G1 comments, retrieved from the GraphQL comments engine using cursor-based pagination.
+
+        Parameters:
+            page_size (int): Number of comments requested per page. Defaults to the value in g1_api.comments_config.
+            max_pages (int): Maximum number of pages retrieved per article. If not set, follows the cursor until the
+                             last page of the thread.
+            profile (Optional[bool]): Defines if the fetch and parse phases are profiled in each crawl run. If not
+                                      set, uses the environment variable PYBRNEWS_PROFILE.
+        """
+        super().__init__(profile=profile)
+
         self._API_CONFIG = g1_api.comments_config
 
         self._COMMENTS_API = self._API_CONFIG["api_url"]["comments_engine"]
         self._COUNT_API = self._API_CONFIG["api_url"]["count_engine"]
         self._API_PARAMS = self._API_CONFIG["params"]
+        self._VARIABLES = json.loads(self._API_PARAMS["variables"])
+        self._PAGE_SIZE = page_size if page_size is not None else self._API_CONFIG["pagination"]["page_size"]
+        self._MAX_PAGES = max_pages if max_pages is not None else self._API_CONFIG["pagination"]["max_pages"]
         self._ERRORS = (
             requests.exceptions.ReadTimeout, requests.exceptions.InvalidSchema, requests.exceptions.MissingSchema
         )
@@ -41,12 +63,20 @@ class G1Comments(Crawler):
 
         return True
 
-    def _get_comment_data(self, news_url: str) -> Optional[List[dict]]:
-        if self._news_have_comments(target_url=news_url) is False:
-            return None
+    def _build_parameters(self, news_url: str, cursor: Optional[str] = None) -> dict:
+        variables = dict(self._VARIABLES)
+        variables["storyURL"] = news_url
+        variables["first"] = self._PAGE_SIZE
+        if cursor is not None:
+            variables["after"] = cursor
 
         parameters = dict(self._API_PARAMS)
-        parameters["variables"] = str(parameters["variables"].replace("@", news_url))
+        parameters["variables"] = json.dumps(variables, separators=(",", ":"))
+
+        return parameters
+
+    def _get_comment_page(self, news_url: str, cursor: Optional[str] = None) -> Optional[dict]:
+        parameters = self._build_parameters(news_url=news_url, cursor=cursor)
 
         response = SESSION.get(url=self._COMMENTS_API, params=parameters)
         if response.status_code != 200:
@@ -54,40 +84,83 @@ class G1Comments(Crawler):
             return None
 
         try:
-            news_data = response.json()['data']['story']['comments']['edges']
-        except (json.decoder.JSONDecodeError, TypeError):
-            news_data = None
-
-        if news_data is not None:
-            return news_data
-
-        return None
-
-    def parse_comments(self, news_list: List[dict]) -> Iterable[dict]:
-        for news_data in news_list:
-            url = news_data["url"]
-
-            raw_data = self._get_comment_data(news_url=url)
-            if raw_data is None:
-                continue
-
-            for comment_node in raw_data:
-                node_data = comment_node["node"]
-                if len(node_data["body"]) == 0:
-                    continue
-
-                data = {
-                    "author": node_data["author"]["username"],
-                    "date": datetime.strptime(node_data["createdAt"], "%Y-%m-%dT%H:%M:%S.%fZ"),
-                    "upvote": int(node_data["actionCounts"]["reaction"]["total"]),
-                    "news_data": {
-                        "title": news_data["title"],
-                        "region": news_data["region"],
-                        "url": url,
-                    },
-                    "comment": HTML(html=node_data["body"]).full_text,
-                    "g1_id": node_data["id"],
-                    "platform": "G1",
-                }
-
-                yield data
+            comments_data = response.json()['data']['story']['comments']
+        except (json.decoder.JSONDecodeError, TypeError, KeyError):
+            comments_data = None
+
+        return comments_data
+
+    def _get_comment_data(self, news_url: str) -> Iterable[dict]:
+        with self.PROFILER.phase("fetch"):
+            have_comments = self._news_have_comments(target_url=news_url)
+        if have_comments is False:
+            return
+
+        cursor = None
+        total_comments = 0
+        for page_index in count():
+            with self.PROFILER.phase("fetch"):
+                comments_data = self._get_comment_page(news_url=news_url, cursor=cursor)
+            if comments_data is None:
+                break
+
+            edges = comments_data.get('edges') or []
+            total_comments += len(edges)
+            yield from edges
+
+            page_info = comments_data.get('pageInfo') or {}
+            cursor = page_info.get('endCursor')
+            if not page_info.get('hasNextPage') or cursor is None or len(edges) == 0:
+                break
+
+            if page_index + 1 == self._MAX_PAGES:
+                break
+
+        if METRICS.log_items:
+            logger.info(f"A total of {total_comments} comments have been retrieved from {news_url}.")
+
+    def parse_comments(self, news_list: List[dict], compact: bool = False) -> Iterable[Union[dict, CommentRecord]]:
+        self.PROFILER.start()
+        try:
+            for news_data in news_list:
+                url = news_data["url"]
+                article = ArticleRef(title=news_data["title"], region=news_data["region"], url=url) if compact else None
+
+                for comment_node in self._get_comment_data(news_url=url):
+                    node_data = comment_node["node"]
+                    if len(node_data["body"]) == 0:
+                        continue
+
+                    with self.PROFILER.phase("parse"):
+                        if compact:
+                            data = CommentRecord(
+                                author=node_data["author"]["username"],
+                                date=parse_date(node_data["createdAt"]),
+                                upvote=int(node_data["actionCounts"]["reaction"]["total"]),
+                                news_data=article,
+                                comment=HTML(html=node_data["body"]).full_text,
+                                comment_id=node_data["id"],
+                                platform="G1",
+                                id_key="g1_id",
+                            )
+                        else:
+                            data = {
+                                "author": node_data["author"]["username"],
+                                "date": parse_date(node_data["createdAt"]),
+                                "upvote": int(node_data["actionCounts"]["reaction"]["total"]),
+                                "news_data": {
+                                    "title": news_data["title"],
+                                    "region": news_data["region"],
+                                    "url": url,
+                                },
+                                "comment": HTML(html=node_data["body"]).full_text,
+                                "g1_id": node_data["id"],
+                                "platform": "G1",
+                            }
+
+                    # The consumer stores the comment (e.g. insert_data) before resuming the crawl.
+                    with self.PROFILER.phase("store"):
+                        yield data
+        finally:
+            self.PROFILER.stop()
+            self.PROFILER.log_report()
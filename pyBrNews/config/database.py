@@ -1,14 +1,29 @@
 import csv
+import glob
 import json
+import os
+import sqlite3
+import threading
+import time
 import traceback
+import zlib
 from datetime import datetime
-from typing import List, Iterable, Optional
+from itertools import count
+from typing import Callable, List, Iterable, Optional, Tuple, Union
 
+import bson
 import pymongo
+import pymongo.collection
+import pymongo.cursor
 import pymongo.database
 import pymongo.errors
 from loguru import logger
 
+from ..dates import UTC, parse_date
+from ..metrics import METRICS
+from ..records import as_dict, json_default, json_object_hook
+from .record_log import PyBrNewsRecordLog
+
 
 class PyBrNewsDB:
     """
@@ -18,8 +33,14 @@ class PyBrNewsDB:
     with the parameters host and port.
 
     Example: set_connection(host="192.168.0.1", port: 88890).
+
+    With split_content, the article body and HTML are stored zlib-compressed in a separate "<collection>_content"
+    collection, linked by the document ID, and the documents of the news collection only keep the metadata. The body
+    and HTML are then loaded on demand with load_content.
     """
-    def __init__(self, data_kind: str = "news") -> None:
+    CONTENT_FIELDS = ("body", "html")
+
+    def __init__(self, data_kind: str = "news", split_content: bool = False) -> None:
         if "news" not in data_kind and "comments" not in data_kind:
             raise ValueError(
                 f"An invalid kind of data for database [ {data_kind} ] was supplied. Review and try again."
@@ -27,10 +48,22 @@ class PyBrNewsDB:
 
         self.client: Optional[pymongo.MongoClient] = None
         self.db: Optional[pymongo.database.Database] = None
+        self.collection: Optional[pymongo.collection.Collection] = None
+
+        self.split_content = split_content
+        self._indexed = set()
+        self._stored_listeners: List[Callable[[dict], None]] = []
 
         self.set_connection()
         self.collection = self.db.get_collection(data_kind)
 
+    @property
+    def content_collection(self) -> pymongo.collection.Collection:
+        """
+        The collection of the compressed bodies and HTML of the split storage mode.
+        """
+        return self.db.get_collection(f"{self.collection.name}_content")
+
     def set_connection(self, host: str = "localhost", port: int = 27017) -> None:
         """
         Sets the connection host:port parameters for the MongoDB. By default, uses the standard localhost:27017 for
@@ -42,6 +75,22 @@ class PyBrNewsDB:
         """
         self.client = pymongo.MongoClient(host=host, port=port)
         self.db = self.client.get_database(name="pyBrNews")
+        if self.collection is not None:
+            self.collection = self.db.get_collection(self.collection.name)
+
+    def add_stored_listener(self, listener: Callable[[dict], None]) -> None:
+        """
+        Adds a function called with the parsed data of each item once it has been successfully stored, e.g. the
+        confirm method of a ChangeTracker.
+
+        Parameters:
+            listener (Callable[[dict], None]): The function to be called.
+        """
+        self._stored_listeners.append(listener)
+
+    def _notify_stored(self, parsed_data: dict) -> None:
+        for listener in self._stored_listeners:
+            listener(parsed_data)
 
     def insert_data(self, parsed_data: dict) -> None:
         """
@@ -52,18 +101,97 @@ class PyBrNewsDB:
         Returns:
             None: Shows a success message if the insertion occurred normally. If not, shows an error message.
         """
+        parsed_data = as_dict(parsed_data)
         parsed_data["entry_dt"] = datetime.now()
 
+        start = time.perf_counter()
         try:
-            inserted_data = self.collection.insert_one(parsed_data)
-            logger.success(
-                f"Data inserted into pyBrNews DB! Document ID {inserted_data.inserted_id} "
-                f"successfully added to the news collection."
-            )
+            if self.split_content and any(field in parsed_data.keys() for field in self.CONTENT_FIELDS):
+                slim_data, content = self._split_content(parsed_data=parsed_data)
+                inserted_data = self.collection.insert_one(slim_data)
+                self._insert_content(document_id=inserted_data.inserted_id, content=content)
+            else:
+                inserted_data = self.collection.insert_one(parsed_data)
+            METRICS.observe_db_write(seconds=time.perf_counter() - start)
+            if METRICS.log_items:
+                logger.success(
+                    f"Data inserted into pyBrNews DB! Document ID {inserted_data.inserted_id} "
+                    f"successfully added to the news collection."
+                )
         except Exception as e:
+            METRICS.observe_db_write(seconds=time.perf_counter() - start, error=True)
             logger.error(f"An error happened while attempting to insert the given data to the pyBrNews database.")
             logger.debug(f"Data URL: {parsed_data['url']}")
             logger.debug(f"{traceback.print_exception(e)}")
+        else:
+            self._notify_stored(parsed_data=parsed_data)
+
+    def _split_content(self, parsed_data: dict) -> Tuple[dict, dict]:
+        """
+        Splits the parsed data into the slim document of the news collection and its content (body and HTML),
+        without changing the given dictionary.
+
+        Parameters:
+            parsed_data (dict): Dictionary containing the parsed data from a news article.
+        Returns:
+            Tuple[dict, dict]: The slim parsed data, with the content flags (has_body, has_html), and the content.
+        """
+        content = {field: parsed_data.get(field) for field in self.CONTENT_FIELDS}
+        slim_data = {key: value for key, value in parsed_data.items() if key not in self.CONTENT_FIELDS}
+        for field, value in content.items():
+            slim_data[f"has_{field}"] = value is not None
+
+        return slim_data, content
+
+    def _insert_content(self, document_id: bson.ObjectId, content: dict) -> None:
+        """
+        Stores the body and HTML of an inserted news document in the content collection, compressed with zlib. If
+        the content cannot be stored, the news document is removed, so no document is left without its content.
+
+        Parameters:
+            document_id (bson.ObjectId): The ID of the news document, shared by the content document.
+            content (dict): The body (str) and HTML (bytes or str) of the article.
+        """
+        if all(value is None for value in content.values()):
+            return
+
+        try:
+            self.content_collection.insert_one({
+                "_id": document_id,
+                **{
+                    field: zlib.compress(value if isinstance(value, bytes) else value.encode("utf-8"))
+                    for field, value in content.items() if value is not None
+                },
+            })
+        except Exception:
+            self.collection.delete_one({"_id": document_id})
+            raise
+
+    def load_content(self,
+                     document: Union[dict, bson.ObjectId],
+                     fields: Tuple[str, ...] = CONTENT_FIELDS) -> dict:
+        """
+        Loads the body and / or HTML of a document stored in the split storage mode.
+
+        Example: PyBrNewsDB(split_content=True).load_content(document, fields=("body",))["body"]
+
+        Parameters:
+            document (Union[dict, bson.ObjectId]): The document of the news collection, or its ID.
+            fields (Tuple[str, ...]): The content to be loaded, "body" and / or "html".
+        Returns:
+            dict: The decompressed content (the body as str and the HTML as bytes), None for the fields that were not
+                  stored.
+        """
+        document_id = document["_id"] if isinstance(document, dict) else document
+        stored = self.content_collection.find_one({"_id": document_id}, projection={field: 1 for field in fields})
+        if stored is None:
+            stored = {}
+
+        content = {field: zlib.decompress(stored[field]) if stored.get(field) is not None else None for field in fields}
+        if content.get("body") is not None:
+            content["body"] = content["body"].decode("utf-8")
+
+        return content
 
     def check_duplicates(self, parsed_data: dict) -> bool:
         """
@@ -75,17 +203,288 @@ class PyBrNewsDB:
         Returns:
             bool: True if the given parsed data is already in the database. False if not.
         """
-        check_params = {
-            "url": parsed_data["url"],
-            "date": parsed_data["date"],
-        }
+        check_params = {"url": parsed_data["url"]}
+        if "date" in parsed_data.keys():
+            check_params["date"] = parsed_data["date"]
 
         documents = self.collection.find_one(check_params)
+        METRICS.observe_dedup(duplicated=documents is not None)
         if documents is None:
             return False
 
         return True
 
+    def _load_feed_position(self, consumer: str) -> dict:
+        position = self.db.get_collection("feed_positions").find_one({"_id": f"{self.collection.name}:{consumer}"})
+        return position if position is not None else {}
+
+    def _save_feed_position(self, consumer: str, **position) -> None:
+        self.db.get_collection("feed_positions").update_one(
+            {"_id": f"{self.collection.name}:{consumer}"},
+            {"$set": dict(position, updated_dt=datetime.now())},
+            upsert=True,
+        )
+
+    def _watch_changes(self,
+                       consumer: str,
+                       include_html: bool,
+                       batch_size: int,
+                       max_idle: Optional[float]) -> Iterable[dict]:
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        if not include_html:
+            pipeline.append({"$project": {"fullDocument.html": 0}})
+
+        resume_token = self._load_feed_position(consumer=consumer).get("resume_token")
+        saved = resume_token
+        unsaved = 0
+        with self.collection.watch(pipeline=pipeline, resume_after=resume_token, max_await_time_ms=1000) as stream:
+            logger.info(f"pyBrNews feed >> Consumer {consumer} following the {self.collection.name} change stream.")
+            idle_since = time.monotonic()
+            try:
+                while stream.alive:
+                    change = stream.try_next()
+                    if change is None:
+                        # Saves the position while idle too, so a killed consumer only replays the last changes.
+                        if unsaved > 0:
+                            self._save_feed_position(consumer=consumer, resume_token=resume_token)
+                            saved, unsaved = resume_token, 0
+                        if max_idle is not None and time.monotonic() - idle_since >= max_idle:
+                            break
+                        continue
+
+                    idle_since = time.monotonic()
+                    yield change["fullDocument"]
+                    resume_token = stream.resume_token
+                    unsaved += 1
+                    if unsaved >= batch_size:
+                        self._save_feed_position(consumer=consumer, resume_token=resume_token)
+                        saved, unsaved = resume_token, 0
+            finally:
+                if resume_token is not None and resume_token != saved:
+                    self._save_feed_position(consumer=consumer, resume_token=resume_token)
+
+    def _tail_collection(self,
+                         consumer: str,
+                         include_html: bool,
+                         from_start: bool,
+                         poll_interval: float,
+                         batch_size: int,
+                         max_idle: Optional[float]) -> Iterable[dict]:
+        # entry_dt comes from the clock of each writer: see the tail mode limits in watch_data.
+        self.collection.create_index([("entry_dt", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)])
+        projection = None if include_html else {"html": 0}
+        order = [("entry_dt", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)]
+
+        position = self._load_feed_position(consumer=consumer)
+        last: Optional[Tuple[datetime, object]] = None
+        if "entry_dt" in position.keys():
+            last = (position["entry_dt"], position["last_id"])
+        elif not from_start:
+            newest = self.collection.find_one({}, projection={"entry_dt": 1}, sort=[(key, -1) for key, _ in order])
+            last = (newest["entry_dt"], newest["_id"]) if newest is not None else None
+
+        logger.info(f"pyBrNews feed >> Consumer {consumer} tailing the {self.collection.name} collection.")
+        idle_since = time.monotonic()
+        saved = last
+        try:
+            while True:
+                query = {} if last is None else {"$or": [
+                    {"entry_dt": {"$gt": last[0]}},
+                    {"entry_dt": last[0], "_id": {"$gt": last[1]}},
+                ]}
+                found = 0
+                for document in self.collection.find(query, projection=projection, sort=order,
+                                                      batch_size=batch_size):
+                    found += 1
+                    yield document
+                    last = (document["entry_dt"], document["_id"])
+                    if found % batch_size == 0:
+                        self._save_feed_position(consumer=consumer, entry_dt=last[0], last_id=last[1])
+                        saved = last
+
+                if found > 0:
+                    idle_since = time.monotonic()
+                    continue
+                if max_idle is not None and time.monotonic() - idle_since >= max_idle:
+                    break
+                time.sleep(poll_interval)
+        finally:
+            if last is not None and last != saved:
+                self._save_feed_position(consumer=consumer, entry_dt=last[0], last_id=last[1])
+
+    def watch_data(self,
+                   consumer: str = "default",
+                   include_html: bool = False,
+                   from_start: bool = False,
+                   use_change_stream: Optional[bool] = None,
+                   poll_interval: float = 1.0,
+                   batch_size: int = 100,
+                   max_idle: Optional[float] = None) -> Iterable[dict]:
+        """
+        Streams the documents inserted into the collection, for downstream consumers. Follows a change stream when
+        MongoDB runs as a replica set and falls back to tailing the collection through an index on entry_dt otherwise.
+        The position of each consumer (resume token or last entry_dt) is stored in the feed_positions collection
+        every batch_size documents (and when the stream is idle), so a restarted consumer continues from where it
+        stopped instead of scanning the collection again.
+
+        The tail mode orders the documents by entry_dt, which is set by the writer (insert_data) and not by the
+        server. With several writers (e.g. the ShardedRunner in direct mode) or skewed clocks, a document committed
+        after a later entry_dt has been read is never streamed. Use a replica set (change stream) in those setups.
+
+        Example: for document in PyBrNewsDB().watch_data(consumer="indexer"): ...
+
+        Parameters:
+            consumer (str): Name of the consumer whose position is stored.
+            include_html (bool): Defines if the HTML bytes of the articles are included in the documents.
+            from_start (bool): Defines if a consumer without a stored position reads the documents already in the
+                               collection (tail mode only). If not, only the new documents are streamed.
+            use_change_stream (Optional[bool]): Forces (True) or disables (False) the change stream. If not set,
+                                                uses it when available.
+            poll_interval (float): Seconds between the queries of the tail mode when there are no new documents.
+            batch_size (int): Number of documents per cursor batch, also the interval of stored positions.
+            max_idle (Optional[float]): Seconds without new documents before the stream stops. If not set, streams
+                                        until the consumer stops iterating.
+        Returns:
+            Iterable[dict]: Per iteration -> The inserted document.
+        """
+        if use_change_stream is not False:
+            streamed = 0
+            try:
+                for document in self._watch_changes(consumer=consumer, include_html=include_html,
+                                                    batch_size=batch_size, max_idle=max_idle):
+                    streamed += 1
+                    yield document
+                return
+            except pymongo.errors.OperationFailure as e:
+                if use_change_stream or streamed > 0:
+                    raise
+                logger.warning(f"Change streams are not available ({e.code}). Tailing the collection on entry_dt.")
+
+        yield from self._tail_collection(consumer=consumer, include_html=include_html, from_start=from_start,
+                                         poll_interval=poll_interval, batch_size=batch_size, max_idle=max_idle)
+
+    def _ensure_indexes(self) -> None:
+        """
+        Creates the indexes used by the query methods, once per collection and connection.
+        """
+        if self.collection.full_name in self._indexed:
+            return
+
+        if "comments" in self.collection.name:
+            self.collection.create_index([("news_data.url", pymongo.ASCENDING), ("upvote", pymongo.DESCENDING)])
+            self.collection.create_index([("platform", pymongo.ASCENDING), ("upvote", pymongo.DESCENDING)])
+            self.collection.create_index([("upvote", pymongo.DESCENDING)])
+        else:
+            for field in ("platform", "section", "region"):
+                self.collection.create_index([(field, pymongo.ASCENDING), ("date", pymongo.DESCENDING)])
+            self.collection.create_index([("date", pymongo.DESCENDING)])
+            self.collection.create_index([("url", pymongo.ASCENDING)])
+
+        self._indexed.add(self.collection.full_name)
+
+    @staticmethod
+    def _projection(projection: Optional[List[str]], include_html: bool) -> Optional[Union[List[str], dict]]:
+        if projection is not None:
+            return projection
+
+        return None if include_html else {"html": 0}
+
+    def find_news(self,
+                  platform: Optional[str] = None,
+                  section: Optional[str] = None,
+                  region: Optional[str] = None,
+                  start_date: Optional[datetime] = None,
+                  end_date: Optional[datetime] = None,
+                  projection: Optional[List[str]] = None,
+                  include_html: bool = False,
+                  batch_size: int = 100,
+                  limit: int = 0) -> pymongo.cursor.Cursor:
+        """
+        Queries the stored news articles, newest first. The filters use the indexes created on the first query.
+
+        Example: for article in PyBrNewsDB().find_news(platform="Portal G1", region="SP"): ...
+
+        Parameters:
+            platform (Optional[str]): Name of the platform, e.g. "Portal G1", "Folha de São Paulo" or "Exame".
+            section (Optional[str]): Section name of the articles.
+            region (Optional[str]): Region of the articles, e.g. "SP".
+            start_date (Optional[datetime]): Earliest published date (inclusive).
+            end_date (Optional[datetime]): Latest published date (exclusive).
+            projection (Optional[List[str]]): Fields to be returned. If not set, all the fields except the HTML.
+            include_html (bool): Defines if the HTML is returned when no projection is given.
+            batch_size (int): Number of documents fetched from the server per batch.
+            limit (int): Maximum number of documents. If not set, returns all the matches.
+        Returns:
+            pymongo.cursor.Cursor: Cursor streaming the matching documents.
+        """
+        self._ensure_indexes()
+
+        query = {
+            field: value for field, value in (("platform", platform), ("section", section), ("region", region))
+            if value is not None
+        }
+        date_range = {
+            operator: value for operator, value in (("$gte", start_date), ("$lt", end_date)) if value is not None
+        }
+        if date_range:
+            query["date"] = date_range
+
+        return self.collection.find(
+            query, projection=self._projection(projection, include_html), sort=[("date", pymongo.DESCENDING)],
+            batch_size=batch_size, limit=limit,
+        )
+
+    def find_comments(self,
+                      article_url: str,
+                      projection: Optional[List[str]] = None,
+                      batch_size: int = 100) -> pymongo.cursor.Cursor:
+        """
+        Queries the stored comments of a news article, most upvoted first.
+
+        Parameters:
+            article_url (str): URL of the news article.
+            projection (Optional[List[str]]): Fields to be returned. If not set, all the fields.
+            batch_size (int): Number of documents fetched from the server per batch.
+        Returns:
+            pymongo.cursor.Cursor: Cursor streaming the comments of the article.
+        """
+        self._ensure_indexes()
+
+        return self.collection.find(
+            {"news_data.url": article_url}, projection=projection, sort=[("upvote", pymongo.DESCENDING)],
+            batch_size=batch_size,
+        )
+
+    def top_comments(self,
+                     limit: int = 10,
+                     platform: Optional[str] = None,
+                     article_url: Optional[str] = None,
+                     projection: Optional[List[str]] = None,
+                     batch_size: int = 100) -> pymongo.cursor.Cursor:
+        """
+        Queries the most upvoted comments, optionally of a platform or of a news article.
+
+        Parameters:
+            limit (int): Number of comments to be returned.
+            platform (Optional[str]): Name of the platform, e.g. "Portal G1".
+            article_url (Optional[str]): URL of the news article.
+            projection (Optional[List[str]]): Fields to be returned. If not set, all the fields.
+            batch_size (int): Number of documents fetched from the server per batch.
+        Returns:
+            pymongo.cursor.Cursor: Cursor streaming the comments, most upvoted first.
+        """
+        self._ensure_indexes()
+
+        query = {"upvote": {"$ne": None}}
+        if platform is not None:
+            query["platform"] = platform
+        if article_url is not None:
+            query["news_data.url"] = article_url
+
+        return self.collection.find(
+            query, projection=projection, sort=[("upvote", pymongo.DESCENDING)], batch_size=batch_size, limit=limit,
+        )
+
 
 class PyBrNewsFS:
     """
@@ -94,9 +493,34 @@ class PyBrNewsFS:
 
     By default, exports all the files into the current work directory. To alter the save path, call the set_save_path()
     method, passing the attribute "fs_save_path" with the desired directory ending with a slash.
+
+    With use_record_log, to_json appends the data to an append-only record log (PyBrNewsRecordLog) in the "records"
+    directory of the save path instead of writing one JSON file per item, and check_duplicates detects the items
+    already in the log.
+
+    The JSON files / log records are indexed in a SQLite file (pyBrNews_index.sqlite3) of the save path, backing the
+    same query methods of the PyBrNewsDB Class (find_news, find_comments and top_comments).
     """
-    def __init__(self) -> None:
+    INDEX_FILE = "pyBrNews_index.sqlite3"
+
+    def __init__(self, use_record_log: bool = False) -> None:
         self.save_path = ""
+        self.use_record_log = use_record_log
+        self._record_log: Optional[PyBrNewsRecordLog] = None
+        self._index_connection: Optional[sqlite3.Connection] = None
+        self._index_lock = threading.Lock()
+        self._stored_listeners: List[Callable[[dict], None]] = []
+
+    @property
+    def record_log(self) -> PyBrNewsRecordLog:
+        """
+        The record log of the save path, opened on the first use.
+        """
+        with self._index_lock:
+            if self._record_log is None:
+                self._record_log = PyBrNewsRecordLog(log_path=f"{self.save_path}records")
+
+            return self._record_log
 
     def set_save_path(self, fs_save_path: str) -> None:
         """
@@ -110,32 +534,280 @@ class PyBrNewsFS:
         if "/" not in fs_save_path[-1]:
             raise ValueError("End the save path with a slash ( / ).")
 
-        self.save_path = fs_save_path
+        with self._index_lock:
+            if self._index_connection is not None:
+                self._index_connection.close()
+                self._index_connection = None
+            if self._record_log is not None:
+                self._record_log.close()
+                self._record_log = None
+            self.save_path = fs_save_path
+
+    def add_stored_listener(self, listener: Callable[[dict], None]) -> None:
+        """
+        Adds a function called with the parsed data of each item once it has been successfully stored, e.g. the
+        confirm method of a ChangeTracker.
+
+        Parameters:
+            listener (Callable[[dict], None]): The function to be called.
+        """
+        self._stored_listeners.append(listener)
+
+    def _notify_stored(self, parsed_data: dict) -> None:
+        for listener in self._stored_listeners:
+            listener(parsed_data)
 
     def to_json(self, parsed_data: dict) -> None:
         """
-        Using the parsed data dictionary from a news article or a comment, export the data as an individual JSON file.
+        Using the parsed data dictionary from a news article or a comment, export the data as an individual JSON file,
+        or as a record of the record log when use_record_log is set.
 
         Parameters:
             parsed_data (dict): Dictionary containing the parsed data from a news article or a comment.
         """
         if parsed_data is None:
             raise AttributeError("Parsed Data Dictionary cannot be an NoneType value.")
+        parsed_data = as_dict(parsed_data)
+
+        if self.use_record_log:
+            self._to_record_log(parsed_data=parsed_data)
+            return
 
         export_time = datetime.today().strftime("%Y_%m_%d_%H_%M_%S")
         file_name = f"ParsedNewsData_{export_time}.json"
         try:
-            with open(f"{self.save_path}{file_name}", mode="w", encoding="utf-8") as json_file:
-                json.dump(parsed_data, json_file, ensure_ascii=False, indent=4)
-
-            logger.success(
-                f"Data saved successfully as a JSON file! Document path: {self.save_path}{file_name}"
-            )
+            start = time.perf_counter()
+            for i in count(1):
+                try:
+                    with open(f"{self.save_path}{file_name}", mode="x", encoding="utf-8") as json_file:
+                        json.dump(parsed_data, json_file, ensure_ascii=False, indent=4, default=json_default)
+                    break
+                except FileExistsError:
+                    file_name = f"ParsedNewsData_{export_time}_{i}.json"
+            self._index_documents(documents=[(file_name, parsed_data)])
+            METRICS.observe_db_write(seconds=time.perf_counter() - start)
+
+            if METRICS.log_items:
+                logger.success(
+                    f"Data saved successfully as a JSON file! Document path: {self.save_path}{file_name}"
+                )
         except OSError:
             logger.error(
                 "An error occurred while attempting to save the JSON file. Review the save path and the data, and try "
                 "again."
             )
+        else:
+            self._notify_stored(parsed_data=parsed_data)
+
+    def _to_record_log(self, parsed_data: dict) -> None:
+        try:
+            start = time.perf_counter()
+            location = self.record_log.append(parsed_data=parsed_data)
+            self._index_documents(documents=[(location, parsed_data)])
+            METRICS.observe_db_write(seconds=time.perf_counter() - start)
+
+            if METRICS.log_items:
+                logger.success(f"Data saved successfully in the record log! Record location: {location}")
+        except OSError:
+            METRICS.observe_db_write(seconds=time.perf_counter() - start, error=True)
+            logger.error(
+                "An error occurred while attempting to append to the record log. Review the save path and the data, "
+                "and try again."
+            )
+        else:
+            self._notify_stored(parsed_data=parsed_data)
+
+    def _index(self) -> sqlite3.Connection:
+        """
+        Opens the SQLite index of the save path, creating its table and indexes on the first use. Must be called with
+        the index lock held.
+        """
+        if self._index_connection is None:
+            self._index_connection = sqlite3.connect(f"{self.save_path}{self.INDEX_FILE}", check_same_thread=False,
+                                                     isolation_level=None)
+            self._index_connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "file TEXT PRIMARY KEY, kind TEXT, url TEXT, platform TEXT, section TEXT, region TEXT, date TEXT, "
+                "article_url TEXT, upvote INTEGER)"
+            )
+            for name, columns in (("news_platform", "kind, platform, date"), ("news_section", "kind, section, date"),
+                                  ("news_region", "kind, region, date"), ("news_date", "kind, date"),
+                                  ("comments_article", "article_url, upvote"), ("comments_upvote", "kind, upvote")):
+                self._index_connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON documents ({columns})")
+
+        return self._index_connection
+
+    @staticmethod
+    def _index_date(date: Union[datetime, str, None]) -> Optional[str]:
+        if isinstance(date, str):
+            date = parse_date(date)
+        if date is None:
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=UTC)
+
+        return date.astimezone(UTC).isoformat()
+
+    def _index_documents(self, documents: Iterable[Tuple[str, dict]]) -> None:
+        rows = []
+        for file_name, data in documents:
+            news_data = data.get("news_data")
+            rows.append((
+                file_name, "comments" if news_data is not None else "news", data.get("url"), data.get("platform"),
+                data.get("section"), data.get("region"), self._index_date(data.get("date")),
+                news_data.get("url") if isinstance(news_data, dict) else None, data.get("upvote"),
+            ))
+
+        with self._index_lock:
+            self._index().executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def rebuild_index(self) -> int:
+        """
+        Indexes all the JSON files of the save path (and the records of the record log, when use_record_log is set),
+        e.g. the ones exported before the index existed.
+
+        Returns:
+            int: Number of indexed files / records.
+        """
+        def documents() -> Iterable[Tuple[str, dict]]:
+            for path in glob.glob(f"{self.save_path}ParsedNewsData_*.json"):
+                with open(path, encoding="utf-8") as json_file:
+                    yield os.path.basename(path), json.load(json_file, object_hook=json_object_hook)
+            if self.use_record_log:
+                yield from self.record_log.scan()
+
+        indexed = list(documents())
+        self._index_documents(documents=indexed)
+        logger.success(f"{len(indexed)} JSON files indexed at {self.save_path}{self.INDEX_FILE}.")
+
+        return len(indexed)
+
+    def _load_documents(self,
+                        sql: str,
+                        parameters: list,
+                        projection: Optional[List[str]],
+                        include_html: bool,
+                        batch_size: int) -> Iterable[dict]:
+        with self._index_lock:
+            cursor = self._index().execute(sql, parameters)
+            cursor.arraysize = batch_size
+
+        while True:
+            with self._index_lock:
+                files = cursor.fetchmany()
+            if not files:
+                break
+
+            for (file_name,) in files:
+                try:
+                    if ":" in file_name:
+                        document = self.record_log.read(location=file_name)
+                    else:
+                        with open(f"{self.save_path}{file_name}", encoding="utf-8") as json_file:
+                            document = json.load(json_file, object_hook=json_object_hook)
+                except (OSError, KeyError):
+                    logger.warning(f"Indexed file {file_name} not found. Call rebuild_index to refresh the index.")
+                    continue
+
+                if projection is not None:
+                    document = {field: document.get(field) for field in projection}
+                elif not include_html:
+                    document.pop("html", None)
+                yield document
+
+    def find_news(self,
+                  platform: Optional[str] = None,
+                  section: Optional[str] = None,
+                  region: Optional[str] = None,
+                  start_date: Optional[datetime] = None,
+                  end_date: Optional[datetime] = None,
+                  projection: Optional[List[str]] = None,
+                  include_html: bool = False,
+                  batch_size: int = 100,
+                  limit: int = 0) -> Iterable[dict]:
+        """
+        Queries the exported news articles through the index, newest first. Mirrors PyBrNewsDB.find_news.
+
+        Parameters:
+            platform (Optional[str]): Name of the platform, e.g. "Portal G1", "Folha de São Paulo" or "Exame".
+            section (Optional[str]): Section name of the articles.
+            region (Optional[str]): Region of the articles, e.g. "SP".
+            start_date (Optional[datetime]): Earliest published date (inclusive).
+            end_date (Optional[datetime]): Latest published date (exclusive).
+            projection (Optional[List[str]]): Fields to be returned. If not set, all the fields except the HTML.
+            include_html (bool): Defines if the HTML is returned when no projection is given.
+            batch_size (int): Number of index entries read at once.
+            limit (int): Maximum number of documents. If not set, returns all the matches.
+        Returns:
+            Iterable[dict]: Per iteration -> The matching document.
+        """
+        conditions, parameters = ["kind = ?"], ["news"]
+        for column, value in (("platform", platform), ("section", section), ("region", region)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if start_date is not None:
+            conditions.append("date >= ?")
+            parameters.append(self._index_date(start_date))
+        if end_date is not None:
+            conditions.append("date < ?")
+            parameters.append(self._index_date(end_date))
+
+        sql = f"SELECT file FROM documents WHERE {' AND '.join(conditions)} ORDER BY date DESC"
+        if limit > 0:
+            sql += f" LIMIT {int(limit)}"
+
+        return self._load_documents(sql=sql, parameters=parameters, projection=projection, include_html=include_html,
+                                    batch_size=batch_size)
+
+    def find_comments(self,
+                      article_url: str,
+                      projection: Optional[List[str]] = None,
+                      batch_size: int = 100) -> Iterable[dict]:
+        """
+        Queries the exported comments of a news article, most upvoted first. Mirrors PyBrNewsDB.find_comments.
+
+        Parameters:
+            article_url (str): URL of the news article.
+            projection (Optional[List[str]]): Fields to be returned. If not set, all the fields.
+            batch_size (int): Number of index entries read at once.
+        Returns:
+            Iterable[dict]: Per iteration -> The comment of the article.
+        """
+        return self._load_documents(
+            sql="SELECT file FROM documents WHERE article_url = ? ORDER BY upvote DESC", parameters=[article_url],
+            projection=projection, include_html=True, batch_size=batch_size,
+        )
+
+    def top_comments(self,
+                     limit: int = 10,
+                     platform: Optional[str] = None,
+                     article_url: Optional[str] = None,
+                     projection: Optional[List[str]] = None,
+                     batch_size: int = 100) -> Iterable[dict]:
+        """
+        Queries the most upvoted exported comments, optionally of a platform or of a news article. Mirrors
+        PyBrNewsDB.top_comments.
+
+        Parameters:
+            limit (int): Number of comments to be returned.
+            platform (Optional[str]): Name of the platform, e.g. "Portal G1".
+            article_url (Optional[str]): URL of the news article.
+            projection (Optional[List[str]]): Fields to be returned. If not set, all the fields.
+            batch_size (int): Number of index entries read at once.
+        Returns:
+            Iterable[dict]: Per iteration -> The comment, most upvoted first.
+        """
+        conditions, parameters = ["kind = ?", "upvote IS NOT NULL"], ["comments"]
+        for column, value in (("platform", platform), ("article_url", article_url)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+
+        sql = f"SELECT file FROM documents WHERE {' AND '.join(conditions)} ORDER BY upvote DESC LIMIT {int(limit)}"
+
+        return self._load_documents(sql=sql, parameters=parameters, projection=projection, include_html=True,
+                                    batch_size=batch_size)
 
     @staticmethod
     def _remove_null_values(raw_full_data: List[dict]) -> Iterable[dict]:
@@ -150,20 +822,25 @@ class PyBrNewsFS:
         """
         for data in raw_full_data:
             if data is not None:
-                return data
+                yield as_dict(data)
 
-    @staticmethod
-    def check_duplicates(parsed_data: dict = None) -> bool:
+    def check_duplicates(self, parsed_data: dict = None) -> bool:
         """
-        Placeholder method, mirroring the existing one in the PyBrNewsDB Class. Just returns False because is a FS data
-        structure.
+        Checks if the parsed data (same URL and date) is already in the record log, mirroring the existing method in
+        the PyBrNewsDB Class. Without use_record_log, just returns False, since the individual JSON files are not
+        checked.
 
         Parameters:
             parsed_data (dict): Dictionary containing the parsed data from a news article or comment.
         Returns:
-            bool: Because it is a FS Class, it does not check for duplicates. Returns False.
+            bool: True if the given parsed data is already in the record log. False if not.
         """
-        if parsed_data is not None:
+        if parsed_data is not None and self.use_record_log:
+            duplicated = self.record_log.contains(parsed_data=as_dict(parsed_data))
+            METRICS.observe_dedup(duplicated=duplicated)
+            return duplicated
+
+        if parsed_data is not None and METRICS.log_items:
             logger.warning("PyBrNews File System in use. Checking for duplicates only works on the PyBrNews Database.")
 
         return False
@@ -0,0 +1,19 @@
+# Sitemaps and RSS / Atom feeds streamed by NewsDiscovery for each crawler. Sitemap indexes are followed into their
+# child sitemaps, skipping the ones not modified since the requested date.
+discovery_config = {
+    "G1News": {
+        "sitemaps": ["https://g1.globo.com/sitemap/g1/sitemap.xml"],
+        "feeds": ["https://g1.globo.com/rss/g1/"],
+        "url_filter": "g1.globo.com",
+    },
+    "FolhaNews": {
+        "sitemaps": [],
+        "feeds": ["https://feeds.folha.uol.com.br/emcimadahora/rss091.xml"],
+        "url_filter": "1.folha.uol.com.br",
+    },
+    "ExameNews": {
+        "sitemaps": [],
+        "feeds": ["https://exame.com/feed/"],
+        "url_filter": "exame.com",
+    },
+}
@@ -46,5 +46,10 @@ comments_config = {
         "id": "cf0bfa0e60dd576a3908cde9a42cd1f0",
         "variables": "{\"storyURL\":\"@\",\"commentsOrderBy\":\"CREATED_AT_DESC\",\"storyMode\":"
                      "\"COMMENTS\",\"flattenReplies\":true}"
+    },
+
+    "pagination": {
+        "page_size": 50,
+        "max_pages": -1
     }
 }
\ No newline at end of file
@@ -0,0 +1,259 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+from ..records import json_default, json_object_hook
+
+_LENGTH = struct.Struct("<I")
+# Sidecar index entry: URL hash, version hash (URL and date), record offset and record length.
+_ENTRY = struct.Struct("<QQQI")
+
+
+def record_key(parsed_data: dict) -> str:
+    """
+    Builds the key of a parsed data dictionary in the record log: the URL of a news article, or the article URL and
+    the comment ID of a comment.
+
+    Parameters:
+        parsed_data (dict): Dictionary containing the parsed data from a news article or comment.
+    Returns:
+        str: The record key.
+    """
+    if parsed_data.get("url") is not None:
+        return str(parsed_data["url"])
+
+    news_url = (parsed_data.get("news_data") or {}).get("url")
+    comment_id = parsed_data.get("comment_id", parsed_data.get("g1_id"))
+    return f"{news_url}#{comment_id}"
+
+
+def key_hash(key: str) -> int:
+    """
+    Hashes a record key (or a URL) into the 64-bit integer used by the offset index.
+
+    Parameters:
+        key (str): The record key.
+    Returns:
+        int: The key hash.
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _version_hash(parsed_data: dict) -> int:
+    return key_hash(f"{record_key(parsed_data)}|{parsed_data.get('date')}")
+
+
+class _LogSegment:
+    def __init__(self, path: str, name: str) -> None:
+        self.name = name
+        self.log_path = os.path.join(path, f"{name}.log")
+        self.index_path = os.path.join(path, f"{name}.idx")
+        self._mmap: Optional[mmap.mmap] = None
+
+        self.log_file = open(self.log_path, "a+b")
+        self.index_file = open(self.index_path, "a+b")
+        self.size = self._recover()
+
+    def _recover(self) -> int:
+        """
+        Drops the incomplete tail of the segment left by an interrupted write: a partial index entry, or records
+        appended after the last indexed one.
+        """
+        index_size = os.path.getsize(self.index_path)
+        if index_size % _ENTRY.size:
+            self.index_file.truncate(index_size - index_size % _ENTRY.size)
+            index_size -= index_size % _ENTRY.size
+
+        end = 0
+        if index_size:
+            with open(self.index_path, "rb") as index_file:
+                index_file.seek(index_size - _ENTRY.size)
+                _, _, offset, length = _ENTRY.unpack(index_file.read(_ENTRY.size))
+            end = offset + _LENGTH.size + length
+
+        if os.path.getsize(self.log_path) > end:
+            logger.warning(f"Record log segment {self.name} has an incomplete tail. Truncating it at byte {end}.")
+            self.log_file.truncate(end)
+
+        return end
+
+    def entries(self) -> Iterable[Tuple[int, int, int, int]]:
+        with open(self.index_path, "rb") as index_file:
+            data = index_file.read()
+
+        return _ENTRY.iter_unpack(data)
+
+    def append(self, payload: bytes, url_hash: int, version: int, sync: bool) -> Tuple[int, int]:
+        offset = self.size
+        self.log_file.write(_LENGTH.pack(len(payload)) + payload)
+        self.log_file.flush()
+        self.index_file.write(_ENTRY.pack(url_hash, version, offset, len(payload)))
+        self.index_file.flush()
+        if sync:
+            os.fsync(self.log_file.fileno())
+            os.fsync(self.index_file.fileno())
+
+        self.size += _LENGTH.size + len(payload)
+        return offset, len(payload)
+
+    def _view(self, end: int) -> mmap.mmap:
+        # The active segment grows after being mapped: remap it when a read goes past the mapped size.
+        if self._mmap is None or len(self._mmap) < end:
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self.log_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._mmap
+
+    def read(self, offset: int, length: int) -> bytes:
+        start = offset + _LENGTH.size
+        return self._view(start + length)[start:start + length]
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self.log_file.close()
+        self.index_file.close()
+
+
+class PyBrNewsRecordLog:
+    """
+    pyBrNews Record Log Class, an append-only log of parsed data stored in a few large segment files instead of one
+    JSON file per article.
+
+    Each record is length-prefixed JSON, appended to the active segment (records_NNNNNN.log) until it reaches
+    segment_size, when a new segment is started. Each segment has a sidecar offset index (records_NNNNNN.idx) of
+    fixed-size entries (URL hash, URL and date hash, offset and length), loaded into memory on opening, so records
+    are found by URL and duplicates are detected without reading the log. Reads go through memory-mapped segments,
+    for both random access (get) and sequential scans (scan).
+    """
+    def __init__(self, log_path: str, segment_size: int = 64 * 1024 * 1024, sync: bool = False) -> None:
+        self.log_path = log_path
+        self.segment_size = segment_size
+        self.sync = sync
+
+        self._lock = threading.Lock()
+        os.makedirs(log_path, exist_ok=True)
+
+        self._segments: Dict[str, _LogSegment] = {}
+        self._positions: Dict[int, Tuple[str, int, int]] = {}
+        self._versions = set()
+        for path in sorted(glob.glob(os.path.join(log_path, "records_*.log"))):
+            name = os.path.basename(path)[:-len(".log")]
+            segment = _LogSegment(path=log_path, name=name)
+            self._segments[name] = segment
+            for url_hash, version, offset, length in segment.entries():
+                self._positions[url_hash] = (name, offset, length)
+                self._versions.add(version)
+
+        if not self._segments:
+            self._new_segment()
+        self._active = self._segments[max(self._segments.keys())]
+
+        logger.info(f"Record log opened at {log_path} with {len(self._positions)} records.")
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _new_segment(self) -> None:
+        name = f"records_{len(self._segments) + 1:06d}"
+        self._segments[name] = _LogSegment(path=self.log_path, name=name)
+        self._active = self._segments[name]
+
+    def append(self, parsed_data: dict) -> str:
+        """
+        Appends the parsed data of a news article or comment to the log. A record with the same key replaces the
+        previous one in the offset index (the old bytes stay in the log).
+
+        Parameters:
+            parsed_data (dict): Dictionary containing the parsed data from a news article or comment.
+        Returns:
+            str: The location of the record, as "segment:offset:length".
+        """
+        payload = json.dumps(parsed_data, ensure_ascii=False, default=json_default).encode("utf-8")
+        url_hash = key_hash(record_key(parsed_data))
+        version = _version_hash(parsed_data)
+
+        with self._lock:
+            if self._active.size and self._active.size + len(payload) > self.segment_size:
+                self._new_segment()
+
+            name = self._active.name
+            offset, length = self._active.append(payload=payload, url_hash=url_hash, version=version, sync=self.sync)
+            self._positions[url_hash] = (name, offset, length)
+            self._versions.add(version)
+
+        return f"{name}:{offset}:{length}"
+
+    def contains(self, parsed_data: dict) -> bool:
+        """
+        Checks if a record with the same key and date is in the log.
+
+        Parameters:
+            parsed_data (dict): Dictionary containing the parsed data from a news article or comment.
+        Returns:
+            bool: True if the record is in the log. False if not.
+        """
+        return _version_hash(parsed_data) in self._versions
+
+    def _read(self, name: str, offset: int, length: int) -> dict:
+        with self._lock:
+            payload = self._segments[name].read(offset=offset, length=length)
+
+        return json.loads(payload, object_hook=json_object_hook)
+
+    def read(self, location: str) -> dict:
+        """
+        Reads the record at a location returned by append.
+
+        Parameters:
+            location (str): The location of the record, as "segment:offset:length".
+        Returns:
+            dict: The parsed data of the record.
+        """
+        name, offset, length = location.rsplit(":", 2)
+        return self._read(name=name, offset=int(offset), length=int(length))
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Reads the latest record of a key (the URL of a news article), by its hash.
+
+        Parameters:
+            key (str): The record key.
+        Returns:
+            Optional[dict]: The parsed data of the record. None if not found.
+        """
+        position = self._positions.get(key_hash(key))
+        if position is None:
+            return None
+
+        name, offset, length = position
+        return self._read(name=name, offset=offset, length=length)
+
+    def scan(self) -> Iterable[Tuple[str, dict]]:
+        """
+        Reads all the records of the log sequentially, in the order they were appended (incl. replaced ones), with
+        their locations (e.g. to rebuild a query index).
+
+        Returns:
+            Iterable[Tuple[str, dict]]: Per iteration -> The location and the parsed data of the record.
+        """
+        for name in sorted(self._segments.keys()):
+            for _, _, offset, length in self._segments[name].entries():
+                yield f"{name}:{offset}:{length}", self._read(name=name, offset=offset, length=length)
+
+    def close(self) -> None:
+        """
+        Closes the segment files and their memory maps.
+        """
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
@@ -0,0 +1,10 @@
+# URLs of each crawler whose pages need JavaScript to have their data extracted, rendered by PyBrNewsRenderer when
+# it is enabled. "pattern" is a regular expression searched in the URL, and "wait_xpath" (optional) an element
+# waited for before reading the rendered page. Every other URL is downloaded with plain HTTP.
+render_config = {
+    "G1News": [
+        {"pattern": r"^https?://g1\.globo\.com/.*/video/", "wait_xpath": '//meta[@itemprop="uploadDate"]'},
+    ],
+    "FolhaNews": [],
+    "ExameNews": [],
+}
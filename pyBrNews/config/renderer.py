@@ -0,0 +1,172 @@
+import asyncio
+import concurrent.futures
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Pattern, Tuple
+
+import pyppeteer
+import pyppeteer.errors
+from loguru import logger
+from requests_html import HTML
+
+from .render_rules import render_config
+from ..metrics import METRICS
+
+
+class PyBrNewsRenderer:
+    """
+    pyBrNews Renderer Class, a warm pool of headless Chromium pages (pyppeteer, the same browser used by
+    requests_html) rendering the article pages that need JavaScript.
+
+    The browser and pool_size pages, each in its own incognito context, are launched on the first render and reused
+    by all the following ones, so only the first rendered URL pays the browser start up. The pages run in an event
+    loop of a background thread, and render can be called from any thread: at most pool_size URLs are rendered at
+    once, the others wait for a free page. A renderer can be shared by several crawlers.
+
+    Only the URLs matching a rule of the crawler in render_rules.render_config are rendered, every other URL stays on
+    the plain HTTP session. If the browser cannot be launched (e.g. Chromium is missing and cannot be downloaded),
+    the renderer is disabled and all the URLs fall back to plain HTTP.
+
+    Example:
+        crawler = G1News(renderer=PyBrNewsRenderer(pool_size=2))
+    """
+    def __init__(self,
+                 pool_size: int = 2,
+                 timeout: float = 30.0,
+                 wait_until: str = "networkidle2",
+                 launch_options: Optional[dict] = None,
+                 rules: Optional[Dict[str, List[dict]]] = None) -> None:
+        """
+        Parameters:
+            pool_size (int): Number of browser pages kept open, i.e. the maximum number of concurrent renders.
+            timeout (float): Maximum seconds to load a page (and to wait for the wait_xpath element of its rule).
+            wait_until (str): pyppeteer load event waited for by each page, e.g. "load" or "networkidle2".
+            launch_options (Optional[dict]): Extra pyppeteer.launch options, e.g. {"executablePath": ...}.
+            rules (Optional[Dict[str, List[dict]]]): Rendering rules per crawler class name. Defaults to
+                                                     render_rules.render_config.
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.wait_until = wait_until
+        self.launch_options = launch_options or {}
+        self._rules: Dict[str, List[Tuple[Pattern, Optional[str]]]] = {
+            platform: [(re.compile(rule["pattern"]), rule.get("wait_xpath")) for rule in platform_rules]
+            for platform, platform_rules in (render_config if rules is None else rules).items()
+        }
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._browser = None
+        self._pages: Optional[asyncio.Queue] = None
+        self.disabled = False
+
+    def rule(self, platform: str, url: str) -> Optional[Tuple[Pattern, Optional[str]]]:
+        """
+        Finds the rendering rule of a URL.
+
+        Parameters:
+            platform (str): Class name of the crawler, e.g. "G1News".
+            url (str): The URL of the page.
+        Returns:
+            Optional[Tuple[Pattern, Optional[str]]]: The pattern and wait_xpath of the first matching rule. None if
+                                                     the URL does not need rendering.
+        """
+        for pattern, wait_xpath in self._rules.get(platform, ()):
+            if pattern.search(url):
+                return pattern, wait_xpath
+
+        return None
+
+    async def _launch(self) -> None:
+        self._browser = await pyppeteer.launch(
+            headless=True, handleSIGINT=False, handleSIGTERM=False, handleSIGHUP=False, args=["--no-sandbox"],
+            **self.launch_options
+        )
+        self._pages = asyncio.Queue()
+        for _ in range(self.pool_size):
+            context = await self._browser.createIncognitoBrowserContext()
+            self._pages.put_nowait(await context.newPage())
+
+        logger.info(f"Renderer started with a pool of {self.pool_size} browser pages.")
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._loop is not None:
+                return
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="pyBrNewsRenderer", daemon=True)
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._launch(), loop).result()
+            except Exception:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+
+            self._loop, self._thread = loop, thread
+
+    async def _render(self, url: str, wait_xpath: Optional[str]) -> Tuple[str, str, int]:
+        page = await self._pages.get()
+        try:
+            response = await page.goto(url, waitUntil=self.wait_until, timeout=self.timeout * 1000)
+            if wait_xpath is not None:
+                await page.waitForXPath(wait_xpath, timeout=self.timeout * 1000)
+
+            return await page.content(), page.url, response.status if response is not None else 0
+        finally:
+            self._pages.put_nowait(page)
+
+    def render(self, url: str, wait_xpath: Optional[str] = None) -> Optional[HTML]:
+        """
+        Loads a URL in a page of the pool, running its JavaScript, and returns the rendered document.
+
+        Parameters:
+            url (str): The URL of the page.
+            wait_xpath (Optional[str]): XPath of an element waited for before reading the page, e.g. one inserted by
+                                        a script.
+        Returns:
+            Optional[HTML]: A HTML object containing the rendered page. None if it could not be rendered, or if the
+                            browser could not be launched.
+        """
+        if self.disabled:
+            return None
+
+        try:
+            self._start()
+        except Exception as e:
+            self.disabled = True
+            logger.error(f"The renderer browser could not be launched, falling back to plain HTTP. {e!r}")
+            return None
+
+        start = time.perf_counter()
+        future = asyncio.run_coroutine_threadsafe(self._render(url=url, wait_xpath=wait_xpath), self._loop)
+        try:
+            content, final_url, status_code = future.result()
+        except (pyppeteer.errors.PyppeteerError, concurrent.futures.TimeoutError, asyncio.TimeoutError) as e:
+            METRICS.observe_retry(url=url)
+            logger.warning(f"Error while rendering the page with URL: {url}. {e!r}")
+            return None
+
+        content_bytes = content.encode("utf-8")
+        METRICS.observe_request(url=final_url, seconds=time.perf_counter() - start, size=len(content_bytes),
+                                status_code=status_code)
+
+        return HTML(html=content_bytes, url=final_url)
+
+    def close(self) -> None:
+        """
+        Closes the browser and stops the event loop of the pool.
+        """
+        with self._lock:
+            if self._loop is None:
+                return
+
+            asyncio.run_coroutine_threadsafe(self._browser.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop, self._thread, self._browser, self._pages = None, None, None, None
@@ -0,0 +1,378 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Union
+
+import pymongo
+import pymongo.database
+import pymongo.errors
+from loguru import logger
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+# Error of the items whose lease expired on the last attempt.
+_EXPIRED_ERROR = "Lease expired on the last attempt."
+
+
+def job_key(item: Union[str, dict]) -> str:
+    """
+    Builds the unique key of a work item. URLs are used as is, data dicts (e.g. Exame search items) use their link.
+
+    Parameters:
+        item (Union[str, dict]): A URL or a data dict returned by search_news.
+    Returns:
+        str: The key used to identify the item in the queue.
+    """
+    if isinstance(item, str):
+        return item
+
+    for key in ("link", "url"):
+        if key in item.keys() and item[key] is not None:
+            return str(item[key])
+
+    return json.dumps(item, sort_keys=True, default=str)
+
+
+class PyBrNewsQueue:
+    """
+    pyBrNews Work Queue Class, backed by a MongoDB collection in the pyBrNews database. Allows several crawler nodes to
+    share the work: producers enqueue the URLs / data found by search_news and workers lease, parse and acknowledge
+    them.
+
+    A leased item stays invisible to the other workers until its visibility timeout expires. If the worker does not
+    acknowledge it in time, the item is leased again, until the maximum number of attempts is reached. Then, it is
+    marked as failed by the next lease call.
+
+    By default, uses the standard MongoDB host and port (localhost:27017). Can be changed with set_connection,
+    with the parameters host and port.
+    """
+    def __init__(self, queue_name: str = "crawl", visibility_timeout: int = 300, max_retries: int = 3) -> None:
+        self.queue_name = queue_name
+        self.visibility_timeout = visibility_timeout
+        self.max_retries = max_retries
+
+        self.client: Optional[pymongo.MongoClient] = None
+        self.db: Optional[pymongo.database.Database] = None
+
+        self.set_connection()
+
+    def set_connection(self, host: str = "localhost", port: int = 27017) -> None:
+        """
+        Sets the connection host:port parameters for the MongoDB. By default, uses the standard localhost:27017 for
+        local usage.
+
+        Parameters:
+             host (str): Hostname or address to connect.
+             port (int): Port to be used in the connection.
+        """
+        self.client = pymongo.MongoClient(host=host, port=port)
+        self.db = self.client.get_database(name="pyBrNews")
+        self.collection = self.db.get_collection(f"queue_{self.queue_name}")
+        self.collection.create_index([("platform", pymongo.ASCENDING), ("status", pymongo.ASCENDING),
+                                      ("visible_at", pymongo.ASCENDING)])
+
+    def enqueue(self, items: Iterable[Union[str, dict]], platform: str) -> int:
+        """
+        Adds the URLs / data dicts to the queue. Items already in the queue (same URL) are ignored.
+
+        Parameters:
+            items (Iterable[Union[str, dict]]): URLs or data dicts returned by the search_news method.
+            platform (str): Name of the crawler able to parse the items (e.g. "G1News").
+        Returns:
+            int: Number of new items added to the queue.
+        """
+        now = datetime.now()
+        operations = [
+            pymongo.UpdateOne(
+                {"_id": job_key(item)},
+                {"$setOnInsert": {
+                    "payload": item, "platform": platform, "status": PENDING, "attempts": 0,
+                    "visible_at": now, "lease_id": None, "created_at": now, "error": None,
+                }},
+                upsert=True,
+            )
+            for item in items
+        ]
+        if len(operations) == 0:
+            return 0
+
+        result = self.collection.bulk_write(operations, ordered=False)
+        logger.info(f"{result.upserted_count} of {len(operations)} items added to the {self.queue_name} queue.")
+
+        return result.upserted_count
+
+    def lease(self, platform: str, max_items: int = 1, visibility_timeout: Optional[int] = None) -> List[dict]:
+        """
+        Leases up to max_items visible items of the given platform. Leased items are hidden from the other workers
+        until the visibility timeout expires.
+
+        Parameters:
+            platform (str): Name of the crawler able to parse the items (e.g. "G1News").
+            max_items (int): Maximum number of items to be leased.
+            visibility_timeout (Optional[int]): Seconds before the item is visible again. Defaults to the queue one.
+        Returns:
+            List[dict]: The leased jobs, containing the keys _id, payload, attempts and lease_id.
+        """
+        timeout = visibility_timeout if visibility_timeout is not None else self.visibility_timeout
+        self.collection.update_many(
+            {
+                "platform": platform,
+                "status": LEASED,
+                "visible_at": {"$lte": datetime.now()},
+                "attempts": {"$gte": self.max_retries},
+            },
+            {"$set": {"status": FAILED, "lease_id": None, "error": _EXPIRED_ERROR}},
+        )
+
+        jobs = []
+        for _ in range(max_items):
+            now = datetime.now()
+            job = self.collection.find_one_and_update(
+                {
+                    "platform": platform,
+                    "status": {"$in": [PENDING, LEASED]},
+                    "visible_at": {"$lte": now},
+                    "attempts": {"$lt": self.max_retries},
+                },
+                {
+                    "$set": {"status": LEASED, "visible_at": now + timedelta(seconds=timeout),
+                             "lease_id": uuid.uuid4().hex},
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("visible_at", pymongo.ASCENDING)],
+                return_document=pymongo.ReturnDocument.AFTER,
+            )
+            if job is None:
+                break
+
+            jobs.append(job)
+
+        return jobs
+
+    def extend(self, job: dict, visibility_timeout: Optional[int] = None) -> bool:
+        """
+        Extends the lease of a job still being processed.
+
+        Parameters:
+            job (dict): A job returned by the lease method.
+            visibility_timeout (Optional[int]): Seconds before the item is visible again. Defaults to the queue one.
+        Returns:
+            bool: True if the lease is still owned by the job and was extended. False if not.
+        """
+        timeout = visibility_timeout if visibility_timeout is not None else self.visibility_timeout
+        result = self.collection.update_one(
+            {"_id": job["_id"], "lease_id": job["lease_id"], "status": LEASED},
+            {"$set": {"visible_at": datetime.now() + timedelta(seconds=timeout)}},
+        )
+
+        return result.modified_count == 1
+
+    def ack(self, job: dict) -> bool:
+        """
+        Acknowledges a job as processed, removing it from the visible items of the queue.
+
+        Parameters:
+            job (dict): A job returned by the lease method.
+        Returns:
+            bool: True if the lease was still owned by the job. False if it expired and was leased by another worker.
+        """
+        result = self.collection.update_one(
+            {"_id": job["_id"], "lease_id": job["lease_id"]},
+            {"$set": {"status": DONE, "lease_id": None}},
+        )
+
+        return result.modified_count == 1
+
+    def fail(self, job: dict, error: Optional[str] = None) -> bool:
+        """
+        Marks a job as failed. The item is visible again right away, unless the maximum number of attempts was reached.
+
+        Parameters:
+            job (dict): A job returned by the lease method.
+            error (Optional[str]): Description of the error that happened while processing the item.
+        Returns:
+            bool: True if the lease was still owned by the job. False if not.
+        """
+        status = FAILED if job["attempts"] >= self.max_retries else PENDING
+        result = self.collection.update_one(
+            {"_id": job["_id"], "lease_id": job["lease_id"]},
+            {"$set": {"status": status, "lease_id": None, "visible_at": datetime.now(), "error": error}},
+        )
+
+        return result.modified_count == 1
+
+    def stats(self) -> dict:
+        """
+        Counts the items of the queue by status.
+
+        Returns:
+            dict: Number of items per status (pending, leased, done and failed).
+        """
+        counters = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for group in self.collection.aggregate([{"$group": {"_id": "$status", "total": {"$sum": 1}}}]):
+            counters[group["_id"]] = group["total"]
+
+        return counters
+
+
+class PyBrNewsLocalQueue:
+    """
+    pyBrNews Local Work Queue Class, backed by SQLite. Mirrors the PyBrNewsQueue methods for single node usage and
+    tests, without a MongoDB server.
+
+    By default, keeps the queue in memory. To persist it, pass a file path in the "db_path" attribute.
+    """
+    def __init__(self, db_path: str = ":memory:", visibility_timeout: int = 300, max_retries: int = 3) -> None:
+        self.visibility_timeout = visibility_timeout
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS queue ("
+            "key TEXT PRIMARY KEY, payload TEXT, platform TEXT, status TEXT, attempts INTEGER, "
+            "visible_at REAL, lease_id TEXT, created_at REAL, error TEXT)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS queue_visible ON queue (platform, status, visible_at)")
+
+    def enqueue(self, items: Iterable[Union[str, dict]], platform: str) -> int:
+        """
+        Adds the URLs / data dicts to the queue. Items already in the queue (same URL) are ignored.
+
+        Parameters:
+            items (Iterable[Union[str, dict]]): URLs or data dicts returned by the search_news method.
+            platform (str): Name of the crawler able to parse the items (e.g. "G1News").
+        Returns:
+            int: Number of new items added to the queue.
+        """
+        now = time.time()
+        rows = [
+            (job_key(item), json.dumps(item, ensure_ascii=False, default=str), platform, PENDING, now, now)
+            for item in items
+        ]
+
+        with self._lock:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO queue (key, payload, platform, status, attempts, visible_at, created_at) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?)",
+                rows,
+            )
+            inserted = self.connection.total_changes - before
+
+        logger.info(f"{inserted} of {len(rows)} items added to the local queue.")
+
+        return inserted
+
+    def lease(self, platform: str, max_items: int = 1, visibility_timeout: Optional[int] = None) -> List[dict]:
+        """
+        Leases up to max_items visible items of the given platform. Leased items are hidden from the other workers
+        until the visibility timeout expires.
+
+        Parameters:
+            platform (str): Name of the crawler able to parse the items (e.g. "G1News").
+            max_items (int): Maximum number of items to be leased.
+            visibility_timeout (Optional[int]): Seconds before the item is visible again. Defaults to the queue one.
+        Returns:
+            List[dict]: The leased jobs, containing the keys _id, payload, attempts and lease_id.
+        """
+        timeout = visibility_timeout if visibility_timeout is not None else self.visibility_timeout
+        now = time.time()
+
+        jobs = []
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute(
+                    "UPDATE queue SET status = ?, lease_id = NULL, error = ? WHERE platform = ? AND status = ? "
+                    "AND visible_at <= ? AND attempts >= ?",
+                    (FAILED, _EXPIRED_ERROR, platform, LEASED, now, self.max_retries),
+                )
+                rows = self.connection.execute(
+                    "SELECT key, payload, attempts FROM queue WHERE platform = ? AND status IN (?, ?) "
+                    "AND visible_at <= ? AND attempts < ? ORDER BY visible_at LIMIT ?",
+                    (platform, PENDING, LEASED, now, self.max_retries, max_items),
+                ).fetchall()
+
+                for key, payload, attempts in rows:
+                    lease_id = uuid.uuid4().hex
+                    self.connection.execute(
+                        "UPDATE queue SET status = ?, visible_at = ?, lease_id = ?, attempts = ? WHERE key = ?",
+                        (LEASED, now + timeout, lease_id, attempts + 1, key),
+                    )
+                    jobs.append({"_id": key, "payload": json.loads(payload), "attempts": attempts + 1,
+                                 "lease_id": lease_id})
+
+                self.connection.execute("COMMIT")
+            except sqlite3.Error:
+                self.connection.execute("ROLLBACK")
+                raise
+
+        return jobs
+
+    def _update_owned(self, job: dict, query: str, params: tuple) -> bool:
+        with self._lock:
+            cursor = self.connection.execute(f"{query} WHERE key = ? AND lease_id = ?",
+                                             params + (job["_id"], job["lease_id"]))
+
+        return cursor.rowcount == 1
+
+    def extend(self, job: dict, visibility_timeout: Optional[int] = None) -> bool:
+        """
+        Extends the lease of a job still being processed.
+
+        Parameters:
+            job (dict): A job returned by the lease method.
+            visibility_timeout (Optional[int]): Seconds before the item is visible again. Defaults to the queue one.
+        Returns:
+            bool: True if the lease is still owned by the job and was extended. False if not.
+        """
+        timeout = visibility_timeout if visibility_timeout is not None else self.visibility_timeout
+        return self._update_owned(job, "UPDATE queue SET visible_at = ?", (time.time() + timeout,))
+
+    def ack(self, job: dict) -> bool:
+        """
+        Acknowledges a job as processed, removing it from the visible items of the queue.
+
+        Parameters:
+            job (dict): A job returned by the lease method.
+        Returns:
+            bool: True if the lease was still owned by the job. False if it expired and was leased by another worker.
+        """
+        return self._update_owned(job, "UPDATE queue SET status = ?, lease_id = NULL", (DONE,))
+
+    def fail(self, job: dict, error: Optional[str] = None) -> bool:
+        """
+        Marks a job as failed. The item is visible again right away, unless the maximum number of attempts was reached.
+
+        Parameters:
+            job (dict): A job returned by the lease method.
+            error (Optional[str]): Description of the error that happened while processing the item.
+        Returns:
+            bool: True if the lease was still owned by the job. False if not.
+        """
+        status = FAILED if job["attempts"] >= self.max_retries else PENDING
+        return self._update_owned(
+            job, "UPDATE queue SET status = ?, lease_id = NULL, visible_at = ?, error = ?",
+            (status, time.time(), error),
+        )
+
+    def stats(self) -> dict:
+        """
+        Counts the items of the queue by status.
+
+        Returns:
+            dict: Number of items per status (pending, leased, done and failed).
+        """
+        counters = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self._lock:
+            for status, total in self.connection.execute("SELECT status, COUNT(*) FROM queue GROUP BY status"):
+                counters[status] = total
+
+        return counters
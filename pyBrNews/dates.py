@@ -0,0 +1,90 @@
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Optional
+
+UTC = timezone.utc
+BRT = timezone(timedelta(hours=-3), "BRT")
+
+_DATE_PATTERN = re.compile(
+    r"^\s*(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,6})\d*)?)?)?"
+    r"\s*(Z|[+-]\d{2}:?\d{2})?\s*$"
+)
+_BR_DATE_PATTERN = re.compile(r"^\s*(\d{2})[/.](\d{2})[/.](\d{4})(?:\D+(\d{1,2})[h:](\d{2}))?")
+
+
+def _parse_offset(raw_offset: str) -> tzinfo:
+    if raw_offset == "Z":
+        return UTC
+
+    sign = -1 if raw_offset[0] == "-" else 1
+    digits = raw_offset[1:].replace(":", "")
+    return timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+
+
+def _parse_slow(raw_date: str) -> Optional[datetime]:
+    match = _DATE_PATTERN.match(raw_date)
+    if match is not None:
+        year, month, day, hour, minute, second, fraction, offset = match.groups()
+        return datetime(
+            int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0),
+            int((fraction or "0").ljust(6, "0")), tzinfo=_parse_offset(offset) if offset else None,
+        )
+
+    match = _BR_DATE_PATTERN.match(raw_date)
+    if match is not None:
+        day, month, year, hour, minute = match.groups()
+        return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0))
+
+    return None
+
+
+@lru_cache(maxsize=65536)
+def parse_date(raw_date: Optional[str], assume_tz: tzinfo = UTC) -> Optional[datetime]:
+    """
+    Parses a date string from the platforms into a timezone-aware UTC datetime. Tries datetime.fromisoformat first
+    and falls back to precompiled patterns (other ISO variants and the Brazilian dd/mm/yyyy format). The results are
+    memoized, since the same timestamps repeat a lot in comment threads.
+
+    Parameters:
+        raw_date (Optional[str]): The date string, e.g. "2022-10-30T13:45:12.000Z" or "2022-10-30 10:45:12".
+        assume_tz (tzinfo): Timezone of the dates without an offset. Defaults to UTC.
+    Returns:
+        Optional[datetime]: The date converted to UTC. None if the string is empty or in an unknown format.
+    """
+    if not raw_date:
+        return None
+
+    try:
+        parsed_date = datetime.fromisoformat(raw_date[:-1] + "+00:00" if raw_date.endswith("Z") else raw_date)
+    except ValueError:
+        try:
+            parsed_date = _parse_slow(raw_date)
+        except ValueError:
+            return None
+        if parsed_date is None:
+            return None
+
+    if parsed_date.tzinfo is None:
+        parsed_date = parsed_date.replace(tzinfo=assume_tz)
+
+    return parsed_date.astimezone(UTC)
+
+
+def parse_local_date(raw_date: Optional[str], local_tz: tzinfo = BRT) -> Optional[datetime]:
+    """
+    Parses a date string from the platforms into a naive datetime in the local time of the platform, the format these
+    platforms (Folha, Exame) were always stored in, so the duplicate checks still match the articles already stored.
+
+    Parameters:
+        raw_date (Optional[str]): The date string, e.g. "2022-10-30 10:45:12".
+        local_tz (tzinfo): Local timezone of the platform, also assumed for the dates without an offset.
+            Defaults to Brasilia time (UTC-3).
+    Returns:
+        Optional[datetime]: The naive local date. None if the string is empty or in an unknown format.
+    """
+    parsed_date = parse_date(raw_date, assume_tz=local_tz)
+    if parsed_date is None:
+        return None
+
+    return parsed_date.astimezone(local_tz).replace(tzinfo=None)
@@ -0,0 +1,219 @@
+import hashlib
+import itertools
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from .config.database import PyBrNewsDB, PyBrNewsFS
+from .metrics import METRICS
+from .records import as_dict
+from .text import tokenize
+
+SIGNATURE_BITS = 64
+
+
+def _signed(signature: int) -> int:
+    # MongoDB and SQLite store signed 64-bit integers.
+    return signature - (1 << SIGNATURE_BITS) if signature >= 1 << (SIGNATURE_BITS - 1) else signature
+
+
+def _unsigned(signature: int) -> int:
+    return signature + (1 << SIGNATURE_BITS) if signature < 0 else signature
+
+
+def simhash(text: str, shingle_size: int = 3) -> Optional[int]:
+    """
+    Computes the 64-bit SimHash signature of a text over its word shingles. Texts sharing most of their shingles get
+    signatures differing in a few bits only.
+
+    Parameters:
+        text (str): The text of the article (e.g. title and body).
+        shingle_size (int): Number of words per shingle.
+    Returns:
+        Optional[int]: The signature. None if the text has no words.
+    """
+    words = tokenize(text)
+    if not words:
+        return None
+
+    shingles = {" ".join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))}
+    hashes = [
+        format(int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+        for shingle in shingles
+    ]
+
+    # Bit-wise majority vote: a bit is set when most of the shingle hashes have it set.
+    half = len(hashes) / 2
+    bits = "".join("1" if column.count("1") > half else "0" for column in zip(*hashes))
+    return int(bits, 2)
+
+
+class _MongoSignatureStore:
+    def __init__(self, database: PyBrNewsDB) -> None:
+        self.collection = database.db.get_collection(f"{database.collection.name}_simhash")
+
+    def load(self) -> Iterable[Tuple[str, int]]:
+        for document in self.collection.find({}, projection={"simhash": 1}, batch_size=1000):
+            yield document["_id"], _unsigned(document["simhash"])
+
+    def add(self, url: str, signature: int) -> None:
+        self.collection.update_one(
+            {"_id": url}, {"$set": {"simhash": _signed(signature), "entry_dt": datetime.now()}}, upsert=True
+        )
+
+
+class _SQLiteSignatureStore:
+    def __init__(self, path: str) -> None:
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS simhash (url TEXT PRIMARY KEY, simhash INTEGER)")
+
+    def load(self) -> Iterable[Tuple[str, int]]:
+        for url, signature in self.connection.execute("SELECT url, simhash FROM simhash"):
+            yield url, _unsigned(signature)
+
+    def add(self, url: str, signature: int) -> None:
+        self.connection.execute("INSERT OR REPLACE INTO simhash VALUES (?, ?)", (url, _signed(signature)))
+
+
+class NearDuplicateDetector:
+    """
+    pyBrNews Near Duplicate Detector Class. Finds articles whose title and body are nearly identical to an article
+    already seen, e.g. the same wire story published by several platforms under different URLs, which the URL and
+    date check of check_duplicates cannot catch.
+
+    Each article gets a 64-bit SimHash signature, split into bands for a locality-sensitive hashing (LSH) index. Two
+    signatures within max_distance bits of each other have at least one band differing in at most
+    max_distance // bands bits, so a lookup probes the buckets of each band value and its neighbours within that many
+    bits, and only compares the few articles found there. The signatures are persisted in the backend (a
+    "<collection>_simhash" collection for PyBrNewsDB, a pyBrNews_simhash.sqlite3 file in the save path for
+    PyBrNewsFS) and loaded into the in-memory index on creation.
+
+    Works as a NewsPipeline enricher: near duplicates are dropped, or flagged with the "near_duplicate_of" key
+    (URL of the first article) when action="flag".
+
+    Example:
+        pipeline.add_enricher(NearDuplicateDetector(backend=crawler.DB))
+    """
+    def __init__(self,
+                 backend: Union[PyBrNewsDB, PyBrNewsFS, None] = None,
+                 max_distance: int = 6,
+                 bands: int = 4,
+                 action: str = "drop") -> None:
+        if action not in ("drop", "flag"):
+            raise ValueError(f"An invalid near duplicate action [ {action} ] was supplied. Use \"drop\" or \"flag\".")
+        if SIGNATURE_BITS % bands != 0:
+            raise ValueError(f"The number of bands must divide the {SIGNATURE_BITS} signature bits.")
+
+        self.max_distance = max_distance
+        self.bands = bands
+        self.action = action
+        self._band_bits = SIGNATURE_BITS // bands
+        self._band_mask = (1 << self._band_bits) - 1
+        self._probes = [
+            sum(1 << bit for bit in bits)
+            for radius in range(max_distance // bands + 1)
+            for bits in itertools.combinations(range(self._band_bits), radius)
+        ]
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[int, List[Tuple[int, str]]] = {}
+        self._store: Optional[Union[_MongoSignatureStore, _SQLiteSignatureStore]] = None
+        if isinstance(backend, PyBrNewsDB):
+            self._store = _MongoSignatureStore(database=backend)
+        elif isinstance(backend, PyBrNewsFS):
+            self._store = _SQLiteSignatureStore(path=f"{backend.save_path}pyBrNews_simhash.sqlite3")
+
+        if self._store is not None:
+            loaded = 0
+            for url, signature in self._store.load():
+                self._index(url=url, signature=signature)
+                loaded += 1
+            logger.info(f"Near duplicate index loaded with {loaded} signatures.")
+
+    def _band_keys(self, signature: int) -> List[int]:
+        return [
+            (band << self._band_bits) | ((signature >> (band * self._band_bits)) & self._band_mask)
+            for band in range(self.bands)
+        ]
+
+    def _probe_keys(self, signature: int) -> Iterable[int]:
+        for key in self._band_keys(signature):
+            for probe in self._probes:
+                yield key ^ probe
+
+    def _index(self, url: str, signature: int) -> None:
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append((signature, url))
+
+    @staticmethod
+    def signature(parsed_data: dict) -> Optional[int]:
+        """
+        Computes the SimHash signature of an article from its title, abstract and body.
+
+        Parameters:
+            parsed_data (dict): Dictionary containing the parsed data from a news article.
+        Returns:
+            Optional[int]: The signature. None if the article has no text.
+        """
+        text = " ".join(parsed_data.get(field) or "" for field in ("title", "abstract", "body"))
+        return simhash(text)
+
+    def find(self, signature: int) -> Optional[str]:
+        """
+        Looks up the index for an article near the given signature.
+
+        Parameters:
+            signature (int): SimHash signature of the article.
+        Returns:
+            Optional[str]: URL of the nearest indexed article within max_distance bits. None if not found.
+        """
+        nearest, nearest_distance = None, self.max_distance + 1
+        for key in self._probe_keys(signature):
+            for candidate, url in self._buckets.get(key, ()):
+                distance = bin(candidate ^ signature).count("1")
+                if distance < nearest_distance:
+                    nearest, nearest_distance = url, distance
+
+        return nearest
+
+    def check(self, parsed_data: dict) -> Optional[str]:
+        """
+        Checks if an article is a near duplicate of an indexed one. If not, the article is added to the index.
+
+        Parameters:
+            parsed_data (dict): Dictionary containing the parsed data from a news article.
+        Returns:
+            Optional[str]: URL of the original article if the given one is a near duplicate. None if not.
+        """
+        parsed_data = as_dict(parsed_data)
+        signature = self.signature(parsed_data)
+        if signature is None:
+            return None
+
+        with self._lock:
+            original = self.find(signature)
+            if original is None or original == parsed_data["url"]:
+                if original is None:
+                    self._index(url=parsed_data["url"], signature=signature)
+                    if self._store is not None:
+                        self._store.add(url=parsed_data["url"], signature=signature)
+                return None
+
+        return original
+
+    def __call__(self, parsed_data: dict) -> Optional[dict]:
+        original = self.check(parsed_data)
+        if original is None:
+            return parsed_data
+
+        if METRICS.log_items:
+            logger.info(f"Near duplicate of {original} found: {parsed_data['url']}.")
+        if self.action == "drop":
+            return None
+
+        parsed_data = as_dict(parsed_data)
+        parsed_data["near_duplicate_of"] = original
+        return parsed_data
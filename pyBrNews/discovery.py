@@ -0,0 +1,229 @@
+import gzip
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, IO, Iterable, List, Optional
+from xml.etree.ElementTree import Element, ParseError, iterparse
+
+import requests
+from loguru import logger
+
+from .config.discovery_sources import discovery_config
+from .dates import UTC, parse_date
+from .metrics import METRICS
+
+
+def _local_name(tag: str) -> str:
+    # "{http://www.sitemaps.org/schemas/sitemap/0.9}loc" -> "loc"
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_feed_date(raw_date: Optional[str]) -> Optional[datetime]:
+    if not raw_date:
+        return None
+
+    parsed_date = parse_date(raw_date.strip())
+    if parsed_date is not None:
+        return parsed_date
+
+    # RSS dates are RFC 822, e.g. "Sun, 30 Oct 2022 10:45:12 -0300".
+    try:
+        parsed_date = parsedate_to_datetime(raw_date.strip())
+    except (TypeError, ValueError):
+        return None
+
+    return parsed_date.replace(tzinfo=parsed_date.tzinfo or UTC).astimezone(UTC)
+
+
+def _child_text(element: Element, name: str) -> Optional[str]:
+    for child in element:
+        if _local_name(child.tag) == name:
+            return child.text.strip() if child.text else child.get("href")
+
+    return None
+
+
+def iter_entries(source: IO[bytes]) -> Iterable[dict]:
+    """
+    Parses a sitemap, sitemap index, RSS or Atom document incrementally, yielding each entry as soon as its element
+    is closed and releasing it right after, so memory stays flat regardless of the document size.
+
+    Parameters:
+        source (IO[bytes]): The (streamed) XML document.
+    Returns:
+        Iterable[dict]: Per iteration -> The entry "kind" ("sitemap" for the child sitemaps of an index, "url" for
+                        the articles), "url", "lastmod" (UTC datetime or None), "title", "summary", "categories" and
+                        "guid".
+    """
+    parents: List[Element] = []
+    for event, element in iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+
+        parents.pop()
+        name = _local_name(element.tag)
+        if name not in ("sitemap", "url", "item", "entry"):
+            continue
+
+        if name in ("sitemap", "url"):
+            # Google News sitemaps keep the publication date and title in a <news:news> child.
+            news = next((child for child in element if _local_name(child.tag) == "news"), None)
+            lastmod = _child_text(element, "lastmod")
+            if lastmod is None and news is not None:
+                lastmod = _child_text(news, "publication_date")
+            entry = {
+                "kind": name,
+                "url": _child_text(element, "loc"),
+                "lastmod": _parse_feed_date(lastmod),
+                "title": _child_text(news, "title") if news is not None else None,
+                "summary": None,
+                "categories": [],
+                "guid": None,
+            }
+        else:
+            entry = {
+                "kind": "url",
+                "url": _child_text(element, "link"),
+                "lastmod": _parse_feed_date(
+                    _child_text(element, "pubDate") or _child_text(element, "updated")
+                    or _child_text(element, "published")
+                ),
+                "title": _child_text(element, "title"),
+                "summary": _child_text(element, "description") or _child_text(element, "summary"),
+                "categories": [
+                    child.text.strip() if child.text else child.get("term") for child in element
+                    if _local_name(child.tag) == "category" and (child.text or child.get("term"))
+                ],
+                "guid": _child_text(element, "guid") or _child_text(element, "id"),
+            }
+
+        element.clear()
+        if parents:
+            # Drops the processed entry from its parent too, or the parent would keep all of them.
+            parents[-1].remove(element)
+
+        if entry["url"]:
+            yield entry
+
+
+class NewsDiscovery:
+    """
+    pyBrNews Discovery Class, a URL source reading the sitemaps and RSS / Atom feeds of a platform instead of its
+    search result pages: a single streamed XML document lists hundreds of articles, with their modification dates.
+
+    The documents are downloaded with stream=True and parsed incrementally (iter_entries), so parsing starts with
+    the first bytes and the whole document is never held in memory. Entries (and child sitemaps of an index) not
+    modified since the given date are skipped, so frequent runs only pick up new and updated articles.
+
+    Used through the discover_news method of the crawlers, returning items ready for parse_news:
+
+    Example:
+        news_urls = crawler.discover_news(since=datetime(2024, 1, 1, tzinfo=UTC))
+        for news in crawler.parse_news(news_urls): ...
+    """
+    def __init__(self,
+                 session: requests.Session,
+                 sitemaps: Optional[List[str]] = None,
+                 feeds: Optional[List[str]] = None,
+                 url_filter: Optional[str] = None,
+                 timeout: float = 30.0) -> None:
+        """
+        Parameters:
+            session (requests.Session): The session of the crawler.
+            sitemaps (Optional[List[str]]): URLs of the sitemaps or sitemap indexes.
+            feeds (Optional[List[str]]): URLs of the RSS / Atom feeds.
+            url_filter (Optional[str]): Substring required in the article URLs, e.g. "g1.globo.com".
+            timeout (float): Timeout in seconds of each download.
+        """
+        self.session = session
+        self.sitemaps = sitemaps or []
+        self.feeds = feeds or []
+        self.url_filter = url_filter
+        self.timeout = timeout
+
+    @classmethod
+    def for_platform(cls, platform: str, session: requests.Session) -> "NewsDiscovery":
+        """
+        Builds the discovery of a crawler from its sources in discovery_sources.discovery_config.
+
+        Parameters:
+            platform (str): Class name of the crawler, e.g. "G1News".
+            session (requests.Session): The session of the crawler.
+        Returns:
+            NewsDiscovery: The discovery of the platform.
+        """
+        if platform not in discovery_config.keys():
+            raise ValueError(f"No sitemaps or feeds are configured for the platform [ {platform} ].")
+
+        return cls(session=session, **discovery_config[platform])
+
+    def _stream(self, url: str) -> Iterable[dict]:
+        try:
+            start = time.perf_counter()
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    logger.warning(f"Discovery source {url} returned the HTTP status {response.status_code}.")
+                    return
+
+                response.raw.decode_content = True
+                source = response.raw
+                if url.endswith(".gz") or response.headers.get("Content-Type", "").startswith("application/x-gzip"):
+                    source = gzip.GzipFile(fileobj=response.raw)
+
+                entries = 0
+                try:
+                    for entry in iter_entries(source):
+                        entries += 1
+                        yield entry
+                finally:
+                    METRICS.observe_bytes(url=response.url, size=response.raw.tell())
+
+                logger.info(f"{entries} entries read from {url} in {time.perf_counter() - start:.2f} seconds.")
+        except ParseError:
+            logger.warning(f"Discovery source {url} is not a valid XML document.")
+        except requests.exceptions.RequestException:
+            METRICS.observe_retry(url=url)
+            logger.warning(f"Error while downloading the discovery source {url}.")
+
+    def _sitemap_entries(self, url: str, since: Optional[datetime]) -> Iterable[dict]:
+        for entry in self._stream(url):
+            if since is not None and entry["lastmod"] is not None and entry["lastmod"] < since:
+                continue
+
+            if entry["kind"] == "sitemap":
+                yield from self._sitemap_entries(url=entry["url"], since=since)
+            else:
+                yield entry
+
+    def discover(self, since: Optional[datetime] = None, max_urls: int = -1) -> Iterable[dict]:
+        """
+        Streams the article entries of the feeds and then of the sitemaps, without repeated URLs.
+
+        Parameters:
+            since (Optional[datetime]): Only the entries modified at or after this date (entries without a date are
+                                        kept). Naive dates are assumed to be UTC. If not set, all the entries.
+            max_urls (int): Maximum number of entries. If not set, all of them.
+        Returns:
+            Iterable[dict]: Per iteration -> The article entry, as yielded by iter_entries.
+        """
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+
+        seen: Dict[str, None] = {}
+        sources = [self._stream(url) for url in self.feeds]
+        sources += [self._sitemap_entries(url=url, since=since) for url in self.sitemaps]
+        for entries in sources:
+            for entry in entries:
+                if entry["kind"] != "url" or entry["url"] in seen.keys():
+                    continue
+                if self.url_filter is not None and self.url_filter not in entry["url"]:
+                    continue
+                if since is not None and entry["lastmod"] is not None and entry["lastmod"] < since:
+                    continue
+
+                seen[entry["url"]] = None
+                yield entry
+
+                if len(seen) == max_urls:
+                    return
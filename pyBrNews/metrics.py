@@ -0,0 +1,312 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets, in the Prometheus format.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Dict[str, int]:
+        totals = {}
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            totals["+Inf" if bound == float("inf") else repr(bound)] = running
+
+        return totals
+
+    def to_dict(self) -> dict:
+        return {"buckets": self.cumulative(), "sum": round(self.sum, 6), "count": self.count}
+
+
+class CrawlMetrics:
+    """
+    pyBrNews Metrics Class, collecting the crawl counters shared by all the crawlers and database backends of the
+    process: per-host request latency, downloaded bytes, retries and aborted downloads, parse time per extracted field,
+    database write latency and duplicate check hit rate.
+
+    The metrics can be exported in the Prometheus text format (to_prometheus) or as JSON snapshots, written
+    periodically with start_snapshots.
+
+    Collection can be disabled with the environment variable PYBRNEWS_METRICS=0, and the per-item log lines
+    (per article / per URL) with PYBRNEWS_ITEM_LOGS=0 or set_item_logging(False).
+    """
+    def __init__(self) -> None:
+        self.enabled = os.environ.get("PYBRNEWS_METRICS", "1") != "0"
+        self.log_items = os.environ.get("PYBRNEWS_ITEM_LOGS", "1") != "0"
+
+        self._lock = threading.Lock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_stop = threading.Event()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clears all the collected metrics.
+        """
+        with self._lock:
+            self.request_latency: Dict[str, Histogram] = {}
+            self.requests: Dict[Tuple[str, int], int] = {}
+            self.downloaded_bytes: Dict[str, int] = {}
+            self.retries: Dict[str, int] = {}
+            self.aborted: Dict[Tuple[str, str], int] = {}
+            self.parse_time: Dict[str, Histogram] = {}
+            self.db_write_latency = Histogram()
+            self.db_write_errors = 0
+            self.dedup_checks = 0
+            self.dedup_hits = 0
+            self.started_at = datetime.now()
+
+    def set_item_logging(self, enabled: bool) -> None:
+        """
+        Enables or disables the log lines emitted per article / URL. Summary and error lines are always logged.
+
+        Parameters:
+            enabled (bool): True to log each item, False to only log the summaries.
+        """
+        self.log_items = enabled
+
+    def observe_request(self, url: str, seconds: float, size: int, status_code: int) -> None:
+        if not self.enabled:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            self.request_latency.setdefault(host, Histogram()).observe(seconds)
+            self.requests[(host, status_code)] = self.requests.get((host, status_code), 0) + 1
+            self.downloaded_bytes[host] = self.downloaded_bytes.get(host, 0) + size
+
+    def observe_bytes(self, url: str, size: int) -> None:
+        if not self.enabled:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            self.downloaded_bytes[host] = self.downloaded_bytes.get(host, 0) + size
+
+    def observe_retry(self, url: str) -> None:
+        if not self.enabled:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            self.retries[host] = self.retries.get(host, 0) + 1
+
+    def observe_abort(self, url: str, reason: str) -> None:
+        if not self.enabled:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            self.aborted[(host, reason)] = self.aborted.get((host, reason), 0) + 1
+
+    def observe_parse(self, field: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self.parse_time.setdefault(field, Histogram()).observe(seconds)
+
+    def observe_db_write(self, seconds: float, error: bool = False) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self.db_write_latency.observe(seconds)
+            if error:
+                self.db_write_errors += 1
+
+    def observe_dedup(self, duplicated: bool) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self.dedup_checks += 1
+            if duplicated:
+                self.dedup_hits += 1
+
+    def response_hook(self, response, *args, **kwargs) -> None:
+        """
+        Requests response hook, recording the latency, size and status of each response of a session. Installed by
+        instrument_session. The body of a streamed response is not read yet, so its size is recorded by the reader
+        (observe_bytes), with the bytes actually read.
+        """
+        size = 0 if kwargs.get("stream") else len(response.content)
+
+        self.observe_request(url=response.url, seconds=response.elapsed.total_seconds(), size=size,
+                             status_code=response.status_code)
+
+    def instrument_session(self, session) -> None:
+        """
+        Adds the metrics response hook to a requests / requests_html session.
+
+        Parameters:
+            session (requests.Session): The session used by a crawler.
+        """
+        if self.response_hook not in session.hooks["response"]:
+            session.hooks["response"].append(self.response_hook)
+
+    def timed_field(self, field: str) -> Callable:
+        """
+        Decorator recording the execution time of an extractor under the given field name.
+
+        Parameters:
+            field (str): Name of the extracted field (e.g. "title").
+        """
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe_parse(field=field, seconds=time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def snapshot(self) -> dict:
+        """
+        Returns the current metrics as a JSON serializable dictionary.
+
+        Returns:
+            dict: All the collected metrics, with the collection start and snapshot times.
+        """
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(),
+                "snapshot_at": datetime.now().isoformat(),
+                "requests": {
+                    host: {
+                        "latency": histogram.to_dict(),
+                        "bytes": self.downloaded_bytes.get(host, 0),
+                        "retries": self.retries.get(host, 0),
+                        "status": {str(status): total for (h, status), total in self.requests.items() if h == host},
+                    }
+                    for host, histogram in self.request_latency.items()
+                },
+                "retries": dict(self.retries),
+                "aborted": {
+                    host: {reason: total for (h, reason), total in self.aborted.items() if h == host}
+                    for host in {h for h, _ in self.aborted.keys()}
+                },
+                "parse_time": {field: histogram.to_dict() for field, histogram in self.parse_time.items()},
+                "db_write": dict(self.db_write_latency.to_dict(), errors=self.db_write_errors),
+                "dedup": {
+                    "checks": self.dedup_checks, "hits": self.dedup_hits,
+                    "hit_rate": round(self.dedup_hits / self.dedup_checks, 4) if self.dedup_checks else 0.0,
+                },
+            }
+
+    @staticmethod
+    def _prometheus_histogram(name: str, histograms: Dict[str, Histogram], label: Optional[str]) -> list:
+        lines = [f"# TYPE {name} histogram"]
+        for label_value, histogram in histograms.items():
+            labels = f'{label}="{label_value}",' if label is not None else ""
+            for bound, total in histogram.cumulative().items():
+                lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {total}')
+            labels = f'{{{labels.rstrip(",")}}}' if labels else ""
+            lines.append(f"{name}_sum{labels} {histogram.sum}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+        return lines
+
+    def to_prometheus(self) -> str:
+        """
+        Exports the current metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        with self._lock:
+            lines = self._prometheus_histogram("pybrnews_request_seconds", self.request_latency, "host")
+            lines.append("# TYPE pybrnews_requests_total counter")
+            lines += [f'pybrnews_requests_total{{host="{host}",status="{status}"}} {total}'
+                      for (host, status), total in self.requests.items()]
+            lines.append("# TYPE pybrnews_downloaded_bytes_total counter")
+            lines += [f'pybrnews_downloaded_bytes_total{{host="{host}"}} {total}'
+                      for host, total in self.downloaded_bytes.items()]
+            lines.append("# TYPE pybrnews_retries_total counter")
+            lines += [f'pybrnews_retries_total{{host="{host}"}} {total}' for host, total in self.retries.items()]
+            lines.append("# TYPE pybrnews_aborted_downloads_total counter")
+            lines += [f'pybrnews_aborted_downloads_total{{host="{host}",reason="{reason}"}} {total}'
+                      for (host, reason), total in self.aborted.items()]
+            lines += self._prometheus_histogram("pybrnews_parse_seconds", self.parse_time, "field")
+            lines += self._prometheus_histogram("pybrnews_db_write_seconds", {"": self.db_write_latency}, None)
+            lines.append("# TYPE pybrnews_db_write_errors_total counter")
+            lines.append(f"pybrnews_db_write_errors_total {self.db_write_errors}")
+            lines.append("# TYPE pybrnews_dedup_checks_total counter")
+            lines.append(f"pybrnews_dedup_checks_total {self.dedup_checks}")
+            lines.append("# TYPE pybrnews_dedup_hits_total counter")
+            lines.append(f"pybrnews_dedup_hits_total {self.dedup_hits}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, file_path: str) -> None:
+        """
+        Writes the current metrics snapshot as a JSON file.
+
+        Parameters:
+            file_path (str): Path of the JSON file to be (over)written.
+        """
+        with open(file_path, mode="w", encoding="utf-8") as json_file:
+            json.dump(self.snapshot(), json_file, ensure_ascii=False, indent=4)
+
+    def start_snapshots(self, file_path: str, interval: float = 60) -> None:
+        """
+        Starts a background thread writing a JSON snapshot of the metrics every interval seconds.
+
+        Parameters:
+            file_path (str): Path of the JSON file to be (over)written.
+            interval (float): Seconds between two snapshots.
+        """
+        def write_periodically() -> None:
+            while not self._snapshot_stop.wait(timeout=interval):
+                try:
+                    self.write_snapshot(file_path=file_path)
+                except OSError:
+                    logger.error(f"An error occurred while writing the metrics snapshot to {file_path}.")
+
+        self.stop_snapshots()
+        self._snapshot_stop.clear()
+        self._snapshot_thread = threading.Thread(target=write_periodically, daemon=True,
+                                                 name="pyBrNews-metrics-snapshot")
+        self._snapshot_thread.start()
+
+    def stop_snapshots(self) -> None:
+        """
+        Stops the periodic JSON snapshots, if started.
+        """
+        if self._snapshot_thread is not None:
+            self._snapshot_stop.set()
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+
+
+METRICS = CrawlMetrics()
@@ -1,17 +1,56 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional, List, Union, Iterable
+from typing import Any, Callable, Dict, Optional, List, Union, Iterable, Tuple
 
 import requests.exceptions
 import urllib3.exceptions
+from loguru import logger
 from requests_html import HTMLSession, HTML
 
+from ..changes import ChangeTracker
 from ..config.database import PyBrNewsDB, PyBrNewsFS
+from ..config.renderer import PyBrNewsRenderer
+from ..config.work_queue import PyBrNewsQueue, PyBrNewsLocalQueue
+from ..discovery import NewsDiscovery
+from ..metrics import METRICS
+from ..profiling import CrawlProfiler
+from ..records import NewsRecord
+
+NEWS_FIELDS = ("title", "abstract", "date", "section", "region", "url", "platform", "tags", "type", "body", "id_data",
+               "html")
 
 
 class Crawler(ABC):
-    def __init__(self, use_database: bool = True) -> None:
+    # Fields extracted from the URL / data dict returned by search_news, without downloading the article page.
+    _ITEM_FIELDS: Tuple[str, ...] = ("url", "platform")
+    # Fields extracted from the <head> of the article page, which is all that is downloaded when only these (and the
+    # item fields) are requested.
+    _HEAD_FIELDS: Tuple[str, ...] = ()
+
+    # Downloads larger than this (e.g. galleries or video pages) or of other content types are aborted.
+    MAX_RESPONSE_BYTES = 8 * 1024 * 1024
+    HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+    def __init__(self, use_database: bool = True, profile: Optional[bool] = None,
+                 renderer: Optional[PyBrNewsRenderer] = None) -> None:
+        """
+        Base class of the news crawlers.
+
+        Parameters:
+            use_database (bool): Defines if the MongoDB database (PyBrNewsDB) or the file system (PyBrNewsFS) is used.
+            profile (Optional[bool]): Defines if the fetch, parse and store phases are profiled in each crawl run. If
+                                      not set, uses the environment variable PYBRNEWS_PROFILE.
+            renderer (Optional[PyBrNewsRenderer]): Browser pool rendering the article pages that need JavaScript,
+                                                   following the rules of the platform in render_rules. If not set,
+                                                   all the pages are downloaded with plain HTTP.
+        """
         self.SESSION = HTMLSession()
+        self.PROFILER = CrawlProfiler(enabled=profile)
+        self.RENDERER = renderer
+        self.CHANGES: Optional[ChangeTracker] = None
+        METRICS.instrument_session(self.SESSION)
+        # Articles skipped as already stored or not modified, telling them apart from the failed downloads.
+        self.skipped_duplicates = 0
 
         self.DB: Union[PyBrNewsDB, PyBrNewsFS]
         if not use_database:
@@ -29,7 +68,9 @@ class Crawler(ABC):
     def parse_news(self,
                    news_urls: List[Union[str, dict]],
                    parse_body: bool = False,
-                   save_html: bool = True) -> Iterable[dict]:
+                   save_html: bool = True,
+                   compact: bool = False,
+                   fields: Optional[List[str]] = None) -> Iterable[Union[dict, NewsRecord]]:
         """
         Extracts all the data from the article in a given news platform by iterating over a URL list. Yields a
         dictionary containing all the parsed data from the article.
@@ -38,8 +79,13 @@ class Crawler(ABC):
             news_urls (List[str]): A list containing all the URLs or a data dict to be parsed from a given platform.
             parse_body (bool): Defines if the article body will be extracted.
             save_html (bool): Defines if the HTML bytes from the article will be extracted.
+            compact (bool): Defines if a compact NewsRecord is yielded instead of the dictionary.
+            fields (Optional[List[str]]): Projection of the parsed data, e.g. ["title", "date"]. Only the extractors
+                                          of these fields run (plus the URL), and the article page is not downloaded
+                                          when all of them come from the search data. If not set, all the fields are
+                                          extracted, following parse_body and save_html.
         Returns:
-             Iterable[dict]: Dictionary containing all the article parsed data.
+             Iterable[Union[dict, NewsRecord]]: Dictionary (or NewsRecord) containing all the article parsed data.
         """
         pass
 
@@ -60,6 +106,358 @@ class Crawler(ABC):
         """
         pass
 
+    @abstractmethod
+    def _fetch_article(self, news_item: Union[str, dict], head_only: bool = False) -> Optional[HTML]:
+        """
+        Downloads the article page of a given URL or data dict returned by search_news.
+
+        Parameters:
+             news_item (Union[str, dict]): The URL or data dict of the news article.
+             head_only (bool): Defines if the download stops at the end of the <head> of the page (see _head_only).
+        Returns:
+            Optional[HTML]: A HTML object containing the data from the news article page. None if not available.
+        """
+        pass
+
+    @abstractmethod
+    def _parse_article(self,
+                       news_item: Union[str, dict],
+                       article_page: HTML,
+                       parse_body: bool = False,
+                       save_html: bool = True,
+                       fields: Optional[Tuple[str, ...]] = None) -> dict:
+        """
+        Extracts all the data from a downloaded news article page, calling the _extract methods of the platform.
+
+        Parameters:
+             news_item (Union[str, dict]): The URL or data dict of the news article.
+             article_page (HTML): A HTML object containing the data from the news article page. May be None when
+                                  only the fields of the news item are requested.
+             parse_body (bool): Defines if the article body will be extracted.
+             save_html (bool): Defines if the HTML bytes from the article will be extracted.
+             fields (Optional[Tuple[str, ...]]): Projection returned by _select_fields. If not set, all the fields.
+        Returns:
+            dict: Dictionary containing all the article parsed data.
+        """
+        pass
+
+    @staticmethod
+    def _select_fields(fields: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+        """
+        Validates a projection of the parsed data, always including the URL (used to check for duplicates).
+
+        Parameters:
+            fields (Optional[List[str]]): The requested fields, e.g. ["title", "date"].
+        Returns:
+            Optional[Tuple[str, ...]]: The fields to be extracted, in the requested order. None for all the fields.
+        """
+        if fields is None:
+            return None
+
+        unknown = [field for field in fields if field not in NEWS_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown news fields: {', '.join(unknown)}. Available: {', '.join(NEWS_FIELDS)}.")
+
+        return tuple(dict.fromkeys(("url", *fields)))
+
+    def _item_fields(self, news_item: Union[str, dict, None] = None) -> Tuple[str, ...]:
+        """
+        Returns the fields that can be extracted from a news item without downloading its article page.
+
+        Parameters:
+            news_item (Union[str, dict, None]): The URL or data dict of the news article.
+        Returns:
+            Tuple[str, ...]: The fields available in the news item.
+        """
+        return self._ITEM_FIELDS
+
+    def _needs_page(self,
+                    fields: Optional[Tuple[str, ...]],
+                    parse_body: bool = False,
+                    save_html: bool = True,
+                    news_item: Union[str, dict, None] = None) -> bool:
+        """
+        Checks if the article page must be downloaded to extract the given projection.
+
+        Parameters:
+            fields (Optional[Tuple[str, ...]]): Projection returned by _select_fields. If not set, all the fields,
+                                                with the body and the HTML following parse_body and save_html.
+            parse_body (bool): Defines if the article body will be extracted.
+            save_html (bool): Defines if the HTML bytes from the article will be extracted.
+            news_item (Union[str, dict, None]): The URL or data dict of the news article.
+        Returns:
+            bool: False if all the fields come from the URL / data dict of the news item. True if not.
+        """
+        if fields is None:
+            fields = tuple(
+                field for field in NEWS_FIELDS if (field != "body" or parse_body) and (field != "html" or save_html)
+            )
+
+        item_fields = self._item_fields(news_item=news_item)
+        return any(field not in item_fields for field in fields)
+
+    def _head_only(self,
+                   fields: Optional[Tuple[str, ...]],
+                   news_item: Union[str, dict, None] = None) -> bool:
+        """
+        Checks if the <head> of the article page is enough to extract the given projection, e.g. in metadata crawls.
+
+        Parameters:
+            fields (Optional[Tuple[str, ...]]): Projection returned by _select_fields. If not set, all the fields.
+            news_item (Union[str, dict, None]): The URL or data dict of the news article.
+        Returns:
+            bool: True if all the fields come from the news item or the <head> of the page. False if not.
+        """
+        if fields is None:
+            return False
+
+        item_fields = self._item_fields(news_item=news_item)
+        return all(field in item_fields or field in self._HEAD_FIELDS for field in fields)
+
+    def track_changes(self, tracker: Optional[ChangeTracker] = None) -> ChangeTracker:
+        """
+        Enables the change detection of re-crawled articles: the article pages are downloaded with conditional GETs,
+        and the articles already tracked are not yielded again, their edits being written as new versions instead.
+
+        Parameters:
+            tracker (Optional[ChangeTracker]): The tracker to be used. If not set, a tracker persisted in the crawler
+                                               database / file system.
+        Returns:
+            ChangeTracker: The tracker in use.
+        """
+        self.CHANGES = tracker if tracker is not None else ChangeTracker(backend=self.DB)
+        return self.CHANGES
+
+    def _is_duplicated(self, parsed_news: dict) -> bool:
+        """
+        Checks if a parsed article must not be stored: already tracked by the change tracker (changed or not), or
+        already in the database (see check_duplicates).
+
+        Parameters:
+            parsed_news (dict): Dictionary containing the parsed data from a news article.
+        Returns:
+            bool: True if the article must be skipped. False if not.
+        """
+        if self.CHANGES is not None and self.CHANGES.track(parsed_data=parsed_news) != "new":
+            self.skipped_duplicates += 1
+            return True
+
+        duplicated = self.DB.check_duplicates(parsed_data=parsed_news)
+        if duplicated:
+            self.skipped_duplicates += 1
+            if self.CHANGES is not None:
+                # Stored before the tracking started: tracked from now on.
+                self.CHANGES.confirm(parsed_data=parsed_news)
+
+        return duplicated
+
+    def _stream_page(self, url: str, head_only: bool = False, conditional: bool = False,
+                     **kwargs) -> Tuple[requests.Response, Optional[bytes]]:
+        """
+        Downloads a page in chunks, aborting as soon as it is known to be unwanted: a content type other than HTML
+        or a body larger than MAX_RESPONSE_BYTES (by its Content-Length or while reading). With head_only, stops
+        reading at the end of the <head>, so the size of the rest of the page does not matter. The session errors
+        are raised to the retry loops of the callers.
+
+        Parameters:
+            url (str): The URL of the page.
+            head_only (bool): Defines if the download stops at the end of the <head> of the page.
+            conditional (bool): Defines if the validators of the change tracker are sent (article pages only). A 304
+                                response has no bytes.
+            **kwargs: Other arguments of the session get method (e.g. params).
+        Returns:
+            Tuple[requests.Response, Optional[bytes]]: The (closed) response, for its status and URL, and the page
+                                                       bytes. The bytes are None if the download was aborted.
+        """
+        conditional = conditional and self.CHANGES is not None
+        if conditional:
+            kwargs["headers"] = dict(kwargs.get("headers") or {}, **self.CHANGES.request_headers(url=url))
+
+        body = bytearray()
+        with self.SESSION.get(url, stream=True, **kwargs) as response:
+            try:
+                if conditional and self.CHANGES.observe_response(url=url, response=response):
+                    self.skipped_duplicates += 1
+                    return response, None
+
+                content_type = response.headers.get("Content-Type", "text/html").split(";")[0].strip().lower()
+                if content_type not in self.HTML_CONTENT_TYPES:
+                    METRICS.observe_abort(url=url, reason="content_type")
+                    logger.warning(f"Download of {url} aborted: content type {content_type} is not HTML.")
+                    return response, None
+
+                content_length = response.headers.get("Content-Length", "")
+                if not head_only and content_length.isdigit() and int(content_length) > self.MAX_RESPONSE_BYTES:
+                    METRICS.observe_abort(url=url, reason="size")
+                    logger.warning(f"Download of {url} aborted: {content_length} bytes is over the size limit.")
+                    return response, None
+
+                for chunk in response.iter_content(chunk_size=16 * 1024 if head_only else 64 * 1024):
+                    body += chunk
+                    if len(body) > self.MAX_RESPONSE_BYTES:
+                        METRICS.observe_abort(url=url, reason="size")
+                        logger.warning(f"Download of {url} aborted: over the {self.MAX_RESPONSE_BYTES} B size limit.")
+                        return response, None
+
+                    if head_only:
+                        # Looks for the end of the <head> in the new chunk, including a tag split with the previous one.
+                        window = bytes(body[-(len(chunk) + 6):]).lower()
+                        if b"</head>" in window or b"<body" in window:
+                            break
+            finally:
+                METRICS.observe_bytes(url=response.url, size=len(body))
+
+        return response, bytes(body)
+
+    @staticmethod
+    def _project(extractors: Dict[str, Callable[[], Any]],
+                 fields: Optional[Tuple[str, ...]],
+                 parse_body: bool,
+                 save_html: bool) -> dict:
+        """
+        Builds the parsed data dictionary calling only the extractors of the requested fields.
+
+        Parameters:
+            extractors (Dict[str, Callable[[], Any]]): Extractor of each field in NEWS_FIELDS, in order.
+            fields (Optional[Tuple[str, ...]]): Projection returned by _select_fields. If not set, all the fields,
+                                                with the body and the HTML following parse_body and save_html.
+            parse_body (bool): Defines if the article body will be extracted.
+            save_html (bool): Defines if the HTML bytes from the article will be extracted.
+        Returns:
+            dict: Dictionary containing the article parsed data.
+        """
+        if fields is not None:
+            return {field: extractors[field]() for field in fields}
+
+        skipped = {field for field, enabled in (("body", parse_body), ("html", save_html)) if not enabled}
+        return {field: None if field in skipped else extractor() for field, extractor in extractors.items()}
+
+    def _render_page(self, url: str) -> Optional[HTML]:
+        """
+        Renders an article page in the browser pool when a rendering rule of the platform matches its URL.
+
+        Parameters:
+            url (str): The URL of the news article.
+        Returns:
+            Optional[HTML]: A HTML object containing the rendered page. None if the URL must be downloaded with plain
+                            HTTP (no renderer, no matching rule or rendering error).
+        """
+        if self.RENDERER is None:
+            return None
+
+        rule = self.RENDERER.rule(platform=type(self).__name__, url=url)
+        if rule is None:
+            return None
+
+        return self.RENDERER.render(url=url, wait_xpath=rule[1])
+
+    def _discovered_item(self, entry: dict) -> Union[str, dict, None]:
+        """
+        Converts an entry of a sitemap / feed into the item expected by parse_news (the URL, by default).
+
+        Parameters:
+            entry (dict): The article entry yielded by NewsDiscovery.discover.
+        Returns:
+            Union[str, dict, None]: The URL or data dict of the news article. None to skip the entry.
+        """
+        return entry["url"]
+
+    def discover_news(self,
+                      since: Optional[datetime] = None,
+                      max_urls: int = -1) -> List[Union[str, dict]]:
+        """
+        Extracts the URLs / data of the latest articles from the sitemaps and RSS feeds of the news platform (see
+        discovery_sources), a cheaper alternative to search_news for crawling everything recently published.
+
+        Parameters:
+            since (Optional[datetime]): Only the articles published / modified at or after this date.
+                                        If not set, all the articles listed.
+            max_urls (int): Maximum number of URLs / data to be returned. If not set, all of them.
+        Returns:
+             List[Union[str, dict]]: List containing all the URLs / data found, to be passed to parse_news.
+        """
+        discovery = NewsDiscovery.for_platform(platform=type(self).__name__, session=self.SESSION)
+
+        news_urls = []
+        for entry in discovery.discover(since=since):
+            item = self._discovered_item(entry=entry)
+            if item is None:
+                continue
+
+            news_urls.append(item)
+            if len(news_urls) == max_urls:
+                break
+
+        logger.success(
+            f"News discovered successfully! A total of {len(news_urls)} articles have been found."
+        )
+
+        return news_urls
+
+    def enqueue_news(self,
+                     queue: Union[PyBrNewsQueue, PyBrNewsLocalQueue],
+                     keywords: List[str],
+                     max_pages: int = -1) -> int:
+        """
+        Searches the news platform for the given keywords and adds the URLs / data found to a shared work queue,
+        to be parsed by the workers calling consume_queue.
+
+        Parameters:
+            queue (Union[PyBrNewsQueue, PyBrNewsLocalQueue]): The work queue shared by the crawler nodes.
+            keywords (List[str]): A list containing all the keywords to be searched in the news platform.
+            max_pages (int): Number of pages to have the articles URLs extracted from.
+                             If not set, will catch until the last possible.
+        Returns:
+            int: Number of new items added to the queue.
+        """
+        items = self.search_news(keywords=keywords, max_pages=max_pages)
+        return queue.enqueue(items=items, platform=type(self).__name__)
+
+    def consume_queue(self,
+                      queue: Union[PyBrNewsQueue, PyBrNewsLocalQueue],
+                      parse_body: bool = False,
+                      save_html: bool = True,
+                      batch_size: int = 10,
+                      fields: Optional[List[str]] = None) -> Iterable[dict]:
+        """
+        Leases items of this platform from a shared work queue, parses them and acknowledges each one after its data
+        has been yielded, or when it was skipped as a duplicate. Items that raise an error or yield nothing (e.g. the
+        download failed) are returned to the queue to be retried. Stops when there are no visible items left.
+
+        Parameters:
+            queue (Union[PyBrNewsQueue, PyBrNewsLocalQueue]): The work queue shared by the crawler nodes.
+            parse_body (bool): Defines if the article body will be extracted.
+            save_html (bool): Defines if the HTML bytes from the article will be extracted.
+            batch_size (int): Number of items leased at once.
+            fields (Optional[List[str]]): Projection of the parsed data. If not set, all the fields are extracted.
+        Returns:
+             Iterable[dict]: Dictionary containing all the article parsed data.
+        """
+        platform = type(self).__name__
+        while True:
+            jobs = queue.lease(platform=platform, max_items=batch_size)
+            if len(jobs) == 0:
+                break
+
+            for job in jobs:
+                skipped_duplicates, parsed = self.skipped_duplicates, 0
+                try:
+                    for parsed_news in self.parse_news(news_urls=[job["payload"]], parse_body=parse_body,
+                                                       save_html=save_html, fields=fields):
+                        parsed += 1
+                        yield parsed_news
+                except Exception as e:
+                    logger.error(f"Error while parsing the queue item {job['_id']}. Returning it to the queue.")
+                    queue.fail(job=job, error=repr(e))
+                    continue
+
+                if parsed == 0 and self.skipped_duplicates == skipped_duplicates:
+                    logger.warning(f"The queue item {job['_id']} could not be downloaded. Returning it to the queue.")
+                    queue.fail(job=job, error="The item could not be downloaded.")
+                    continue
+
+                queue.ack(job=job)
+
     @staticmethod
     @abstractmethod
     def _extract_title(article_page: HTML) -> Optional[str]:
@@ -1,35 +1,50 @@
 import time
 from datetime import datetime
 from itertools import count
-from typing import Optional, List, Iterable
+from typing import Optional, List, Iterable, Union, Tuple
+from urllib.parse import urlsplit
 
 from loguru import logger
 from requests_html import HTML
 
 from .crawler import Crawler
+from ..config.renderer import PyBrNewsRenderer
+from ..dates import parse_local_date
+from ..metrics import METRICS
+from ..records import NewsRecord
+from ..text import extract_body
 
 XPATH_DATA = {
     'news_abstract': '//meta[@property="og:description"]/@content|//meta[@name="description"]/@content',
-    'news_body': '//div[@id="news-body"]',
+    'news_body': ('//div[@id="news-body"]//*[self::p or self::h2 or self::h3 or self::li]'
+                  '[not(ancestor::p) and not(ancestor::li)]'),
     'news_type': '//meta[@property="og:type"]/@content',
 }
 
 
 class ExameNews(Crawler):
-    def __init__(self, use_database: bool = True) -> None:
-        super().__init__(use_database=use_database)
+    _ITEM_FIELDS = ("title", "date", "section", "region", "url", "platform", "tags", "id_data")
+    _HEAD_FIELDS = ("abstract", "type")
+
+    def __init__(self, use_database: bool = True, profile: Optional[bool] = None,
+                 renderer: Optional[PyBrNewsRenderer] = None) -> None:
+        super().__init__(use_database=use_database, profile=profile, renderer=renderer)
 
         self._SEARCH_API = "https://content-api.exame.com/api/xm/wp/v2/news"
 
-    def _get_article(self, article_url: str) -> Optional[HTML]:
+    def _get_article(self, article_url: str, head_only: bool = False) -> Optional[HTML]:
         for _ in range(100):
             try:
-                response = self.SESSION.get(url=article_url)
-                if response.status_code == 200:
-                    html_data = HTML(html=response.content, url=article_url)
+                response, content = self._stream_page(url=article_url, head_only=head_only, conditional=True)
+                if response.status_code in (200, 304):
+                    if content is None:
+                        return None
+
+                    html_data = HTML(html=content, url=article_url)
                     return html_data
 
             except self._ERRORS:
+                METRICS.observe_retry(url=article_url)
                 logger.warning(
                     f"Error while getting article with URL: {article_url}."
                 )
@@ -56,6 +71,7 @@ class ExameNews(Crawler):
                 search_data = response.json()
                 return search_data
             except self._ERRORS:
+                METRICS.observe_retry(url=self._SEARCH_API)
                 logger.warning(
                     f"Exame servers are trying to break the capture. Waiting 5 seconds before retrying."
                 )
@@ -65,6 +81,7 @@ class ExameNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("title")
     def _extract_title(article_data: dict) -> Optional[str]:
         title = article_data['title']
         if title is not None:
@@ -73,6 +90,7 @@ class ExameNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("abstract")
     def _extract_abstract(article_page: HTML) -> Optional[str]:
         abstract = article_page.xpath(XPATH_DATA['news_abstract'], first=True)
         if abstract is not None:
@@ -81,23 +99,27 @@ class ExameNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("date")
     def _extract_date(article_data: dict) -> Optional[datetime]:
         raw_date = article_data['date']
         if raw_date is not None:
-            published_date = datetime.strptime(raw_date, "%Y-%m-%dT%H:%M:%S")
+            published_date = parse_local_date(raw_date)
             return published_date
 
         return None
 
     @staticmethod
+    @METRICS.timed_field("section")
     def _extract_section(article_data: dict) -> Optional[str]:
-        section = article_data['categories_data'][0]['name']
+        categories = article_data['categories_data']
+        section = categories[0]['name'] if categories else None
         if section is not None:
             return section
 
         return None
 
     @staticmethod
+    @METRICS.timed_field("tags")
     def _extract_tags(article_data: dict) -> Optional[str]:
         tags = [tag['name'] for tag in article_data['categories_data']]
         if tags is not None:
@@ -107,6 +129,7 @@ class ExameNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("type")
     def _extract_type(article_page: HTML) -> Optional[str]:
         news_type = article_page.xpath(XPATH_DATA['news_type'], first=True)
         if news_type is not None:
@@ -114,20 +137,22 @@ class ExameNews(Crawler):
 
         return None
 
+    @METRICS.timed_field("region")
     def _extract_region(self, article_page: HTML) -> Optional[str]:
         region = None
         return region
 
     @staticmethod
+    @METRICS.timed_field("body")
     def _extract_body(article_page: HTML) -> Optional[str]:
-        article_body = article_page.xpath(XPATH_DATA['news_body'], first=True)
-        if article_body is not None:
-            body = article_body.full_text
+        body = extract_body(article_page=article_page, xpath=XPATH_DATA['news_body'])
+        if body is not None:
             return body
 
         return None
 
     @staticmethod
+    @METRICS.timed_field("id_data")
     def _extract_id(article_data: dict) -> Optional[int]:
         news_id = article_data['id']
         if news_id is not None:
@@ -135,46 +160,98 @@ class ExameNews(Crawler):
 
         return None
 
-    def parse_news(self, news_urls: List[dict], parse_body: bool = False, save_html: bool = True) -> Iterable[dict]:
-        parsed_counter = 0
-        for i, article_data in enumerate(news_urls):
-            if article_data is None:
-                continue
-
-            url = article_data['link']
-            if 'exame.com' not in url:
-                continue
-
-            page = self._get_article(article_url=url)
-            logger.info(f"Article {i+1} >> Parsing data at {datetime.now()}.")
-
-            parsed_news = {
-                'title': self._extract_title(article_data=article_data),
-                'abstract': self._extract_abstract(article_page=page),
-                'date': self._extract_date(article_data=article_data),
-                'section': self._extract_section(article_data=article_data),
-                'region':  self._extract_region(article_page=page),
-                'url': url,
-                'platform': 'Exame',
-                'tags': self._extract_tags(article_data=article_data),
-                'type': self._extract_type(article_page=page),
-                'body': self._extract_body(article_page=page),
-                'id_data': self._extract_id(article_data=article_data),
-                'html': page.raw_html if save_html else None,
-            }
-
-            if self.DB.check_duplicates(parsed_data=parsed_news):
-                continue
-
-            parsed_counter += 1
-            logger.success(f"Article {i + 1} >> Data parsed successfully!.")
-
-            yield parsed_news
+    def _discovered_item(self, entry: dict) -> Optional[dict]:
+        # Mirrors the fields of the search API items used by the extractors. The post ID comes from the WordPress
+        # GUID (".../?p=123") and the section falls back to the first segment of the URL path.
+        guid = entry.get("guid") or ""
+        categories = entry["categories"] or [urlsplit(entry["url"]).path.strip('/').split('/')[0]]
+        return {
+            'id': int(guid.rsplit('p=', 1)[1]) if 'p=' in guid and guid.rsplit('p=', 1)[1].isdigit() else None,
+            'link': entry["url"],
+            'title': entry["title"],
+            'date': entry["lastmod"].isoformat() if entry["lastmod"] is not None else None,
+            'categories_data': [{'id': None, 'name': category} for category in categories if category],
+        }
 
-        logger.success(
-            f"All the data have been parsed successfully! "
-            f"{parsed_counter} of {len(news_urls)} news had the data extracted."
-        )
+    def _fetch_article(self, news_item: dict, head_only: bool = False) -> Optional[HTML]:
+        if news_item is None or 'exame.com' not in news_item['link']:
+            return None
+
+        rendered_page = self._render_page(url=news_item['link'])
+        if rendered_page is not None:
+            return rendered_page
+
+        return self._get_article(article_url=news_item['link'], head_only=head_only)
+
+    def _parse_article(self, news_item: dict, article_page: HTML, parse_body: bool = False,
+                       save_html: bool = True,
+                       fields: Optional[Tuple[str, ...]] = None) -> dict:
+        extractors = {
+            'title': lambda: self._extract_title(article_data=news_item),
+            'abstract': lambda: self._extract_abstract(article_page=article_page),
+            'date': lambda: self._extract_date(article_data=news_item),
+            'section': lambda: self._extract_section(article_data=news_item),
+            'region': lambda: self._extract_region(article_page=article_page),
+            'url': lambda: news_item['link'],
+            'platform': lambda: 'Exame',
+            'tags': lambda: self._extract_tags(article_data=news_item),
+            'type': lambda: self._extract_type(article_page=article_page),
+            'body': lambda: self._extract_body(article_page=article_page),
+            'id_data': lambda: self._extract_id(article_data=news_item),
+            'html': lambda: article_page.raw_html,
+        }
+
+        return self._project(extractors=extractors, fields=fields, parse_body=parse_body, save_html=save_html)
+
+    def parse_news(self, news_urls: List[dict], parse_body: bool = False, save_html: bool = True,
+                   compact: bool = False, fields: Optional[List[str]] = None) -> Iterable[Union[dict, NewsRecord]]:
+        fields = self._select_fields(fields)
+        needs_page = self._needs_page(fields=fields, parse_body=parse_body, save_html=save_html)
+        head_only = self._head_only(fields=fields)
+        parsed_counter = 0
+        self.PROFILER.start()
+        try:
+            for i, article_data in enumerate(news_urls):
+                if article_data is None:
+                    continue
+
+                url = article_data['link']
+                if 'exame.com' not in url:
+                    continue
+
+                page = None
+                if needs_page:
+                    with self.PROFILER.phase("fetch"):
+                        page = self._fetch_article(news_item=article_data, head_only=head_only)
+                if METRICS.log_items:
+                    logger.info(f"Article {i+1} >> Parsing data at {datetime.now()}.")
+                if needs_page and page is None:
+                    continue
+
+                with self.PROFILER.phase("parse"):
+                    parsed_news = self._parse_article(news_item=article_data, article_page=page, parse_body=parse_body,
+                                                      save_html=save_html, fields=fields)
+
+                with self.PROFILER.phase("dedup"):
+                    duplicated = self._is_duplicated(parsed_news=parsed_news)
+                if duplicated:
+                    continue
+
+                parsed_counter += 1
+                if METRICS.log_items:
+                    logger.success(f"Article {i + 1} >> Data parsed successfully!.")
+
+                # The consumer stores the article (e.g. insert_data) before resuming the crawl.
+                with self.PROFILER.phase("store"):
+                    yield NewsRecord(**parsed_news) if compact else parsed_news
+
+            logger.success(
+                f"All the data have been parsed successfully! "
+                f"{parsed_counter} of {len(news_urls)} news had the data extracted."
+            )
+        finally:
+            self.PROFILER.stop()
+            self.PROFILER.log_report()
 
     def search_news(self, keywords: list, max_pages: int = -1) -> List[dict]:
         articles = []
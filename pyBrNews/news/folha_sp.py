@@ -1,14 +1,18 @@
-import re
 import time
 from datetime import datetime
 from itertools import count
-from typing import Optional, List, Iterable
+from typing import Optional, List, Iterable, Union, Tuple
 from urllib.parse import unquote
 
 from loguru import logger
 from requests_html import HTML
 
 from .crawler import Crawler
+from ..config.renderer import PyBrNewsRenderer
+from ..dates import parse_local_date
+from ..metrics import METRICS
+from ..records import NewsRecord
+from ..text import extract_body
 
 XPATH_DATA = {
     'news_title': '//h1[@class="c-content-head__title"]/text()|//h1[@itemprop="headline"]/text()|'
@@ -16,7 +20,7 @@ XPATH_DATA = {
     'news_date': '//meta[@property="article:published_time"]/@content|//time[@itemprop="datePublished"]/@datetime',
     'news_abstract': '//h2[@class="c-content-head__subtitle"]/text()|//h2[@itemprop="alternativeHeadline"]/text()|'
                      '//meta[@property="og:description"]/@content',
-    'news_body': '//div[@itemprop="articleBody"]//p/text()|//div[@class="c-news__body"]//p/text()',
+    'news_body': '//div[@itemprop="articleBody"]//p|//div[@class="c-news__body"]//p',
     'news_section': '//meta[@property="article:section"]/@content',
     'news_region': '//strong[@class="c-signature__location"]//text()|'
                    '//div[@class="c-signature c-signature--left"]//text()',
@@ -27,20 +31,27 @@ XPATH_DATA = {
 
 
 class FolhaNews(Crawler):
-    def __init__(self, use_database: bool = True) -> None:
-        super().__init__(use_database=use_database)
+    _HEAD_FIELDS = ("title", "abstract", "date", "section", "tags", "type")
+
+    def __init__(self, use_database: bool = True, profile: Optional[bool] = None,
+                 renderer: Optional[PyBrNewsRenderer] = None) -> None:
+        super().__init__(use_database=use_database, profile=profile, renderer=renderer)
 
         self._SEARCH_API = "https://search.folha.uol.com.br/?q={}&site=todos"
 
-    def _make_request(self, target_url: str) -> Optional[HTML]:
+    def _make_request(self, target_url: str, head_only: bool = False, conditional: bool = False) -> Optional[HTML]:
         for _ in range(100):
             try:
-                response = self.SESSION.get(url=target_url)
-                if response.status_code == 200:
-                    html_data = HTML(html=response.content, url=response.url)
+                response, content = self._stream_page(url=target_url, head_only=head_only, conditional=conditional)
+                if response.status_code in (200, 304):
+                    if content is None:
+                        return None
+
+                    html_data = HTML(html=content, url=response.url)
                     return html_data
 
             except self._ERRORS:
+                METRICS.observe_retry(url=target_url)
                 logger.warning(
                     f"Folha de São Paulo servers are trying to break the capture. Waiting 5 seconds before retrying."
                 )
@@ -50,6 +61,7 @@ class FolhaNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("title")
     def _extract_title(article_page: HTML) -> Optional[str]:
         title = article_page.xpath(XPATH_DATA['news_title'], first=True)
         if title is not None:
@@ -58,6 +70,7 @@ class FolhaNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("abstract")
     def _extract_abstract(article_page: HTML) -> Optional[str]:
         abstract = article_page.xpath(XPATH_DATA['news_abstract'], first=True)
         if abstract is not None:
@@ -66,15 +79,17 @@ class FolhaNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("date")
     def _extract_date(article_page: HTML) -> Optional[datetime]:
         raw_date = article_page.xpath(XPATH_DATA['news_date'], first=True)
         if raw_date is not None:
-            published_date = datetime.strptime(raw_date, "%Y-%m-%d %H:%M:%S")
+            published_date = parse_local_date(raw_date)
             return published_date
 
         return None
 
     @staticmethod
+    @METRICS.timed_field("section")
     def _extract_section(article_page: HTML) -> Optional[str]:
         section = article_page.xpath(XPATH_DATA['news_section'], first=True)
         if section is not None:
@@ -82,6 +97,7 @@ class FolhaNews(Crawler):
 
         return None
 
+    @METRICS.timed_field("region")
     def _extract_region(self, article_page: HTML) -> Optional[str]:
         region = article_page.xpath(XPATH_DATA['news_region'], first=True)
         if region is not None:
@@ -90,6 +106,7 @@ class FolhaNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("tags")
     def _extract_tags(article_page: HTML) -> Optional[str]:
         tags = article_page.xpath(XPATH_DATA['news_tags'], first=True)
         if tags is not None:
@@ -98,6 +115,7 @@ class FolhaNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("type")
     def _extract_type(article_data: HTML) -> Optional[str]:
         news_type = article_data.xpath(XPATH_DATA['news_type'], first=True)
         if news_type is not None:
@@ -106,16 +124,16 @@ class FolhaNews(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("body")
     def _extract_body(article_page: HTML) -> Optional[str]:
-        article_body = article_page.xpath(XPATH_DATA['news_body'])
-        if article_body is not None:
-            body = ' '.join(article_body)
-            re.sub(r"\s{2,}", body, "")
+        body = extract_body(article_page=article_page, xpath=XPATH_DATA['news_body'])
+        if body is not None:
             return body
 
         return None
 
     @staticmethod
+    @METRICS.timed_field("id_data")
     def _extract_id_data(article_page: HTML) -> Optional[dict]:
         try:
             news_id = dict(article_page.xpath(XPATH_DATA['news_id'], first=True).attrs)
@@ -138,42 +156,81 @@ class FolhaNews(Crawler):
 
         return None
 
-    def parse_news(self, news_urls: list, parse_body: bool = False, save_html: bool = True) -> Iterable[dict]:
-        parsed_counter = 0
-        for i, url in enumerate(news_urls):
-            if '1.folha.uol.com.br' not in url:
-                continue
-
-            page = self._make_request(target_url=url)
-            logger.info(f"Article {i+1} >> Parsing data at {datetime.now()}.")
-
-            parsed_news = {
-                'title': self._extract_title(article_page=page),
-                'abstract': self._extract_abstract(article_page=page),
-                'date': self._extract_date(article_page=page),
-                'section': self._extract_section(article_page=page),
-                'region':  self._extract_region(article_page=page),
-                'url': url,
-                'platform': 'Folha de São Paulo',
-                'tags': self._extract_tags(article_page=page),
-                'type': self._extract_type(article_data=page),
-                'body': self._extract_body(article_page=page),
-                'id_data': self._extract_id_data(article_page=page),
-                'html': page.raw_html if save_html else None,
-            }
-
-            if self.DB.check_duplicates(parsed_data=parsed_news):
-                continue
-
-            parsed_counter += 1
-            logger.success(f"Article {i + 1} >> Data parsed successfully!.")
-
-            yield parsed_news
+    def _fetch_article(self, news_item: str, head_only: bool = False) -> Optional[HTML]:
+        if '1.folha.uol.com.br' not in news_item:
+            return None
 
-        logger.success(
-            f"All the data have been parsed successfully! "
-            f"{parsed_counter} of {len(news_urls)} news had the data extracted."
-        )
+        rendered_page = self._render_page(url=news_item)
+        if rendered_page is not None:
+            return rendered_page
+
+        return self._make_request(target_url=news_item, head_only=head_only, conditional=True)
+
+    def _parse_article(self, news_item: str, article_page: HTML, parse_body: bool = False,
+                       save_html: bool = True,
+                       fields: Optional[Tuple[str, ...]] = None) -> dict:
+        extractors = {
+            'title': lambda: self._extract_title(article_page=article_page),
+            'abstract': lambda: self._extract_abstract(article_page=article_page),
+            'date': lambda: self._extract_date(article_page=article_page),
+            'section': lambda: self._extract_section(article_page=article_page),
+            'region': lambda: self._extract_region(article_page=article_page),
+            'url': lambda: news_item,
+            'platform': lambda: 'Folha de São Paulo',
+            'tags': lambda: self._extract_tags(article_page=article_page),
+            'type': lambda: self._extract_type(article_data=article_page),
+            'body': lambda: self._extract_body(article_page=article_page),
+            'id_data': lambda: self._extract_id_data(article_page=article_page),
+            'html': lambda: article_page.raw_html,
+        }
+
+        return self._project(extractors=extractors, fields=fields, parse_body=parse_body, save_html=save_html)
+
+    def parse_news(self, news_urls: list, parse_body: bool = False, save_html: bool = True,
+                   compact: bool = False, fields: Optional[List[str]] = None) -> Iterable[Union[dict, NewsRecord]]:
+        fields = self._select_fields(fields)
+        needs_page = self._needs_page(fields=fields, parse_body=parse_body, save_html=save_html)
+        head_only = self._head_only(fields=fields)
+        parsed_counter = 0
+        self.PROFILER.start()
+        try:
+            for i, url in enumerate(news_urls):
+                if '1.folha.uol.com.br' not in url:
+                    continue
+
+                page = None
+                if needs_page:
+                    with self.PROFILER.phase("fetch"):
+                        page = self._fetch_article(news_item=url, head_only=head_only)
+                if METRICS.log_items:
+                    logger.info(f"Article {i+1} >> Parsing data at {datetime.now()}.")
+                if needs_page and page is None:
+                    continue
+
+                with self.PROFILER.phase("parse"):
+                    parsed_news = self._parse_article(news_item=url, article_page=page, parse_body=parse_body,
+                                                      save_html=save_html, fields=fields)
+
+                with self.PROFILER.phase("dedup"):
+                    duplicated = self._is_duplicated(parsed_news=parsed_news)
+                if duplicated:
+                    continue
+
+                parsed_counter += 1
+                if METRICS.log_items:
+                    logger.success(f"Article {i + 1} >> Data parsed successfully!.")
+
+                # The consumer stores the article (e.g. insert_data) before resuming the crawl.
+                with self.PROFILER.phase("store"):
+                    yield NewsRecord(**parsed_news) if compact else parsed_news
+
+            logger.success(
+                f"All the data have been parsed successfully! "
+                f"{parsed_counter} of {len(news_urls)} news had the data extracted."
+            )
+        finally:
+            self.PROFILER.stop()
+            self.PROFILER.log_report()
 
     def search_news(self, keywords: list, max_pages: int = -1) -> List[str]:
         news_urls = []
@@ -1,35 +1,74 @@
 import json
-import re
 from datetime import datetime
 from itertools import count
-from typing import List, Iterable, Optional
+from typing import List, Iterable, Optional, Union, Tuple
 from urllib.parse import unquote
 
 from loguru import logger
 from requests_html import HTML
 
 from .crawler import Crawler
+from ..config.renderer import PyBrNewsRenderer
+from ..metrics import METRICS
+from ..records import NewsRecord
+from ..text import extract_body
 from ..config import g1_api
+from ..dates import parse_date
 
 XPATH_DATA = {
     'news_title': '//div[@class="title"]/h1/text()|//meta[@name="title"]/@content|//head/title/text()',
     'news_date': '//time[@itemprop="datePublished"]/@datetime',
     'news_abstract': '//h2[@class="content-head__subtitle"]/text()|//meta[@name="description"]/@content',
-    'news_body': '//div[@class="mc-article-body"]//p/text()',
+    'news_body': '//div[@class="mc-article-body"]//p',
     'news_section': '//div[@class="header-title-content"]/a/text()',
     'news_tags': '//ul[@class="entities__list"]//a/text()'
 }
 
 
 class G1News(Crawler):
-    def __init__(self, use_database: bool = True) -> None:
-        super().__init__(use_database=use_database)
+    _ITEM_FIELDS = ("url", "platform", "region", "type", "id_data")
+    _HEAD_FIELDS = ("title", "abstract")
+    _PAGE_FIELDS = ("title", "abstract", "date", "section", "tags", "body", "html")
+
+    def __init__(self, use_database: bool = True, profile: Optional[bool] = None,
+                 renderer: Optional[PyBrNewsRenderer] = None) -> None:
+        super().__init__(use_database=use_database, profile=profile, renderer=renderer)
 
         self._API_CONFIG = g1_api.news_config
         self._NEWS_API = self._API_CONFIG['api_url']['news_engine']
         self._SEARCH_API = self._API_CONFIG['api_url']['search_engine']
 
-    def _retrieve_news_by_region(self, regions: list, max_pages: int = -1) -> Iterable[str]:
+    def _build_metadata(self, content: dict, item: Optional[dict] = None) -> dict:
+        """
+        Builds the parsed data dictionary of an article from its falkor API payload, without downloading the article
+        page. The tags, body and HTML are only available in the page and are left empty.
+
+        Parameters:
+            content (dict): The falkor API content of the article, containing its URL, title, summary and section.
+            item (Optional[dict]): The falkor API item of the content, containing the publication date. If not set,
+                                   the date is read from the content.
+        Returns:
+            dict: Dictionary containing the article metadata.
+        """
+        url = str(content['url'])
+        dates = item if item is not None else content
+        return {
+            'title': content.get('title'),
+            'abstract': content.get('summary'),
+            'date': parse_date(dates.get('publication') or dates.get('created')),
+            'section': content.get('section'),
+            'region': self._extract_region(article_url=url),
+            'url': url,
+            'platform': 'Portal G1',
+            'tags': None,
+            'type': self._extract_type(article_url=url),
+            'body': None,
+            'id_data': None,
+            'html': None,
+        }
+
+    def _retrieve_news_by_region(self, regions: list, max_pages: int = -1,
+                                 metadata: bool = False) -> Iterable[Union[str, dict]]:
         for region in regions:
             for i in count():
                 try:
@@ -43,23 +82,26 @@ class G1News(Crawler):
                     try:
                         url = str(item['content']['url']) if ('materia' in item['type']) else None
                         if url is not None:
-                            logger.success(
-                                f"URL from G1 {region.upper()} retrieved successfully! Item added to list: {url}"
-                            )
-                            yield url
+                            if METRICS.log_items:
+                                logger.success(
+                                    f"URL from G1 {region.upper()} retrieved successfully! Item added to list: {url}"
+                                )
+                            yield self._build_metadata(content=item['content'], item=item) if metadata else url
                     except KeyError:
                         for article in item['content']['posts']:
                             url = article['url']
                             if url is not None:
-                                logger.success(
-                                    f"URL from G1 {region.upper()} retrieved successfully! Item added to list: {url}"
-                                )
-                                yield url
+                                if METRICS.log_items:
+                                    logger.success(
+                                        f"URL from G1 {region.upper()} retrieved successfully! "
+                                        f"Item added to list: {url}"
+                                    )
+                                yield self._build_metadata(content=article) if metadata else url
 
                 if i+1 == max_pages:
                     break
 
-    def _retrieve_news_brazil(self, max_pages: int = -1) -> Iterable[str]:
+    def _retrieve_news_brazil(self, max_pages: int = -1, metadata: bool = False) -> Iterable[Union[str, dict]]:
         for i in count():
             try:
                 page = self.SESSION.get(
@@ -70,65 +112,153 @@ class G1News(Crawler):
 
             for item in page['items']:
                 try:
-                    url = item['content']['url'] if ('materia' in item['type']) else ()
+                    url = item['content']['url'] if ('materia' in item['type']) else None
                     if url is not None:
-                        logger.success(f"URL from G1 retrieved successfully! Item added to list: {url}")
-                        yield url
+                        if METRICS.log_items:
+                            logger.success(f"URL from G1 retrieved successfully! Item added to list: {url}")
+                        yield self._build_metadata(content=item['content'], item=item) if metadata else url
                 except KeyError:
                     for article in item['content']['posts']:
                         url = article['url']
                         if url is not None:
-                            logger.success(
-                                f"URL from G1 retrieved successfully! Item added to list: {url}"
-                            )
-                            yield url
+                            if METRICS.log_items:
+                                logger.success(
+                                    f"URL from G1 retrieved successfully! Item added to list: {url}"
+                                )
+                            yield self._build_metadata(content=article) if metadata else url
 
             if i+1 == max_pages:
                 break
 
-    def retrieve_latest_news(self, regions: list = None, max_pages: int = -1) -> List[str]:
+    def retrieve_latest_news(self, regions: list = None, max_pages: int = -1,
+                             metadata: bool = False) -> List[Union[str, dict]]:
+        """
+        Retrieves the latest news of G1 from the falkor API, in Brazil or in the given regions.
+
+        Parameters:
+            regions (list): Regions to retrieve the news from, e.g. ["sp", "rj"]. If not set, the news from Brazil.
+            max_pages (int): Number of API pages to be retrieved. If not set, will catch until the last possible.
+            metadata (bool): Defines if the parsed data dictionaries are built from the API payload (title, abstract,
+                             date, section, region and type) instead of returning only the URLs. Passed to parse_news,
+                             the article pages are then only downloaded when the body or the HTML are requested (or the
+                             tags, in an explicit projection). Otherwise, the tags are None.
+        Returns:
+            List[Union[str, dict]]: The URLs or the metadata dictionaries of the latest news.
+        """
         news_urls = []
         if regions is None:
-            news_urls = [url for url in self._retrieve_news_brazil(max_pages=max_pages)]
+            news_urls = [url for url in self._retrieve_news_brazil(max_pages=max_pages, metadata=metadata)]
 
         if regions is not None:
-            news_urls = [url for url in self._retrieve_news_by_region(regions=regions, max_pages=max_pages)]
+            news_urls = [
+                url for url in self._retrieve_news_by_region(regions=regions, max_pages=max_pages, metadata=metadata)
+            ]
 
         return news_urls
 
-    def parse_news(self, news_urls: List[str], parse_body: bool = False, save_html: bool = True) -> Iterable[dict]:
+    def _item_fields(self, news_item: Union[str, dict, None] = None) -> Tuple[str, ...]:
+        if isinstance(news_item, dict):
+            # Fields missing from the API payload (e.g. the tags, always None) are extracted from the article page.
+            return tuple(dict.fromkeys(
+                (*self._ITEM_FIELDS, *(field for field, value in news_item.items() if value is not None))
+            ))
+
+        return self._ITEM_FIELDS
+
+    def _needs_page(self,
+                    fields: Optional[Tuple[str, ...]],
+                    parse_body: bool = False,
+                    save_html: bool = True,
+                    news_item: Union[str, dict, None] = None) -> bool:
+        if fields is None and isinstance(news_item, dict):
+            # The API metadata covers the default projection, but for the tags (always None): not worth a download.
+            return parse_body or save_html
+
+        return super()._needs_page(fields=fields, parse_body=parse_body, save_html=save_html, news_item=news_item)
+
+    def _fetch_article(self, news_item: Union[str, dict], head_only: bool = False) -> Optional[HTML]:
+        url = news_item['url'] if isinstance(news_item, dict) else news_item
+        rendered_page = self._render_page(url=url)
+        if rendered_page is not None:
+            return rendered_page
+
+        response, content = self._stream_page(url=url, head_only=head_only, conditional=True)
+        if content is None:
+            return None
+
+        return HTML(html=content, url=response.url)
+
+    def _parse_article(self, news_item: Union[str, dict], article_page: Optional[HTML], parse_body: bool = False,
+                       save_html: bool = True,
+                       fields: Optional[Tuple[str, ...]] = None) -> dict:
+        url = news_item['url'] if isinstance(news_item, dict) else news_item
+        extractors = {
+            'title': lambda: self._extract_title(article_page=article_page),
+            'abstract': lambda: self._extract_abstract(article_page=article_page),
+            'date': lambda: self._extract_date(article_page=article_page),
+            'section': lambda: self._extract_section(article_page=article_page),
+            'region': lambda: self._extract_region(article_url=url),
+            'url': lambda: url,
+            'platform': lambda: 'Portal G1',
+            'tags': lambda: self._extract_tags(article_data=article_page),
+            'type': lambda: self._extract_type(article_url=url),
+            'body': lambda: self._extract_body(article_page=article_page),
+            'id_data': lambda: None,
+            'html': lambda: article_page.raw_html,
+        }
+        if article_page is None:
+            # Not downloaded: the page fields missing from the metadata are left empty.
+            extractors.update({field: (lambda: None) for field in self._PAGE_FIELDS})
+        if isinstance(news_item, dict):
+            extractors.update({
+                field: (lambda value=value: value) for field, value in news_item.items()
+                if field in extractors and (article_page is None or value is not None)
+            })
+
+        return self._project(extractors=extractors, fields=fields, parse_body=parse_body, save_html=save_html)
+
+    def parse_news(self, news_urls: List[Union[str, dict]], parse_body: bool = False, save_html: bool = True,
+                   compact: bool = False, fields: Optional[List[str]] = None) -> Iterable[Union[dict, NewsRecord]]:
+        fields = self._select_fields(fields)
         parsed_counter = 0
-        for i, url in enumerate(news_urls):
-            logger.info(f"Article {i+1} >> Parsing data at {datetime.now()}.")
-            page = self.SESSION.get(url).html
-
-            parsed_news = {
-                'title': self._extract_title(article_page=page),
-                'abstract': self._extract_abstract(article_page=page),
-                'date': self._extract_date(article_page=page),
-                'section': self._extract_section(article_page=page),
-                'region': self._extract_region(article_url=url),
-                'url': url,
-                'platform': 'Portal G1',
-                'tags': self._extract_tags(article_data=page),
-                'type': self._extract_type(article_url=url),
-                'body': self._extract_body(article_page=page),
-                'id_data': None,
-                'html': page.raw_html if save_html else None,
-            }
-
-            if self.DB.check_duplicates(parsed_data=parsed_news):
-                continue
-
-            parsed_counter += 1
-            logger.success(f"Article {i + 1} >> Data parsed successfully!.")
-
-            yield parsed_news
-
-        logger.success(
-            f"All the data have been parsed successfully! "
-            f"{parsed_counter} of {len(news_urls)} news had the data extracted."
-        )
+        self.PROFILER.start()
+        try:
+            for i, news_item in enumerate(news_urls):
+                if METRICS.log_items:
+                    logger.info(f"Article {i+1} >> Parsing data at {datetime.now()}.")
+                page = None
+                if self._needs_page(fields=fields, parse_body=parse_body, save_html=save_html, news_item=news_item):
+                    with self.PROFILER.phase("fetch"):
+                        page = self._fetch_article(
+                            news_item=news_item, head_only=self._head_only(fields=fields, news_item=news_item)
+                        )
+                    if page is None:
+                        continue
+
+                with self.PROFILER.phase("parse"):
+                    parsed_news = self._parse_article(news_item=news_item, article_page=page, parse_body=parse_body,
+                                                      save_html=save_html, fields=fields)
+
+                with self.PROFILER.phase("dedup"):
+                    duplicated = self._is_duplicated(parsed_news=parsed_news)
+                if duplicated:
+                    continue
+
+                parsed_counter += 1
+                if METRICS.log_items:
+                    logger.success(f"Article {i + 1} >> Data parsed successfully!.")
+
+                # The consumer stores the article (e.g. insert_data) before resuming the crawl.
+                with self.PROFILER.phase("store"):
+                    yield NewsRecord(**parsed_news) if compact else parsed_news
+
+            logger.success(
+                f"All the data have been parsed successfully! "
+                f"{parsed_counter} of {len(news_urls)} news had the data extracted."
+            )
+        finally:
+            self.PROFILER.stop()
+            self.PROFILER.log_report()
 
     def search_news(self, keywords: List[str], max_pages: int = -1) -> List[str]:
         news_urls = []
@@ -154,6 +284,7 @@ class G1News(Crawler):
         return news_urls
 
     @staticmethod
+    @METRICS.timed_field("title")
     def _extract_title(article_page: HTML) -> Optional[str]:
         title = article_page.xpath(XPATH_DATA['news_title'], first=True)
         if title is not None:
@@ -162,6 +293,7 @@ class G1News(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("abstract")
     def _extract_abstract(article_page: HTML) -> Optional[str]:
         abstract = article_page.xpath(XPATH_DATA['news_abstract'], first=True)
         if abstract is not None:
@@ -170,18 +302,17 @@ class G1News(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("date")
     def _extract_date(article_page: HTML) -> Optional[datetime]:
         raw_date = article_page.xpath(XPATH_DATA['news_date'], first=True)
         if raw_date is not None:
-            try:
-                published_date = datetime.strptime(raw_date, "%Y-%m-%dT%H:%M:%S.%fZ")
-                return published_date
-            except ValueError:
-                return None
+            published_date = parse_date(raw_date)
+            return published_date
 
         return None
 
     @staticmethod
+    @METRICS.timed_field("section")
     def _extract_section(article_page: HTML) -> Optional[str]:
         section = article_page.xpath(XPATH_DATA['news_section'], first=True)
         if section is not None:
@@ -189,6 +320,7 @@ class G1News(Crawler):
 
         return None
 
+    @METRICS.timed_field("region")
     def _extract_region(self, article_url: str) -> Optional[str]:
         region = article_url.split('/')[3]
         if region in self._API_CONFIG['regions'].keys():
@@ -198,6 +330,7 @@ class G1News(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("tags")
     def _extract_tags(article_data: HTML) -> Optional[str]:
         tags = article_data.xpath(XPATH_DATA['news_tags'], first=True)
         if tags is not None:
@@ -206,6 +339,7 @@ class G1News(Crawler):
         return None
 
     @staticmethod
+    @METRICS.timed_field("type")
     def _extract_type(article_url: str) -> Optional[str]:
         if "video" in article_url:
             news_type = "Video"
@@ -215,11 +349,10 @@ class G1News(Crawler):
         return news_type
 
     @staticmethod
+    @METRICS.timed_field("body")
     def _extract_body(article_page: HTML) -> Optional[str]:
-        article_body = article_page.xpath(XPATH_DATA['news_body'])
-        if article_body is not None:
-            body = ' '.join(article_body)
-            re.sub(r"(\s{2,})|(\n)+", body, "")
+        body = extract_body(article_page=article_page, xpath=XPATH_DATA['news_body'])
+        if body is not None:
             return body
 
         return None
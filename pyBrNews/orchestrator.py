@@ -0,0 +1,377 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from .changes import ChangeTracker
+from .comments import folha_sp as folha_comments
+from .comments import g1 as g1_comments
+from .config.database import PyBrNewsDB, PyBrNewsFS
+from .config.renderer import PyBrNewsRenderer
+from .config.work_queue import job_key
+from .dates import parse_date
+from .metrics import METRICS
+from .news.crawler import Crawler
+from .news.exame import ExameNews
+from .news.folha_sp import FolhaNews
+from .news.g1 import G1News
+from .pipeline import NewsPipeline
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Plan name -> news crawler, comments crawler (None if the platform has no comments) and the comments session.
+PLATFORMS = {
+    "g1": (G1News, g1_comments.G1Comments, g1_comments.SESSION),
+    "folha": (FolhaNews, folha_comments.FolhaComments, folha_comments.SESSION),
+    "exame": (ExameNews, None, None),
+}
+# Fields of the parsed news read by the comments crawlers.
+_COMMENT_FIELDS = ("title", "region", "url", "platform", "id_data")
+
+
+def validate_plan(plan: dict) -> dict:
+    """
+    Checks a crawl plan, raising a ValueError on the first invalid entry.
+
+    Parameters:
+        plan (dict): The crawl plan, as read by load_plan.
+    Returns:
+        dict: The given plan.
+    """
+    platforms = plan.get("platforms")
+    if not platforms:
+        raise ValueError("The crawl plan has no platforms. Add at least one [[platforms]] entry.")
+
+    sink_type = plan.get("sink", {}).get("type", "mongodb")
+    if sink_type not in ("mongodb", "json"):
+        raise ValueError(f"An invalid sink type [ {sink_type} ] was supplied. Use \"mongodb\" or \"json\".")
+
+    for platform in platforms:
+        name = platform.get("name")
+        if name not in PLATFORMS.keys():
+            raise ValueError(f"An invalid platform [ {name} ] was supplied. Available: {', '.join(PLATFORMS)}.")
+        if not (platform.get("keywords") or platform.get("regions") or platform.get("discover")):
+            raise ValueError(f"The platform {name} needs keywords, regions or discover to find its articles.")
+        if platform.get("regions") and name != "g1":
+            raise ValueError(f"Regions are only supported by the g1 platform, not by {name}.")
+        if platform.get("comments") and PLATFORMS[name][1] is None:
+            raise ValueError(f"Comments are not supported by the {name} platform.")
+        since = platform.get("since")
+        if since is not None and parse_date(str(since)) is None:
+            raise ValueError(f"An invalid since date [ {since} ] was supplied for {name}. Use e.g. 2024-05-01.")
+
+    return plan
+
+
+def load_plan(plan_path: str) -> dict:
+    """
+    Reads and validates a crawl plan from a TOML (.toml) or YAML (.yaml / .yml) file.
+
+    Parameters:
+        plan_path (str): Path of the crawl plan file.
+    Returns:
+        dict: The crawl plan.
+    """
+    extension = os.path.splitext(plan_path)[1].lower()
+    if extension == ".toml":
+        if tomllib is None:
+            raise ImportError(
+                "Reading a TOML crawl plan needs Python 3.11+ or tomli. Install it with: pip install tomli"
+            )
+        with open(plan_path, "rb") as plan_file:
+            plan = tomllib.load(plan_file)
+    elif extension in (".yaml", ".yml"):
+        if yaml is None:
+            raise ImportError("Reading a YAML crawl plan needs PyYAML. Install it with: pip install pyyaml")
+        with open(plan_path, encoding="utf-8") as plan_file:
+            plan = yaml.safe_load(plan_file) or {}
+    else:
+        raise ValueError(f"Unknown crawl plan format [ {extension} ]. Use a .toml, .yaml or .yml file.")
+
+    return validate_plan(plan)
+
+
+class _BudgetAdapter(HTTPAdapter):
+    """
+    HTTP adapter holding a slot of the download budget during each request, incl. the download of its body.
+    """
+    def __init__(self, budget: threading.BoundedSemaphore, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.budget = budget
+
+    def send(self, request, stream: bool = False, **kwargs):
+        with self.budget:
+            response = super().send(request, stream=stream, **kwargs)
+            if not stream:
+                # Read here, so the slot is only released once the body has been downloaded.
+                response.content
+            return response
+
+
+class CrawlOrchestrator:
+    """
+    pyBrNews Orchestrator Class, running a crawl plan over several platforms concurrently in a single process.
+
+    Each platform runs in its own NewsPipeline, but all of them share a global budget of concurrent downloads
+    (concurrency), the HTTP connection pools, the database / file system sink and the optional JS renderer. Articles
+    are found by keyword search, G1 regions and / or sitemap and RSS discovery, and the comments of the stored
+    articles are harvested after each platform when requested. A throughput summary is logged at the end.
+
+    Can be started from the command line: python -m pyBrNews.orchestrator crawl_plan.toml
+
+    Example of a crawl plan (TOML; the YAML equivalent is also accepted):
+        concurrency = 16
+        parse_body = true
+        save_html = false
+        track_changes = true    # re-crawls write the edits of stored articles as versions (see ChangeTracker)
+
+        [sink]
+        type = "json"           # or "mongodb" (host, port and split_content)
+        save_path = "data/"
+        record_log = true
+
+        [[platforms]]
+        name = "g1"
+        keywords = ["Saneamento"]
+        regions = ["sp", "brasil"]
+        max_pages = 2
+        concurrency = 8
+        comments = true
+
+        [[platforms]]
+        name = "exame"
+        discover = true
+        since = 2024-05-01
+    """
+    def __init__(self, plan: dict) -> None:
+        self.plan = validate_plan(plan)
+        self.concurrency = plan.get("concurrency", 16)
+        self.parse_body = plan.get("parse_body", True)
+        self.save_html = plan.get("save_html", False)
+
+        self._budget = threading.BoundedSemaphore(self.concurrency)
+        self._adapter = HTTPAdapter(pool_connections=32, pool_maxsize=self.concurrency)
+        # The comment requests take a budget slot each, as the article downloads of the pipelines do.
+        self._comments_adapter = _BudgetAdapter(budget=self._budget, pool_connections=32, pool_maxsize=self.concurrency)
+        self.renderer = PyBrNewsRenderer(pool_size=plan.get("render_pool_size", 2)) if plan.get("render_js") else None
+
+        sink = plan.get("sink", {})
+        self.use_database = sink.get("type", "mongodb") == "mongodb"
+        self.news_db = self._build_sink(sink=sink, data_kind="news")
+        self.comments_db = self._build_sink(sink=sink, data_kind="comments") if self.use_database else self.news_db
+        self.changes = ChangeTracker(backend=self.news_db) if plan.get("track_changes") else None
+
+        self.crawlers: Dict[str, Crawler] = {}
+        self.comment_crawlers = {}
+        for platform in plan["platforms"]:
+            self._build_crawlers(name=platform["name"])
+
+    def _build_sink(self, sink: dict, data_kind: str) -> Union[PyBrNewsDB, PyBrNewsFS]:
+        if not self.use_database:
+            file_system = PyBrNewsFS(use_record_log=sink.get("record_log", False))
+            file_system.set_save_path(fs_save_path=sink.get("save_path", ""))
+            return file_system
+
+        database = PyBrNewsDB(data_kind=data_kind, split_content=sink.get("split_content", False))
+        if "host" in sink.keys() or "port" in sink.keys():
+            database.client.close()
+            database.set_connection(host=sink.get("host", "localhost"), port=sink.get("port", 27017))
+
+        return database
+
+    def _mount(self, session, adapter: Optional[HTTPAdapter] = None) -> None:
+        adapter = adapter if adapter is not None else self._adapter
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def _build_crawlers(self, name: str) -> None:
+        if name in self.crawlers.keys():
+            return
+
+        news_class, comments_class, comments_session = PLATFORMS[name]
+        crawler = news_class(use_database=self.use_database, renderer=self.renderer)
+        if isinstance(crawler.DB, PyBrNewsDB):
+            crawler.DB.client.close()
+        crawler.DB = self.news_db
+        if self.changes is not None:
+            crawler.track_changes(tracker=self.changes)
+        self._mount(crawler.SESSION)
+        self.crawlers[name] = crawler
+
+        if comments_class is not None:
+            self._mount(comments_session, adapter=self._comments_adapter)
+            self.comment_crawlers[name] = comments_class()
+
+    @staticmethod
+    def _store(sink: Union[PyBrNewsDB, PyBrNewsFS], parsed_data: dict) -> None:
+        if isinstance(sink, PyBrNewsDB):
+            sink.insert_data(parsed_data=parsed_data)
+        else:
+            sink.to_json(parsed_data=parsed_data)
+
+    @staticmethod
+    def _find_items(platform: dict, crawler: Crawler) -> List[Union[str, dict]]:
+        items = []
+        max_pages = platform.get("max_pages", -1)
+        if platform.get("keywords"):
+            items += crawler.search_news(keywords=platform["keywords"], max_pages=max_pages)
+
+        regions = platform.get("regions") or []
+        if "brasil" in regions:
+            items += crawler.retrieve_latest_news(regions=None, max_pages=max_pages)
+        if any(region != "brasil" for region in regions):
+            items += crawler.retrieve_latest_news(
+                regions=[region for region in regions if region != "brasil"], max_pages=max_pages
+            )
+
+        if platform.get("discover"):
+            since = platform.get("since")
+            items += crawler.discover_news(since=parse_date(str(since)) if since is not None else None,
+                                           max_urls=platform.get("max_urls", -1))
+
+        unique_items = {}
+        for item in items:
+            unique_items.setdefault(job_key(item), item)
+
+        return list(unique_items.values())
+
+    def _run_platform(self, platform: dict) -> dict:
+        name = platform["name"]
+        crawler = self.crawlers[name]
+        start = time.perf_counter()
+
+        harvest_comments = bool(platform.get("comments"))
+        fields = platform.get("fields")
+        if harvest_comments and fields is not None:
+            fields = list(dict.fromkeys((*fields, *_COMMENT_FIELDS)))
+
+        stored_news = []
+
+        def sink(parsed_data: dict) -> None:
+            self._store(sink=self.news_db, parsed_data=parsed_data)
+            if harvest_comments:
+                stored_news.append(parsed_data)
+
+        pipeline = NewsPipeline(
+            crawler=crawler, parse_body=self.parse_body, save_html=self.save_html,
+            fetch_workers=min(platform.get("concurrency", self.concurrency), self.concurrency),
+            sink=sink, fields=fields, fetch_limit=self._budget,
+        )
+
+        items = self._find_items(platform=platform, crawler=crawler)
+        logger.info(f"{name} >> {len(items)} articles found. Parsing them.")
+        stats = pipeline.run(news_urls=items)
+
+        comments = 0
+        if harvest_comments and stored_news:
+            logger.info(f"{name} >> Harvesting the comments of {len(stored_news)} articles.")
+            for comment in self.comment_crawlers[name].parse_comments(news_list=stored_news):
+                self._store(sink=self.comments_db, parsed_data=comment)
+                comments += 1
+
+        return {
+            "platform": name,
+            "discovered": len(items),
+            "stored": stats["sink"]["processed"],
+            "dropped": sum(stats[stage]["dropped"] for stage in ("fetch", "parse", "enrich")),
+            "errors": sum(stats[stage]["errors"] for stage in ("fetch", "parse", "enrich", "sink")),
+            "comments": comments,
+            "elapsed": round(time.perf_counter() - start, 3),
+        }
+
+    def run(self) -> dict:
+        """
+        Runs all the platforms of the plan concurrently and logs the throughput summary. A platform that fails does
+        not stop the others.
+
+        Returns:
+            dict: The summary per platform and the totals (articles, comments, downloaded bytes and throughput).
+        """
+        start = time.perf_counter()
+        bytes_before = sum(METRICS.downloaded_bytes.values())
+
+        platforms = {}
+        with ThreadPoolExecutor(max_workers=len(self.plan["platforms"]), thread_name_prefix="pyBrNews-plan") as pool:
+            futures = {
+                platform["name"]: pool.submit(self._run_platform, platform) for platform in self.plan["platforms"]
+            }
+            for name, future in futures.items():
+                try:
+                    platforms[name] = future.result()
+                except Exception as e:
+                    logger.error(f"{name} >> The crawl failed: {e!r}")
+                    platforms[name] = {"platform": name, "failed": repr(e)}
+
+        if self.renderer is not None:
+            self.renderer.close()
+
+        elapsed = time.perf_counter() - start
+        stored = sum(stats.get("stored", 0) for stats in platforms.values())
+        comments = sum(stats.get("comments", 0) for stats in platforms.values())
+        summary = {
+            "platforms": platforms,
+            "stored": stored,
+            "comments": comments,
+            "downloaded_bytes": sum(METRICS.downloaded_bytes.values()) - bytes_before,
+            "elapsed": round(elapsed, 3),
+            "articles_per_second": round(stored / elapsed, 2) if elapsed else 0.0,
+        }
+        self._log_summary(summary=summary)
+
+        return summary
+
+    @staticmethod
+    def _log_summary(summary: dict) -> None:
+        logger.success(f"Crawl plan finished in {summary['elapsed']} seconds.")
+        for name, stats in summary["platforms"].items():
+            if "failed" in stats.keys():
+                logger.error(f"  {name:<6} | FAILED: {stats['failed']}")
+                continue
+
+            rate = stats["stored"] / stats["elapsed"] if stats["elapsed"] else 0.0
+            logger.success(
+                f"  {name:<6} | {stats['discovered']} found | {stats['stored']} stored | {stats['dropped']} dropped | "
+                f"{stats['errors']} errors | {stats['comments']} comments | {rate:.2f} articles/s"
+            )
+        logger.success(
+            f"  total  | {summary['stored']} articles | {summary['comments']} comments | "
+            f"{summary['downloaded_bytes'] / 1024 / 1024:.1f} MB downloaded | "
+            f"{summary['articles_per_second']:.2f} articles/s"
+        )
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m pyBrNews.orchestrator",
+                                     description="Runs a crawl plan over the supported platforms.")
+    parser.add_argument("plan", help="Path of the crawl plan (.toml, .yaml or .yml).")
+    parser.add_argument("--summary", help="Also writes the end-of-run summary to this JSON file.")
+    parser.add_argument("--no-item-logs", action="store_true", help="Only logs the summaries, not each article.")
+    options = parser.parse_args(args)
+
+    if options.no_item_logs:
+        METRICS.set_item_logging(enabled=False)
+    summary = CrawlOrchestrator(plan=load_plan(options.plan)).run()
+    if options.summary:
+        with open(options.summary, "w", encoding="utf-8") as summary_file:
+            json.dump(summary, summary_file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Union
+
+from loguru import logger
+
+from .config.database import PyBrNewsDB
+from .news.crawler import Crawler
+
+_END = object()
+
+
+class Stage:
+    """
+    A step of the NewsPipeline. Runs the given function in its own worker threads, reading from a bounded input queue
+    and writing the results to the bounded input queue of the next stage. When the next stage is slower, the queue
+    fills up and the workers block (backpressure) instead of piling up items in memory.
+
+    The function receives an item and returns the item for the next stage, or None to drop it.
+    """
+    def __init__(self, name: str, function: Callable, workers: int = 1) -> None:
+        if workers < 1:
+            raise ValueError(f"The stage {name} needs at least one worker.")
+
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self._lock = threading.Lock()
+
+    def _count(self, result: Optional[object], elapsed: float, error: bool = False) -> None:
+        with self._lock:
+            self.busy_time += elapsed
+            if error:
+                self.errors += 1
+            elif result is None:
+                self.dropped += 1
+            else:
+                self.processed += 1
+
+    def work(self, input_queue: queue.Queue, output_queue: Optional[queue.Queue]) -> None:
+        while True:
+            item = input_queue.get()
+            if item is _END:
+                break
+
+            start = time.perf_counter()
+            try:
+                result = self.function(item)
+            except Exception as e:
+                self._count(None, time.perf_counter() - start, error=True)
+                logger.error(f"Pipeline stage {self.name} >> Error while processing an item: {e!r}")
+                continue
+
+            self._count(result, time.perf_counter() - start)
+            if result is not None and output_queue is not None:
+                output_queue.put(result)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers, "processed": self.processed, "dropped": self.dropped,
+            "errors": self.errors, "busy_time": round(self.busy_time, 3),
+        }
+
+
+class NewsPipeline:
+    """
+    pyBrNews Pipeline Class, running the crawl as concurrent stages connected by bounded queues:
+    discover (search_news) -> fetch -> parse (_extract methods) -> enrich -> sink (PyBrNewsDB / PyBrNewsFS).
+
+    Each stage has its own number of workers, so a slow database never stalls the downloads and a slow website never
+    idles the writer. A semaphore shared by several pipelines (fetch_limit) caps their concurrent downloads as a
+    whole.
+
+    Example:
+        pipeline = NewsPipeline(crawler=G1News(), fetch_workers=8)
+        pipeline.run(keywords=["Saneamento"], max_pages=2)
+    """
+    def __init__(self,
+                 crawler: Crawler,
+                 parse_body: bool = False,
+                 save_html: bool = True,
+                 fetch_workers: int = 4,
+                 parse_workers: int = 1,
+                 enrich_workers: int = 1,
+                 sink_workers: int = 1,
+                 queue_size: int = 100,
+                 sink: Optional[Callable[[dict], None]] = None,
+                 fields: Optional[List[str]] = None,
+                 fetch_limit: Optional[threading.Semaphore] = None) -> None:
+        self.crawler = crawler
+        self.parse_body = parse_body
+        self.save_html = save_html
+        self.fields = crawler._select_fields(fields)
+        self.fetch_limit = fetch_limit
+        self.queue_size = queue_size
+        self.sink = sink if sink is not None else self._default_sink
+        self.enrichers: List[Callable[[dict], Optional[dict]]] = []
+
+        self.stages = [
+            Stage(name="fetch", function=self._fetch, workers=fetch_workers),
+            Stage(name="parse", function=self._parse, workers=parse_workers),
+            Stage(name="enrich", function=self._enrich, workers=enrich_workers),
+            Stage(name="sink", function=self._store, workers=sink_workers),
+        ]
+
+    def add_enricher(self, enricher: Callable[[dict], Optional[dict]]) -> None:
+        """
+        Adds a function to the enrich stage. Enrichers run in the order they were added, receiving the parsed data
+        dictionary and returning it (changed or not), or None to drop the article.
+
+        Parameters:
+            enricher (Callable[[dict], Optional[dict]]): The function to be applied to each parsed article.
+        """
+        self.enrichers.append(enricher)
+
+    def _default_sink(self, parsed_data: dict) -> None:
+        if isinstance(self.crawler.DB, PyBrNewsDB):
+            self.crawler.DB.insert_data(parsed_data=parsed_data)
+        else:
+            self.crawler.DB.to_json(parsed_data=parsed_data)
+
+    def _fetch(self, news_item: Union[str, dict]) -> Optional[tuple]:
+        if not self.crawler._needs_page(fields=self.fields, parse_body=self.parse_body, save_html=self.save_html,
+                                        news_item=news_item):
+            return news_item, None
+
+        with self.crawler.PROFILER.phase("fetch"):
+            head_only = self.crawler._head_only(fields=self.fields, news_item=news_item)
+            if self.fetch_limit is not None:
+                with self.fetch_limit:
+                    page = self.crawler._fetch_article(news_item=news_item, head_only=head_only)
+            else:
+                page = self.crawler._fetch_article(news_item=news_item, head_only=head_only)
+        if page is None:
+            return None
+
+        return news_item, page
+
+    def _parse(self, fetched: tuple) -> Optional[dict]:
+        news_item, page = fetched
+        with self.crawler.PROFILER.phase("parse"):
+            parsed_news = self.crawler._parse_article(news_item=news_item, article_page=page,
+                                                      parse_body=self.parse_body, save_html=self.save_html,
+                                                      fields=self.fields)
+        with self.crawler.PROFILER.phase("dedup"):
+            duplicated = self.crawler._is_duplicated(parsed_news=parsed_news)
+        if duplicated:
+            return None
+
+        return parsed_news
+
+    def _enrich(self, parsed_news: dict) -> Optional[dict]:
+        for enricher in self.enrichers:
+            parsed_news = enricher(parsed_news)
+            if parsed_news is None:
+                return None
+
+        return parsed_news
+
+    def _store(self, parsed_news: dict) -> dict:
+        with self.crawler.PROFILER.phase("store"):
+            self.sink(parsed_news)
+        return parsed_news
+
+    def run(self,
+            keywords: Optional[List[str]] = None,
+            news_urls: Optional[Iterable[Union[str, dict]]] = None,
+            max_pages: int = -1) -> dict:
+        """
+        Runs the pipeline until all the discovered articles have been stored. The discover stage runs search_news
+        for the given keywords, or reads the given URLs / data dicts.
+
+        Parameters:
+            keywords (Optional[List[str]]): A list containing all the keywords to be searched in the news platform.
+            news_urls (Optional[Iterable[Union[str, dict]]]): URLs / data dicts to be parsed, instead of searching.
+            max_pages (int): Number of search pages to have the articles URLs extracted from.
+        Returns:
+            dict: Counters of processed, dropped and failed items, and busy time per stage.
+        """
+        if (keywords is None) == (news_urls is None):
+            raise ValueError("Supply either keywords or news_urls to the pipeline.")
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for i, stage in enumerate(self.stages):
+            output_queue = queues[i + 1] if i + 1 < len(queues) else None
+            stage_threads = [
+                threading.Thread(target=stage.work, args=(queues[i], output_queue), daemon=True,
+                                 name=f"pyBrNews-{stage.name}-{n}")
+                for n in range(stage.workers)
+            ]
+            for thread in stage_threads:
+                thread.start()
+            threads.append(stage_threads)
+
+        start = time.perf_counter()
+        discovered = 0
+        # cProfile would only see this thread, not the stage workers: the phases are timed in every worker instead.
+        self.crawler.PROFILER.start(cprofile=False)
+        try:
+            items = news_urls if news_urls is not None else self.crawler.search_news(keywords=keywords,
+                                                                                      max_pages=max_pages)
+            for item in items:
+                queues[0].put(item)
+                discovered += 1
+        finally:
+            for i, stage in enumerate(self.stages):
+                for _ in range(stage.workers):
+                    queues[i].put(_END)
+                for thread in threads[i]:
+                    thread.join()
+            self.crawler.PROFILER.stop()
+            self.crawler.PROFILER.log_report()
+
+        stats = {"discover": {"workers": 1, "processed": discovered}}
+        stats.update({stage.name: stage.stats() for stage in self.stages})
+        stats["elapsed"] = round(time.perf_counter() - start, 3)
+
+        logger.success(
+            f"Pipeline finished! {self.stages[-1].processed} of {discovered} articles stored "
+            f"in {stats['elapsed']} seconds."
+        )
+
+        return stats
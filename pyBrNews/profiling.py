@@ -0,0 +1,182 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from loguru import logger
+
+
+class CrawlProfiler:
+    """
+    pyBrNews Profiler Class, an opt-in timer of the crawl phases (fetch, parse and store). Each phase records its wall
+    time and CPU time, so network waits (high wall, low CPU) can be told apart from lxml / date parsing work (CPU).
+    Optionally, runs cProfile during the crawl to report the top hot spots. The report covers the last run only.
+
+    With parse_news, the "store" phase is the time the consumer spends on each yielded item before asking for the next
+    one, i.e. the insert_data / to_json call of the usual crawl loop. Phases run by several threads (e.g. the pipeline
+    stages) report their wall share per thread, i.e. how busy each of their threads was during the run.
+
+    Enabled by the "profile" parameter of the crawlers or by the environment variable PYBRNEWS_PROFILE: "1" for the
+    phase timers only, "cprofile" for the phase timers plus cProfile.
+    """
+    def __init__(self, enabled: Optional[bool] = None, use_cprofile: Optional[bool] = None) -> None:
+        env_mode = os.environ.get("PYBRNEWS_PROFILE", "0").lower()
+        self.enabled = enabled if enabled is not None else env_mode not in ("", "0", "false")
+        self.use_cprofile = use_cprofile if use_cprofile is not None else env_mode == "cprofile"
+
+        self._lock = threading.Lock()
+        self._profile: Optional[cProfile.Profile] = None
+        self._depth = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clears the collected phase timers and the cProfile statistics.
+        """
+        with self._lock:
+            self.phases = {}
+            self._stats: Optional[pstats.Stats] = None
+            self._run_start: Optional[float] = None
+            self.wall_time = 0.0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Context manager timing a crawl phase. Does nothing when the profiler is disabled.
+
+        Parameters:
+            name (str): Name of the phase (e.g. "fetch", "parse" or "store").
+        """
+        if not self.enabled:
+            yield
+            return
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            with self._lock:
+                totals = self.phases.setdefault(name, {"calls": 0, "wall": 0.0, "cpu": 0.0, "threads": set()})
+                totals["threads"].add(threading.get_ident())
+                totals["calls"] += 1
+                totals["wall"] += wall
+                totals["cpu"] += cpu
+
+    def start(self, cprofile: bool = True) -> None:
+        """
+        Marks the start of a crawl run, clearing the timers of the previous run and starting cProfile if requested.
+        Runs started inside a run (e.g. parse_news calls of a scheduler poll) are part of the outer one.
+
+        Parameters:
+            cprofile (bool): Defines if cProfile may run. cProfile only profiles the calling thread, so runs spread
+                             over worker threads (e.g. the pipeline) only time their phases.
+        """
+        if not self.enabled:
+            return
+
+        self._depth += 1
+        if self._depth > 1:
+            return
+
+        self.reset()
+        self._run_start = time.perf_counter()
+        if self.use_cprofile and cprofile and self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> None:
+        """
+        Marks the end of a crawl run, stopping cProfile if it was started.
+        """
+        if not self.enabled or self._run_start is None:
+            return
+
+        self._depth -= 1
+        if self._depth > 0:
+            return
+
+        self.wall_time += time.perf_counter() - self._run_start
+        self._run_start = None
+        if self._profile is not None:
+            self._profile.disable()
+            if self._stats is None:
+                self._stats = pstats.Stats(self._profile)
+            else:
+                self._stats.add(self._profile)
+            self._profile = None
+
+    def report(self, top: int = 15) -> dict:
+        """
+        Builds the run report: wall and CPU time per phase, with the share of the run wall time spent in the phase by
+        each of its threads, and, with cProfile, the top hot spots by own time.
+
+        Parameters:
+            top (int): Number of hot spots to be reported.
+        Returns:
+            dict: The run wall time, the phases and the hot spots.
+        """
+        with self._lock:
+            phases = {
+                name: {
+                    "calls": totals["calls"], "wall": round(totals["wall"], 4), "cpu": round(totals["cpu"], 4),
+                    "threads": len(totals["threads"]),
+                    "wall_share": (
+                        round(totals["wall"] / (self.wall_time * len(totals["threads"])), 4) if self.wall_time
+                        else None
+                    ),
+                }
+                for name, totals in self.phases.items()
+            }
+
+        hot_spots = []
+        if self._stats is not None:
+            entries = sorted(self._stats.stats.items(), key=lambda entry: entry[1][2], reverse=True)
+            for (file_name, line, function), (_, calls, total_time, cumulative_time, _) in entries[:top]:
+                hot_spots.append({
+                    "function": f"{os.path.basename(file_name)}:{line}({function})", "calls": calls,
+                    "total_time": round(total_time, 4), "cumulative_time": round(cumulative_time, 4),
+                })
+
+        return {"wall_time": round(self.wall_time, 4), "phases": phases, "hot_spots": hot_spots}
+
+    def format_report(self, top: int = 15) -> str:
+        """
+        Formats the run report as text, one line per phase and per hot spot.
+
+        Parameters:
+            top (int): Number of hot spots to be reported.
+        Returns:
+            str: The formatted report.
+        """
+        report = self.report(top=top)
+        output = io.StringIO()
+        output.write(f"pyBrNews crawl profile >> total wall time: {report['wall_time']}s\n")
+        for name, totals in report["phases"].items():
+            output.write(
+                f"  {name:<8} calls={totals['calls']:<6} wall={totals['wall']:.4f}s cpu={totals['cpu']:.4f}s"
+                f" threads={totals['threads']} share={totals['wall_share']}\n"
+            )
+        for hot_spot in report["hot_spots"]:
+            output.write(
+                f"  {hot_spot['cumulative_time']:>9.4f}s cum {hot_spot['total_time']:>9.4f}s own "
+                f"{hot_spot['calls']:>8} calls  {hot_spot['function']}\n"
+            )
+
+        return output.getvalue()
+
+    def log_report(self, top: int = 15) -> None:
+        """
+        Logs the formatted run report, if the profiler is enabled and the outer run is over.
+
+        Parameters:
+            top (int): Number of hot spots to be reported.
+        """
+        if self.enabled and self._depth == 0:
+            logger.info(self.format_report(top=top))
@@ -0,0 +1,233 @@
+import base64
+import sys
+from datetime import datetime
+from typing import Any, Optional, Union
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Record:
+    """
+    Base of the compact records: fixed attributes (__slots__) instead of a per-item dict, with dict-like read access
+    so the records can be used where the parsed data dictionaries were expected (e.g. record["title"]).
+    """
+    __slots__ = ()
+
+    # The records are mutable, so they compare by value but are not hashable.
+    __hash__ = None
+
+    def _slot(self, key: str) -> Optional[str]:
+        return key if key in self.__slots__ else None
+
+    def __getitem__(self, key: str) -> Any:
+        slot = self._slot(key)
+        if slot is None:
+            raise KeyError(key)
+
+        return getattr(self, slot)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        slot = self._slot(key)
+        return getattr(self, slot) if slot is not None else default
+
+    def keys(self) -> tuple:
+        # The keys of to_dict, so dict(record) and **record build the same dictionary shape.
+        return self.__slots__
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={getattr(self, key)!r}" for key in self.__slots__ if key != "html")
+        return f"{type(self).__name__}({fields})"
+
+
+class NewsRecord(_Record):
+    """
+    Compact record of a parsed news article. The platform, region, section and type strings are interned, so the
+    millions of records of a harvest share a single copy of each value.
+
+    Serializable to the parsed data dictionary used by the sinks with to_dict.
+    """
+    __slots__ = ("title", "abstract", "date", "section", "region", "url", "platform", "tags", "type", "body",
+                 "id_data", "html")
+
+    def __init__(self,
+                 title: Optional[str] = None,
+                 abstract: Optional[str] = None,
+                 date: Optional[datetime] = None,
+                 section: Optional[str] = None,
+                 region: Optional[str] = None,
+                 url: Optional[str] = None,
+                 platform: Optional[str] = None,
+                 tags: Optional[str] = None,
+                 type: Optional[str] = None,
+                 body: Optional[str] = None,
+                 id_data: Optional[Union[dict, int]] = None,
+                 html: Optional[str] = None) -> None:
+        self.title = title
+        self.abstract = abstract
+        self.date = date
+        self.section = _intern(section)
+        self.region = _intern(region)
+        self.url = url
+        self.platform = _intern(platform)
+        self.tags = tags
+        self.type = _intern(type)
+        self.body = body
+        self.id_data = id_data
+        self.html = html
+
+    def to_dict(self) -> dict:
+        """
+        Returns the record as the parsed data dictionary of the news crawlers.
+
+        Returns:
+            dict: Dictionary containing all the article parsed data.
+        """
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class ArticleRef(_Record):
+    """
+    Article data shared by all the comment records of the same article, instead of one "news_data" copy per comment.
+    """
+    __slots__ = ("title", "region", "news_id", "api_id", "api_url", "url")
+
+    def __init__(self,
+                 title: Optional[str] = None,
+                 region: Optional[str] = None,
+                 url: Optional[str] = None,
+                 news_id: Optional[str] = None,
+                 api_id: Optional[int] = None,
+                 api_url: Optional[str] = None) -> None:
+        self.title = title
+        self.region = _intern(region)
+        self.news_id = news_id
+        self.api_id = api_id
+        self.api_url = api_url
+        self.url = url
+
+    def to_dict(self) -> dict:
+        """
+        Returns the article data as the "news_data" dictionary of the comment crawlers. The comment API keys
+        (news_id, api_id and api_url) are only included when set.
+
+        Returns:
+            dict: Dictionary containing the article data of a comment.
+        """
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def keys(self) -> tuple:
+        return tuple(
+            key for key in self.__slots__
+            if key not in ("news_id", "api_id", "api_url") or getattr(self, key) is not None
+        )
+
+
+class CommentRecord(_Record):
+    """
+    Compact record of a parsed comment, referencing the shared ArticleRef of its article. The platform string is
+    interned.
+
+    Serializable to the parsed data dictionary used by the sinks with to_dict.
+    """
+    __slots__ = ("author", "date", "upvote", "news_data", "comment", "comment_id", "platform", "id_key")
+
+    def __init__(self,
+                 author: Optional[str],
+                 date: Optional[datetime],
+                 upvote: Optional[int],
+                 news_data: ArticleRef,
+                 comment: Optional[str],
+                 comment_id: Optional[Union[int, str]],
+                 platform: str,
+                 id_key: str = "comment_id") -> None:
+        self.author = author
+        self.date = date
+        self.upvote = upvote
+        self.news_data = news_data
+        self.comment = comment
+        self.comment_id = comment_id
+        self.platform = _intern(platform)
+        self.id_key = _intern(id_key)
+
+    def _slot(self, key: str) -> Optional[str]:
+        # The comment ID is also read under its platform key, as in the parsed data dictionary (e.g. record["g1_id"]).
+        return "comment_id" if key == self.id_key else super()._slot(key)
+
+    def keys(self) -> tuple:
+        return "author", "date", "upvote", "news_data", "comment", self.id_key, "platform"
+
+    def to_dict(self) -> dict:
+        """
+        Returns the record as the parsed data dictionary of the comment crawlers, with the comment ID under the
+        platform key (id_key, e.g. "comment_id" or "g1_id").
+
+        Returns:
+            dict: Dictionary containing all the comment parsed data.
+        """
+        return {
+            "author": self.author,
+            "date": self.date,
+            "upvote": self.upvote,
+            "news_data": self.news_data.to_dict(),
+            "comment": self.comment,
+            self.id_key: self.comment_id,
+            "platform": self.platform,
+        }
+
+
+def as_dict(parsed_data: Union[dict, _Record]) -> dict:
+    """
+    Returns the parsed data dictionary of a record, or the given dictionary itself.
+
+    Parameters:
+        parsed_data (Union[dict, NewsRecord, CommentRecord]): Parsed data of a news article or comment.
+    Returns:
+        dict: Dictionary containing the parsed data.
+    """
+    if isinstance(parsed_data, _Record):
+        return parsed_data.to_dict()
+
+    return parsed_data
+
+
+def json_default(value: Any) -> Any:
+    """
+    Serializes the values of the parsed data that JSON does not support, as the default of json.dump: the HTML bytes
+    as text (or, when they are not UTF-8, as a {"$base64": ...} marker restored by json_object_hook), and the dates
+    (and any other value) as their string.
+
+    Parameters:
+        value (Any): A value not supported by JSON.
+    Returns:
+        Any: A JSON serializable version of the value.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        try:
+            return bytes(value).decode("utf-8")
+        except UnicodeDecodeError:
+            return {"$base64": base64.b64encode(value).decode("ascii")}
+
+    return str(value)
+
+
+def json_object_hook(document: dict) -> Union[dict, bytes]:
+    """
+    Restores the bytes serialized as a {"$base64": ...} marker by json_default, as the object_hook of json.load.
+
+    Parameters:
+        document (dict): A JSON object.
+    Returns:
+        Union[dict, bytes]: The original bytes of a marker, or the given object.
+    """
+    if len(document) == 1 and "$base64" in document.keys():
+        return base64.b64decode(document["$base64"])
+
+    return document
@@ -0,0 +1,323 @@
+import argparse
+import hashlib
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from typing import Dict, List, Optional, Union
+
+from loguru import logger
+
+from .config.database import PyBrNewsDB, PyBrNewsFS
+from .config.work_queue import PyBrNewsLocalQueue, PyBrNewsQueue, job_key
+from .metrics import METRICS
+from .orchestrator import PLATFORMS
+
+
+def shard_of(item: Union[str, dict], shards: int) -> int:
+    """
+    Assigns a URL / data dict to a shard by the hash of its URL, so the same article always goes to the same shard.
+
+    Parameters:
+        item (Union[str, dict]): The URL or data dict of the news article.
+        shards (int): Number of shards.
+    Returns:
+        int: The shard of the item, from 0 to shards - 1.
+    """
+    digest = hashlib.blake2b(job_key(item).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % shards
+
+
+def _build_sink(options: dict) -> Union[PyBrNewsDB, PyBrNewsFS]:
+    if options["use_database"]:
+        return PyBrNewsDB(split_content=options["split_content"])
+
+    file_system = PyBrNewsFS(use_record_log=options["use_record_log"])
+    file_system.set_save_path(fs_save_path=options["save_path"])
+    return file_system
+
+
+def _store(sink: Union[PyBrNewsDB, PyBrNewsFS], parsed_data: dict) -> None:
+    if isinstance(sink, PyBrNewsDB):
+        sink.insert_data(parsed_data=parsed_data)
+    else:
+        sink.to_json(parsed_data=parsed_data)
+
+
+def _shard_worker(shard: int,
+                  items: Optional[List[Union[str, dict]]],
+                  options: dict,
+                  results: multiprocessing.Queue,
+                  stop: multiprocessing.Event) -> None:
+    # The parent handles SIGINT / SIGTERM and sets the stop event, so the worker finishes the current article.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    METRICS.set_item_logging(enabled=options["log_items"])
+
+    start = time.perf_counter()
+    stats = {"shard": shard, "pid": os.getpid(), "items": 0, "stored": 0, "errors": 0}
+    try:
+        crawler = PLATFORMS[options["platform"]][0](use_database=options["use_database"])
+        if options["writer"] == "direct":
+            if isinstance(crawler.DB, PyBrNewsDB):
+                crawler.DB.client.close()
+            crawler.DB = _build_sink(options)
+
+        if items is not None:
+            stats["items"] = len(items)
+            parsed_news = crawler.parse_news(news_urls=items, parse_body=options["parse_body"],
+                                             save_html=options["save_html"], fields=options["fields"])
+        else:
+            work_queue = (PyBrNewsQueue(queue_name=options["queue_name"]) if options["queue_path"] is None
+                          else PyBrNewsLocalQueue(db_path=options["queue_path"]))
+            parsed_news = crawler.consume_queue(queue=work_queue, parse_body=options["parse_body"],
+                                                save_html=options["save_html"], fields=options["fields"])
+
+        for parsed_data in parsed_news:
+            if options["writer"] == "direct":
+                _store(sink=crawler.DB, parsed_data=parsed_data)
+            else:
+                results.put(("item", shard, parsed_data))
+            stats["stored"] += 1
+            if items is None:
+                stats["items"] += 1
+
+            if stop.is_set():
+                logger.warning(f"Shard {shard} >> Stopping after {stats['stored']} articles.")
+                parsed_news.close()
+                break
+    except Exception as e:
+        stats["errors"] += 1
+        stats["failed"] = repr(e)
+        logger.error(f"Shard {shard} >> The crawl failed: {e!r}")
+
+    stats["downloaded_bytes"] = sum(METRICS.downloaded_bytes.values())
+    stats["elapsed"] = round(time.perf_counter() - start, 3)
+    results.put(("stats", shard, stats))
+
+
+class ShardedRunner:
+    """
+    pyBrNews Sharded Runner Class, spreading a crawl over several worker processes to use all the CPU cores, since
+    the HTML parsing, logging and dict building of a single process are bound by the GIL.
+
+    A URL list (or the search results of the keywords) is split into shards by the hash of each URL, one shard per
+    worker process. Each worker has its own crawler, HTTP session and database connection. Alternatively, all the
+    workers consume a shared work queue (PyBrNewsQueue, or a PyBrNewsLocalQueue file), which spreads the items by
+    itself.
+
+    The parsed data is stored by the workers themselves (writer="direct", the default for MongoDB) or sent to the
+    parent process, the single writer (writer="single", the default for the file system, required by the record
+    log). On SIGINT / SIGTERM the workers finish their current article, report their stats and exit.
+
+    The workers are started with the "spawn" method, so scripts using the runner need the usual
+    if __name__ == '__main__' guard.
+
+    Example:
+        runner = ShardedRunner(platform="g1", workers=8)
+        runner.run(keywords=["Saneamento"], max_pages=10)
+    """
+    def __init__(self,
+                 platform: str,
+                 workers: Optional[int] = None,
+                 use_database: bool = True,
+                 save_path: str = "",
+                 use_record_log: bool = False,
+                 split_content: bool = False,
+                 writer: Optional[str] = None,
+                 parse_body: bool = True,
+                 save_html: bool = False,
+                 fields: Optional[List[str]] = None) -> None:
+        """
+        Parameters:
+            platform (str): The platform to be crawled: "g1", "folha" or "exame".
+            workers (Optional[int]): Number of worker processes. Defaults to the number of CPU cores.
+            use_database (bool): Defines if the MongoDB database (PyBrNewsDB) or the file system (PyBrNewsFS) is used.
+            save_path (str): Save path of the file system, ending with a slash.
+            use_record_log (bool): Defines if the file system appends to a record log instead of writing JSON files.
+            split_content (bool): Defines if the database stores the body and HTML in a separate collection.
+            writer (Optional[str]): "direct" (each worker stores its data) or "single" (the parent stores all of
+                                    them). Defaults to "direct" for MongoDB and "single" for the file system.
+            parse_body (bool): Defines if the article body will be extracted.
+            save_html (bool): Defines if the HTML bytes from the article will be extracted.
+            fields (Optional[List[str]]): Projection of the parsed data. If not set, all the fields are extracted.
+        """
+        if platform not in PLATFORMS.keys():
+            raise ValueError(f"An invalid platform [ {platform} ] was supplied. Available: {', '.join(PLATFORMS)}.")
+
+        writer = writer if writer is not None else ("direct" if use_database else "single")
+        if writer not in ("direct", "single"):
+            raise ValueError(f"An invalid writer [ {writer} ] was supplied. Use \"direct\" or \"single\".")
+        if writer == "direct" and use_record_log and not use_database:
+            raise ValueError("The record log supports a single writer process only. Use writer=\"single\".")
+
+        self.platform = platform
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.options = {
+            "platform": platform, "use_database": use_database, "save_path": save_path,
+            "use_record_log": use_record_log, "split_content": split_content, "writer": writer,
+            "parse_body": parse_body, "save_html": save_html, "fields": fields, "log_items": METRICS.log_items,
+            "queue_name": "crawl", "queue_path": None,
+        }
+
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+
+    def stop(self, *args) -> None:
+        """
+        Asks the workers to stop after their current article. Also used as the SIGINT / SIGTERM handler.
+        """
+        logger.warning("Stopping the pyBrNews sharded runner after the current articles.")
+        self._stop.set()
+
+    def run(self,
+            news_urls: Optional[List[Union[str, dict]]] = None,
+            keywords: Optional[List[str]] = None,
+            max_pages: int = -1,
+            queue_name: Optional[str] = None,
+            queue_path: Optional[str] = None) -> dict:
+        """
+        Runs the crawl on the worker processes until all of them have finished (or have been stopped).
+
+        Parameters:
+            news_urls (Optional[List[Union[str, dict]]]): URLs / data dicts to be sharded across the workers.
+            keywords (Optional[List[str]]): Keywords searched by the parent process, then sharded across the workers.
+            max_pages (int): Number of search pages to have the articles URLs extracted from.
+            queue_name (Optional[str]): Name of a PyBrNewsQueue consumed by all the workers.
+            queue_path (Optional[str]): Path of a PyBrNewsLocalQueue SQLite file consumed by all the workers.
+        Returns:
+            dict: The stats per shard (items, stored articles, errors, downloaded bytes and elapsed time) and the
+                  totals.
+        """
+        sources = [news_urls is not None, keywords is not None, queue_name is not None or queue_path is not None]
+        if sum(sources) != 1:
+            raise ValueError("Supply exactly one of news_urls, keywords or a work queue (queue_name / queue_path).")
+        if queue_path == ":memory:":
+            raise ValueError("An in-memory local queue cannot be shared by processes. Use a file path.")
+
+        options = dict(self.options, queue_name=queue_name or "crawl", queue_path=queue_path)
+        shards: List[Optional[List[Union[str, dict]]]] = [None] * self.workers
+        if queue_name is None and queue_path is None:
+            if keywords is not None:
+                crawler = PLATFORMS[self.platform][0](use_database=False)
+                news_urls = crawler.search_news(keywords=keywords, max_pages=max_pages)
+
+            shards = [[] for _ in range(self.workers)]
+            for item in news_urls:
+                shards[shard_of(item=item, shards=self.workers)].append(item)
+
+        start = time.perf_counter()
+        results = self._context.Queue(maxsize=1000)
+        processes = [
+            self._context.Process(target=_shard_worker, args=(shard, items, options, results, self._stop),
+                                  name=f"pyBrNews-shard-{shard}")
+            for shard, items in enumerate(shards)
+        ]
+        previous_handlers = {sig: signal.signal(sig, self.stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            for process in processes:
+                process.start()
+            logger.info(f"{self.workers} shard workers started for the {self.platform} platform.")
+
+            shard_stats = self._collect(results=results, processes=processes, options=options)
+        finally:
+            for process in processes:
+                process.join()
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+
+        elapsed = time.perf_counter() - start
+        stored = sum(stats["stored"] for stats in shard_stats.values())
+        summary = {
+            "shards": shard_stats,
+            "stored": stored,
+            "errors": sum(stats["errors"] for stats in shard_stats.values()),
+            "downloaded_bytes": sum(stats.get("downloaded_bytes", 0) for stats in shard_stats.values()),
+            "elapsed": round(elapsed, 3),
+            "articles_per_second": round(stored / elapsed, 2) if elapsed else 0.0,
+        }
+        self._log_summary(summary=summary)
+
+        return summary
+
+    def _collect(self,
+                 results: multiprocessing.Queue,
+                 processes: list,
+                 options: dict) -> Dict[int, dict]:
+        sink = _build_sink(options) if options["writer"] == "single" else None
+        shard_stats: Dict[int, dict] = {}
+        duplicates: Dict[int, int] = {}
+        while len(shard_stats) < len(processes):
+            try:
+                kind, shard, payload = results.get(timeout=1)
+            except queue.Empty:
+                # A worker killed without reporting its stats (e.g. out of memory) would block the run forever.
+                for shard, process in enumerate(processes):
+                    if shard not in shard_stats.keys() and not process.is_alive() and results.empty():
+                        logger.error(f"Shard {shard} >> The worker exited with code {process.exitcode}.")
+                        shard_stats[shard] = {"shard": shard, "items": 0, "stored": 0, "errors": 1,
+                                              "failed": f"exit code {process.exitcode}"}
+                continue
+
+            if kind == "item":
+                # The workers cannot read the record log of the single writer, so its duplicates are checked here.
+                if options["use_record_log"] and sink.check_duplicates(parsed_data=payload):
+                    duplicates[shard] = duplicates.get(shard, 0) + 1
+                else:
+                    _store(sink=sink, parsed_data=payload)
+            else:
+                payload["stored"] -= duplicates.get(shard, 0)
+                shard_stats[shard] = payload
+
+        return dict(sorted(shard_stats.items()))
+
+    @staticmethod
+    def _log_summary(summary: dict) -> None:
+        logger.success(f"Sharded crawl finished in {summary['elapsed']} seconds.")
+        for shard, stats in summary["shards"].items():
+            rate = stats["stored"] / stats["elapsed"] if stats.get("elapsed") else 0.0
+            logger.success(
+                f"  shard {shard:<3} | {stats['items']} items | {stats['stored']} stored | {stats['errors']} errors | "
+                f"{stats.get('downloaded_bytes', 0) / 1024 / 1024:.1f} MB | {rate:.2f} articles/s"
+                + (f" | FAILED: {stats['failed']}" if "failed" in stats.keys() else "")
+            )
+        logger.success(
+            f"  total     | {summary['stored']} stored | {summary['errors']} errors | "
+            f"{summary['downloaded_bytes'] / 1024 / 1024:.1f} MB | {summary['articles_per_second']:.2f} articles/s"
+        )
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m pyBrNews.runner",
+                                     description="Crawls a platform with several worker processes.")
+    parser.add_argument("platform", choices=list(PLATFORMS.keys()), help="The platform to be crawled.")
+    parser.add_argument("--keywords", nargs="*", help="Keywords searched on the platform.")
+    parser.add_argument("--max-pages", type=int, default=-1, help="Search pages to have the URLs extracted from.")
+    parser.add_argument("--urls-file", help="File with one article URL per line, instead of searching.")
+    parser.add_argument("--queue", help="Name of a PyBrNewsQueue consumed by the workers, instead of searching.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes. Defaults to the cores.")
+    parser.add_argument("--writer", choices=["direct", "single"], help="Who stores the data: workers or parent.")
+    parser.add_argument("--no-database", action="store_true", help="Export JSON files instead of using MongoDB.")
+    parser.add_argument("--save-path", default="", help="Save path for the JSON files, ending with a slash.")
+    parser.add_argument("--record-log", action="store_true", help="Append to a record log instead of JSON files.")
+    parser.add_argument("--skip-body", action="store_true", help="Do not extract the article body.")
+    parser.add_argument("--save-html", action="store_true", help="Store the HTML of the articles.")
+    options = parser.parse_args(args)
+
+    runner = ShardedRunner(
+        platform=options.platform, workers=options.workers, use_database=not options.no_database,
+        save_path=options.save_path, use_record_log=options.record_log, writer=options.writer,
+        parse_body=not options.skip_body, save_html=options.save_html,
+    )
+    if options.urls_file:
+        with open(options.urls_file, encoding="utf-8") as urls_file:
+            runner.run(news_urls=[line.strip() for line in urls_file if line.strip()])
+    elif options.queue:
+        runner.run(queue_name=options.queue)
+    else:
+        runner.run(keywords=options.keywords or [], max_pages=options.max_pages)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+import argparse
+import signal
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, List, Optional, Union
+
+from loguru import logger
+
+from .config.database import PyBrNewsDB
+from .config.work_queue import job_key
+from .news.crawler import Crawler
+from .news.exame import ExameNews
+from .news.folha_sp import FolhaNews
+from .news.g1 import G1News
+
+
+class PollTarget:
+    """
+    A source polled by the NewsScheduler, with its own interval. The interval adapts to the observed publish rate:
+    it shrinks when many new articles are found in a poll and grows when none are found, always between the minimum
+    and maximum intervals.
+    """
+    def __init__(self,
+                 name: str,
+                 crawler: Crawler,
+                 retrieve: Callable[[], List[Union[str, dict]]],
+                 interval: float,
+                 min_interval: float,
+                 max_interval: float,
+                 target_new: int = 10) -> None:
+        self.name = name
+        self.crawler = crawler
+        self.retrieve = retrieve
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new = target_new
+        self.next_run = time.monotonic()
+
+    def adapt(self, new_items: int) -> None:
+        """
+        Updates the polling interval from the number of new items found in the last poll, aiming for target_new
+        items per poll.
+
+        Parameters:
+            new_items (int): Number of items not seen before found in the last poll.
+        """
+        if new_items == 0:
+            interval = self.interval * 1.5
+        else:
+            interval = self.interval * min(2.0, max(0.5, self.target_new / new_items))
+
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+        self.next_run = time.monotonic() + self.interval
+
+
+class NewsScheduler:
+    """
+    pyBrNews Scheduler Class, a long-running process polling the latest news of each platform and G1 region on its
+    own interval. New URLs are parsed and stored right away, reusing the same crawler sessions and database
+    connections between polls.
+
+    Can be started from the command line: python -m pyBrNews.scheduler --g1-regions sp rj brasil
+    """
+    def __init__(self,
+                 use_database: bool = True,
+                 parse_body: bool = True,
+                 save_html: bool = False,
+                 min_interval: float = 60,
+                 max_interval: float = 1800,
+                 max_seen: int = 100000,
+                 save_path: str = "") -> None:
+        self.use_database = use_database
+        self.parse_body = parse_body
+        self.save_html = save_html
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_seen = max_seen
+        self.save_path = save_path
+
+        self.targets: List[PollTarget] = []
+        self._crawlers = {}
+        self._seen = OrderedDict()
+        self._stop = threading.Event()
+
+    def _get_crawler(self, crawler_class: type) -> Crawler:
+        if crawler_class not in self._crawlers:
+            crawler = crawler_class(use_database=self.use_database)
+            if not self.use_database and self.save_path:
+                crawler.DB.set_save_path(fs_save_path=self.save_path)
+            self._crawlers[crawler_class] = crawler
+
+        return self._crawlers[crawler_class]
+
+    def _add_target(self, name: str, crawler: Crawler, retrieve: Callable, interval: Optional[float]) -> None:
+        self.targets.append(PollTarget(
+            name=name, crawler=crawler, retrieve=retrieve,
+            interval=interval if interval is not None else self.min_interval,
+            min_interval=self.min_interval, max_interval=self.max_interval,
+        ))
+
+    def add_g1(self, regions: List[str] = None, max_pages: int = 1, interval: Optional[float] = None) -> None:
+        """
+        Adds the G1 latest news to the polled sources, one target per region.
+
+        Parameters:
+            regions (List[str]): G1 regions to be polled (e.g. ["sp", "rj", "brasil"]). If not set, polls "brasil".
+            max_pages (int): Number of pages retrieved per poll.
+            interval (Optional[float]): Initial interval in seconds. Defaults to the minimum interval.
+        """
+        crawler = self._get_crawler(G1News)
+        for region in regions if regions is not None else ["brasil"]:
+            region_list = None if region == "brasil" else [region]
+            self._add_target(
+                name=f"G1 {region.upper()}", crawler=crawler, interval=interval,
+                retrieve=lambda r=region_list: crawler.retrieve_latest_news(regions=r, max_pages=max_pages),
+            )
+
+    def add_folha(self, keywords: List[str], max_pages: int = 1, interval: Optional[float] = None) -> None:
+        """
+        Adds the Folha de São Paulo search results for the given keywords to the polled sources.
+
+        Parameters:
+            keywords (List[str]): A list containing all the keywords to be searched in the news platform.
+            max_pages (int): Number of pages retrieved per poll.
+            interval (Optional[float]): Initial interval in seconds. Defaults to the minimum interval.
+        """
+        crawler = self._get_crawler(FolhaNews)
+        self._add_target(
+            name="Folha de São Paulo", crawler=crawler, interval=interval,
+            retrieve=lambda: crawler.search_news(keywords=keywords, max_pages=max_pages),
+        )
+
+    def add_exame(self, keywords: List[str], max_pages: int = 1, interval: Optional[float] = None) -> None:
+        """
+        Adds the Exame search results for the given keywords to the polled sources.
+
+        Parameters:
+            keywords (List[str]): A list containing all the keywords to be searched in the news platform.
+            max_pages (int): Number of pages retrieved per poll.
+            interval (Optional[float]): Initial interval in seconds. Defaults to the minimum interval.
+        """
+        crawler = self._get_crawler(ExameNews)
+        self._add_target(
+            name="Exame", crawler=crawler, interval=interval,
+            retrieve=lambda: crawler.search_news(keywords=keywords, max_pages=max_pages),
+        )
+
+    def _filter_new(self, items: List[Union[str, dict]]) -> List[Union[str, dict]]:
+        return [item for item in items if job_key(item) not in self._seen]
+
+    def _mark_seen(self, item: Union[str, dict]) -> None:
+        self._seen[job_key(item)] = None
+        if len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+
+    def _store(self, crawler: Crawler, parsed_data: dict) -> None:
+        # Timed as the "store" phase of parse_news, which is suspended meanwhile.
+        if isinstance(crawler.DB, PyBrNewsDB):
+            crawler.DB.insert_data(parsed_data=parsed_data)
+        else:
+            crawler.DB.to_json(parsed_data=parsed_data)
+
+    def _poll(self, target: PollTarget) -> int:
+        """
+        Retrieves the latest items of a target, then parses and stores the new ones one by one. An item is only
+        marked as seen once it has been handled (stored, or skipped by the crawler as a duplicate); an error while
+        parsing or storing it, or a failed download, is logged and the item is retried on the next poll.
+
+        Parameters:
+            target (PollTarget): The polled source.
+        Returns:
+            int: Number of new items found.
+        """
+        try:
+            items = target.retrieve()
+        except Exception as e:
+            logger.warning(f"{target.name} >> Error while polling: {e!r}. Retrying on the next interval.")
+            return 0
+
+        new_items = self._filter_new(items)
+        crawler = target.crawler
+        # One profiled run per poll, instead of one per item.
+        crawler.PROFILER.start()
+        try:
+            for item in new_items:
+                if self._stop.is_set():
+                    break
+
+                skipped_duplicates, stored = crawler.skipped_duplicates, 0
+                try:
+                    for data in crawler.parse_news(news_urls=[item], parse_body=self.parse_body,
+                                                   save_html=self.save_html):
+                        self._store(crawler=crawler, parsed_data=data)
+                        stored += 1
+                except Exception as e:
+                    logger.error(
+                        f"{target.name} >> Error while handling {job_key(item)}: {e!r}. Retrying on the next poll."
+                    )
+                    continue
+
+                if stored == 0 and crawler.skipped_duplicates == skipped_duplicates:
+                    logger.warning(f"{target.name} >> Could not download {job_key(item)}. Retrying on the next poll.")
+                    continue
+
+                self._mark_seen(item)
+        finally:
+            crawler.PROFILER.stop()
+            crawler.PROFILER.log_report()
+
+        return len(new_items)
+
+    def stop(self, *args) -> None:
+        """
+        Stops the scheduler after the current poll. Also used as the SIGINT / SIGTERM handler.
+        """
+        logger.warning("Stopping the pyBrNews scheduler after the current poll.")
+        self._stop.set()
+
+    def run(self, max_cycles: Optional[int] = None) -> None:
+        """
+        Polls the sources until stop is called, each one when its interval is due.
+
+        Parameters:
+            max_cycles (Optional[int]): Number of polls before returning. If not set, runs until stopped.
+        """
+        if len(self.targets) == 0:
+            raise ValueError("No sources to be polled. Add them with add_g1, add_folha or add_exame.")
+
+        cycles = 0
+        while not self._stop.is_set():
+            target = min(self.targets, key=lambda t: t.next_run)
+            if self._stop.wait(timeout=max(0.0, target.next_run - time.monotonic())):
+                break
+
+            new_items = self._poll(target)
+            target.adapt(new_items=new_items)
+            logger.info(
+                f"{target.name} >> {new_items} new articles at {datetime.now()}. "
+                f"Next poll in {target.interval:.0f} seconds."
+            )
+
+            cycles += 1
+            if cycles == max_cycles:
+                break
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m pyBrNews.scheduler",
+                                     description="Continuously polls the latest news of the supported platforms.")
+    parser.add_argument("--g1-regions", nargs="*", help="G1 regions to be polled (e.g. sp rj brasil).")
+    parser.add_argument("--folha-keywords", nargs="*", help="Keywords searched on Folha de São Paulo.")
+    parser.add_argument("--exame-keywords", nargs="*", help="Keywords searched on Exame.")
+    parser.add_argument("--max-pages", type=int, default=1, help="Pages retrieved per poll.")
+    parser.add_argument("--min-interval", type=float, default=60, help="Minimum interval between polls, in seconds.")
+    parser.add_argument("--max-interval", type=float, default=1800, help="Maximum interval between polls, in seconds.")
+    parser.add_argument("--no-database", action="store_true", help="Export JSON files instead of using MongoDB.")
+    parser.add_argument("--save-path", default="", help="Save path for the JSON files, ending with a slash.")
+    parser.add_argument("--skip-body", action="store_true", help="Do not extract the article body.")
+    parser.add_argument("--save-html", action="store_true", help="Store the HTML of the articles.")
+    options = parser.parse_args(args)
+
+    scheduler = NewsScheduler(
+        use_database=not options.no_database, parse_body=not options.skip_body, save_html=options.save_html,
+        min_interval=options.min_interval, max_interval=options.max_interval, save_path=options.save_path,
+    )
+    if options.g1_regions is not None:
+        scheduler.add_g1(regions=options.g1_regions or None, max_pages=options.max_pages)
+    if options.folha_keywords:
+        scheduler.add_folha(keywords=options.folha_keywords, max_pages=options.max_pages)
+    if options.exame_keywords:
+        scheduler.add_exame(keywords=options.exame_keywords, max_pages=options.max_pages)
+
+    signal.signal(signal.SIGINT, scheduler.stop)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    scheduler.run()
+
+
+if __name__ == '__main__':
+    main()
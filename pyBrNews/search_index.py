@@ -0,0 +1,303 @@
+import json
+import math
+import mmap
+import os
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from .records import NewsRecord, as_dict
+from .text import fold_accents, tokenize
+
+STOPWORDS = frozenset(fold_accents(
+    "a à ao aos aquela aquele as às até com como da das de dela dele deles desta deste dessa desse do dos e é ela "
+    "elas ele eles em entre era essa esse esta está este eu foi for foram há isso isto já la lhe mais mas me mesmo "
+    "meu minha muito na nas não nem nesta neste nessa nesse no nos nós o os ou para pela pelas pelo pelos por qual "
+    "quando que quem se sem ser seu seus só sua suas também te tem têm ter um uma umas uns você vocês vai vão sobre "
+    "após ainda onde sido sendo seja são será serão"
+).split())
+
+
+def analyze(text: str) -> List[str]:
+    """
+    Splits a Portuguese text into the index terms: lowercase, accent folded words, without the stopwords.
+
+    Parameters:
+        text (str): The text to be analyzed.
+    Returns:
+        List[str]: The terms of the text, in order.
+    """
+    return [term for term in tokenize(text) if term not in STOPWORDS and len(term) > 1]
+
+
+class _Segment:
+    """
+    An immutable segment of the index: a term dictionary (term -> offset and count of its postings) and a postings
+    file of (document ID, term frequency) pairs of unsigned 32-bit integers, memory-mapped for reading.
+    """
+    def __init__(self, path: str, name: str) -> None:
+        self.name = name
+        with open(os.path.join(path, f"{name}.terms.json"), encoding="utf-8") as terms_file:
+            self.terms: Dict[str, List[int]] = json.load(terms_file)
+
+        self._file = open(os.path.join(path, f"{name}.postings"), "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.terms else None
+
+    def postings(self, term: str) -> Iterable[Tuple[int, int]]:
+        entry = self.terms.get(term)
+        if entry is None:
+            return ()
+
+        offset, count = entry
+        pairs = array("I", self._mmap[offset * 8:(offset + count) * 8])
+        return zip(pairs[0::2], pairs[1::2])
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    @staticmethod
+    def write(path: str, name: str, postings: Dict[str, List[Tuple[int, int]]]) -> None:
+        terms = {}
+        offset = 0
+        with open(os.path.join(path, f"{name}.postings"), "wb") as postings_file:
+            for term in sorted(postings.keys()):
+                pairs = array("I", (value for pair in sorted(postings[term]) for value in pair))
+                pairs.tofile(postings_file)
+                terms[term] = [offset, len(pairs) // 2]
+                offset += len(pairs) // 2
+
+        with open(os.path.join(path, f"{name}.terms.json"), "w", encoding="utf-8") as terms_file:
+            json.dump(terms, terms_file, ensure_ascii=False, separators=(",", ":"))
+
+
+class NewsIndex:
+    """
+    pyBrNews Full-Text Index Class, an incremental inverted index of the crawled articles stored in a local
+    directory, ranked by BM25.
+
+    Articles are analyzed (Portuguese stopwords removed, accents folded) and buffered in memory, then flushed every
+    flush_every articles into an immutable segment whose postings file is memory-mapped for the queries. Segments can
+    be combined with merge. The buffered articles are searchable before being flushed.
+
+    Updated as the crawlers yield the parsed news, by wrapping parse_news or as a NewsPipeline enricher:
+
+    Example:
+        index = NewsIndex(index_path="newsIndex/")
+        for news in index.indexed(crawler.parse_news(news_urls, parse_body=True)): ...
+        index.search("saneamento básico")
+    """
+    def __init__(self, index_path: str = "pyBrNewsIndex/", flush_every: int = 1000, k1: float = 1.2,
+                 b: float = 0.75) -> None:
+        self.index_path = index_path
+        self.flush_every = flush_every
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+        os.makedirs(index_path, exist_ok=True)
+
+        manifest = self._read_manifest()
+        self._next_segment: int = manifest["next_segment"]
+        self._segments = [_Segment(path=index_path, name=name) for name in manifest["segments"]]
+
+        self._documents: List[dict] = []
+        self._urls: Dict[str, int] = {}
+        documents_path = os.path.join(index_path, "documents.jsonl")
+        if os.path.exists(documents_path):
+            with open(documents_path, encoding="utf-8") as documents_file:
+                for line in documents_file:
+                    self._add_document(json.loads(line))
+        self._flushed_documents = len(self._documents)
+        self._total_length = sum(document["length"] for document in self._documents)
+
+        self._buffer: Dict[str, List[Tuple[int, int]]] = {}
+
+    def _read_manifest(self) -> dict:
+        manifest_path = os.path.join(self.index_path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return {"segments": [], "next_segment": 1}
+
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+    def _write_manifest(self) -> None:
+        manifest_path = os.path.join(self.index_path, "manifest.json")
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as manifest_file:
+            json.dump({"segments": [segment.name for segment in self._segments],
+                       "next_segment": self._next_segment}, manifest_file)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    def _add_document(self, document: dict) -> None:
+        self._urls[document["url"]] = len(self._documents)
+        self._documents.append(document)
+
+    def add(self, parsed_data: Union[dict, NewsRecord]) -> bool:
+        """
+        Adds a news article to the index, from its title, abstract and body. Articles already indexed (same URL) are
+        ignored.
+
+        Parameters:
+            parsed_data (Union[dict, NewsRecord]): The parsed data of a news article.
+        Returns:
+            bool: True if the article was added. False if it was already indexed.
+        """
+        parsed_data = as_dict(parsed_data)
+        terms = analyze(" ".join(parsed_data.get(field) or "" for field in ("title", "abstract", "body")))
+
+        with self._lock:
+            if parsed_data["url"] in self._urls.keys():
+                return False
+
+            document_id = len(self._documents)
+            self._add_document({
+                "url": parsed_data["url"], "title": parsed_data.get("title"),
+                "platform": parsed_data.get("platform"), "length": len(terms),
+            })
+            self._total_length += len(terms)
+            for term, frequency in Counter(terms).items():
+                self._buffer.setdefault(term, []).append((document_id, frequency))
+
+            if len(self._documents) - self._flushed_documents >= self.flush_every:
+                self.flush()
+
+        return True
+
+    def flush(self) -> None:
+        """
+        Writes the buffered articles into a new segment.
+        """
+        with self._lock:
+            if len(self._documents) == self._flushed_documents:
+                return
+
+            name = f"segment_{self._next_segment:06d}"
+            _Segment.write(path=self.index_path, name=name, postings=self._buffer)
+            with open(os.path.join(self.index_path, "documents.jsonl"), "a", encoding="utf-8") as documents_file:
+                for document in self._documents[self._flushed_documents:]:
+                    documents_file.write(json.dumps(document, ensure_ascii=False) + "\n")
+
+            self._segments.append(_Segment(path=self.index_path, name=name))
+            self._next_segment += 1
+            self._write_manifest()
+
+            logger.info(
+                f"Index segment {name} written with {len(self._documents) - self._flushed_documents} articles."
+            )
+            self._flushed_documents = len(self._documents)
+            self._buffer = {}
+
+    def merge(self) -> None:
+        """
+        Flushes the buffered articles and combines all the segments into a single one, making the queries read a
+        single postings list per term.
+        """
+        with self._lock:
+            self.flush()
+            if len(self._segments) < 2:
+                return
+
+            postings: Dict[str, List[Tuple[int, int]]] = {}
+            for segment in self._segments:
+                for term in segment.terms.keys():
+                    postings.setdefault(term, []).extend(segment.postings(term))
+
+            name = f"segment_{self._next_segment:06d}"
+            _Segment.write(path=self.index_path, name=name, postings=postings)
+            old_segments = self._segments
+            self._segments = [_Segment(path=self.index_path, name=name)]
+            self._next_segment += 1
+            self._write_manifest()
+
+            for segment in old_segments:
+                segment.close()
+                for extension in ("postings", "terms.json"):
+                    os.remove(os.path.join(self.index_path, f"{segment.name}.{extension}"))
+
+            logger.info(f"{len(old_segments)} index segments merged into {name}.")
+
+    def _postings(self, term: str) -> Iterable[Tuple[int, int]]:
+        for segment in self._segments:
+            yield from segment.postings(term)
+        yield from self._buffer.get(term, ())
+
+    def search(self, query: str, limit: int = 10, platform: Optional[str] = None) -> List[dict]:
+        """
+        Searches the indexed articles matching any of the query terms, ranked by BM25.
+
+        Parameters:
+            query (str): The search terms, e.g. "saneamento básico".
+            limit (int): Maximum number of results.
+            platform (Optional[str]): Only returns the articles of this platform, e.g. "Portal G1".
+        Returns:
+            List[dict]: The matching articles (url, title, platform and score), best first.
+        """
+        terms = set(analyze(query))
+        with self._lock:
+            total_documents = len(self._documents)
+            if total_documents == 0 or not terms:
+                return []
+
+            average_length = self._total_length / total_documents
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = list(self._postings(term))
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (total_documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                for document_id, frequency in postings:
+                    length = self._documents[document_id]["length"]
+                    scores[document_id] = scores.get(document_id, 0.0) + idf * frequency * (self.k1 + 1) / (
+                        frequency + self.k1 * (1 - self.b + self.b * length / average_length)
+                    )
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            results = []
+            for document_id, score in ranked:
+                document = self._documents[document_id]
+                if platform is not None and document["platform"] != platform:
+                    continue
+
+                results.append({
+                    "url": document["url"], "title": document["title"], "platform": document["platform"],
+                    "score": round(score, 4),
+                })
+                if len(results) == limit:
+                    break
+
+        return results
+
+    def indexed(self, parsed_news: Iterable[Union[dict, NewsRecord]]) -> Iterable[Union[dict, NewsRecord]]:
+        """
+        Indexes the articles yielded by parse_news while passing them through, flushing the buffer at the end.
+
+        Parameters:
+            parsed_news (Iterable[Union[dict, NewsRecord]]): The articles yielded by parse_news.
+        Returns:
+            Iterable[Union[dict, NewsRecord]]: Per iteration -> The given article.
+        """
+        try:
+            for news in parsed_news:
+                self.add(news)
+                yield news
+        finally:
+            self.flush()
+
+    def __call__(self, parsed_data: dict) -> dict:
+        self.add(parsed_data)
+        return parsed_data
+
+    def close(self) -> None:
+        """
+        Flushes the buffered articles and releases the memory-mapped segments.
+        """
+        with self._lock:
+            self.flush()
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
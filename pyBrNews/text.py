@@ -0,0 +1,117 @@
+import re
+import unicodedata
+from typing import Iterable, List, Optional, Pattern, Union
+
+from requests_html import Element, HTML
+
+BOILERPLATE_PATTERNS: List[Pattern] = [
+    re.compile(r"^\s*(leia|veja|assista|ouça) (também|mais)\b", re.IGNORECASE),
+    re.compile(r"^\s*(siga|acompanhe) (o|a) (g1|folha|exame)\b", re.IGNORECASE),
+    re.compile(r"^\s*(clique aqui|assine|inscreva-se|receba (as|nossas) not[ií]cias)\b", re.IGNORECASE),
+    re.compile(r"^\s*(📲|🔔|➡️)"),
+]
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_SKIPPED_TAGS = frozenset(("script", "style", "noscript", "template"))
+_BREAK_TAGS = frozenset((
+    "br", "hr", "p", "div", "section", "article", "aside", "blockquote", "figure", "figcaption", "ul", "ol", "li",
+    "dl", "dt", "dd", "table", "tr", "td", "th", "h1", "h2", "h3", "h4", "h5", "h6", "pre",
+))
+
+
+def clean_text(text_nodes: Iterable[str], boilerplate: Optional[List[Pattern]] = None) -> str:
+    """
+    Joins the text blocks of an article body in a single pass, dropping the boilerplate blocks (e.g. "Leia também",
+    "Siga o g1") and collapsing every whitespace run (incl. line breaks) into a single space.
+
+    Parameters:
+        text_nodes (Iterable[str]): The text of each block (e.g. paragraph) of the article body, in document order.
+        boilerplate (Optional[List[Pattern]]): Precompiled patterns matching boilerplate blocks. Defaults to
+                                               BOILERPLATE_PATTERNS.
+    Returns:
+        str: The normalized body text.
+    """
+    patterns = BOILERPLATE_PATTERNS if boilerplate is None else boilerplate
+
+    return " ".join(
+        word
+        for node in text_nodes
+        if not any(pattern.match(node) for pattern in patterns)
+        for word in node.split()
+    )
+
+
+def _append_text(element, parts: List[str]) -> None:
+    # Comments and processing instructions have a non-string tag.
+    if not isinstance(element.tag, str) or element.tag in _SKIPPED_TAGS:
+        return
+
+    breaks = element.tag in _BREAK_TAGS
+    if breaks:
+        parts.append(" ")
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        _append_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+    if breaks:
+        parts.append(" ")
+
+
+def _block_text(node: Union[str, Element]) -> str:
+    if isinstance(node, str):
+        return node
+
+    # Inline tags are joined without separators, so the words they split are kept whole (e.g. <b>infla</b>ção),
+    # while line breaks and nested blocks separate their words.
+    parts: List[str] = []
+    _append_text(node.element, parts)
+    return "".join(parts)
+
+
+def extract_body(article_page: HTML, xpath: str, boilerplate: Optional[List[Pattern]] = None) -> Optional[str]:
+    """
+    Extracts the body text of a news article page from the blocks (e.g. paragraphs) selected by the given XPath,
+    normalized by clean_text. A boilerplate block is dropped as a whole, incl. the link that follows its label.
+
+    Parameters:
+        article_page (HTML): A HTML object containing the data from the news article page.
+        xpath (str): XPath selecting the block elements (or text nodes) of the article body.
+        boilerplate (Optional[List[Pattern]]): Precompiled patterns matching boilerplate blocks. Defaults to
+                                               BOILERPLATE_PATTERNS.
+    Returns:
+        Optional[str]: The full body text of the news article. None if not found.
+    """
+    nodes = article_page.xpath(xpath)
+    if not nodes:
+        return None
+
+    body = clean_text(text_nodes=(_block_text(node) for node in nodes), boilerplate=boilerplate)
+    if len(body) == 0:
+        return None
+
+    return body
+
+
+def fold_accents(text: str) -> str:
+    """
+    Lowercases a text and removes its accents and other non-ASCII characters (e.g. "Ação" -> "acao").
+
+    Parameters:
+        text (str): The text to be folded.
+    Returns:
+        str: The folded text.
+    """
+    return unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits a text into accent folded, lowercase words.
+
+    Parameters:
+        text (str): The text to be tokenized.
+    Returns:
+        List[str]: The words of the text, in order.
+    """
+    return _TOKEN_PATTERN.findall(fold_accents(text))
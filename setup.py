@@ -11,6 +11,9 @@ setup(
     install_requires=[
         "loguru>=0.6.0", "pymongo>=4.3.2", "requests_html>=0.10.0"
     ],
+    extras_require={
+        "analytics": ["numpy>=1.21", "pyarrow>=8.0"],
+    },
     version='0.1.2',
     description='A Brazilian News Website Data Acquisition Library for Python',
     long_description=readme,
@@ -0,0 +1,49 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pyBrNews.analytics import CommentBatch  # noqa: E402
+
+
+def _comment(url: str, author: str, upvote: int, date: datetime) -> dict:
+    return {"news_data": {"url": url}, "author": author, "upvote": upvote, "date": date, "comment": "Ótimo texto"}
+
+
+@pytest.fixture
+def sao_paulo_tz(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    monkeypatch.setenv("TZ", "America/Sao_Paulo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_naive_dates_are_bucketed_as_utc(sao_paulo_tz):
+    batch = CommentBatch.from_comments([
+        _comment("a", "Ana", 1, datetime(2024, 5, 1, 12, 0)),
+        _comment("a", "Rui", 3, datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)),
+    ])
+
+    buckets = batch.per_time_bucket("h")
+
+    assert buckets["bucket"].tolist() == [np.datetime64("2024-05-01T12", "h")]
+    assert buckets["comments"].tolist() == [2]
+
+
+def test_per_article_aggregates():
+    batch = CommentBatch.from_comments([
+        _comment("a", "Ana", 1, datetime(2024, 5, 1, 12, 0)),
+        _comment("a", "Rui", 3, datetime(2024, 5, 1, 13, 0)),
+        _comment("b", "Ana", 5, None),
+    ])
+
+    articles = batch.per_article()
+
+    assert articles["comments"].tolist() == [2, 1]
+    assert articles["upvotes"].tolist() == [4, 5]
+    assert articles["max_upvote"].tolist() == [3, 5]
@@ -0,0 +1,33 @@
+from pyBrNews.changes import ChangeTracker
+from pyBrNews.config.database import PyBrNewsFS
+
+ARTICLE = {"url": "https://g1.globo.com/sp/noticia/a.ghtml", "title": "Título A", "body": "Um. Dois. Três."}
+
+
+def _file_system(tmp_path) -> PyBrNewsFS:
+    file_system = PyBrNewsFS()
+    file_system.set_save_path(fs_save_path=f"{tmp_path}/")
+    return file_system
+
+
+def test_state_is_only_saved_after_the_store(tmp_path):
+    file_system = _file_system(tmp_path)
+    assert ChangeTracker(backend=file_system).track(parsed_data=ARTICLE) == "new"
+
+    # The article was never stored: a later crawl still sees it as new.
+    tracker = ChangeTracker(backend=file_system)
+    assert tracker.track(parsed_data=ARTICLE) == "new"
+    file_system.to_json(parsed_data=ARTICLE)
+
+    tracker = ChangeTracker(backend=file_system)
+    assert tracker.track(parsed_data=dict(ARTICLE, body="um.  dois. TRÊS.")) == "unchanged"
+
+
+def test_changes_are_written_as_versions():
+    tracker = ChangeTracker()
+    tracker.track(parsed_data=ARTICLE)
+    tracker.confirm(parsed_data=ARTICLE)
+
+    assert tracker.track(parsed_data=dict(ARTICLE, body="Um. Dois e meio. Três. Quatro.")) == "changed"
+    assert tracker.history(ARTICLE["url"])[0]["delta"] == [[1, 1, ["Dois."], ["Dois e meio."]], [3, 3, [], ["Quatro."]]]
+    assert tracker.version_text(ARTICLE["url"], 1) == {"title": "Título A", "body": "Um. Dois. Três."}
@@ -0,0 +1,71 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from requests_html import HTML
+
+from pyBrNews.config import database
+from pyBrNews.news.folha_sp import FolhaNews
+from pyBrNews.news.g1 import G1News
+
+mongomock = pytest.importorskip("mongomock")
+
+FIXTURES = Path(__file__).resolve().parents[1] / "benchmarks" / "fixtures"
+ARTICLE_URL = "https://g1.globo.com/sp/sao-paulo/noticia/2024/05/01/saneamento.ghtml"
+
+
+@pytest.fixture
+def parsed_article() -> dict:
+    page = HTML(html=(FIXTURES / "g1_article.html").read_bytes(), url=ARTICLE_URL)
+    return G1News(use_database=False)._parse_article(news_item=ARTICLE_URL, article_page=page, parse_body=True,
+                                                     save_html=True)
+
+
+@pytest.fixture
+def split_db(monkeypatch) -> database.PyBrNewsDB:
+    monkeypatch.setattr(database.pymongo, "MongoClient", mongomock.MongoClient)
+    return database.PyBrNewsDB(split_content=True)
+
+
+def test_split_content_stores_a_parsed_article(split_db, parsed_article):
+    assert isinstance(parsed_article["html"], bytes)
+    original = dict(parsed_article)
+
+    split_db.insert_data(parsed_data=parsed_article)
+
+    assert parsed_article["body"] == original["body"] and parsed_article["html"] == original["html"]
+    document = split_db.collection.find_one({"url": ARTICLE_URL})
+    assert document is not None and "body" not in document and "html" not in document
+    assert document["has_body"] and document["has_html"]
+
+    content = split_db.load_content(document)
+    assert content["body"] == original["body"]
+    assert content["html"] == original["html"]
+
+
+def test_split_content_failure_leaves_no_orphan(split_db, parsed_article, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("content collection unavailable")
+
+    content_collection = split_db.content_collection
+    monkeypatch.setattr(content_collection, "insert_one", fail)
+    monkeypatch.setattr(database.PyBrNewsDB, "content_collection", property(lambda self: content_collection))
+
+    split_db.insert_data(parsed_data=parsed_article)
+
+    assert split_db.collection.count_documents({}) == 0
+    assert parsed_article["body"] is not None and parsed_article["html"] is not None
+
+
+def test_recrawl_matches_an_article_stored_with_the_old_date_format(monkeypatch):
+    monkeypatch.setattr(database.pymongo, "MongoClient", mongomock.MongoClient)
+    news_db = database.PyBrNewsDB()
+    url = "https://www1.folha.uol.com.br/cotidiano/2022/10/saneamento.shtml"
+    # Folha dates were always stored as the naive Brasilia wall-clock time of the page.
+    news_db.collection.insert_one({"url": url, "date": datetime(2022, 10, 30, 10, 45, 12)})
+
+    page = HTML(html=(FIXTURES / "folha_article.html").read_bytes(), url=url)
+    parsed_data = FolhaNews(use_database=False)._parse_article(news_item=url, article_page=page, save_html=False)
+
+    assert parsed_data["date"] == datetime(2022, 10, 30, 10, 45, 12)
+    assert news_db.check_duplicates(parsed_data)
@@ -0,0 +1,69 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pyBrNews.metrics import METRICS
+from pyBrNews.news.g1 import G1News
+
+PAGE = b"<html><head><title>Saneamento</title></head><body>" + b"<p>Texto</p>" * 2000 + b"</body></html>"
+
+
+class ChunkedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.path == "/large":
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+            return
+
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(PAGE), 4096):
+            chunk = PAGE[start:start + 4096]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChunkedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def crawler(monkeypatch):
+    monkeypatch.setattr(METRICS, "enabled", True)
+    METRICS.reset()
+    yield G1News(use_database=False)
+    METRICS.reset()
+
+
+def test_streamed_downloads_count_the_bytes_read(crawler, server_url):
+    _, content = crawler._stream_page(url=f"{server_url}/chunked")
+    assert content == PAGE
+    assert sum(METRICS.downloaded_bytes.values()) == len(PAGE)
+
+    METRICS.reset()
+    _, content = crawler._stream_page(url=f"{server_url}/chunked", head_only=True)
+    assert content is not None and len(content) < len(PAGE)
+    assert sum(METRICS.downloaded_bytes.values()) == len(content)
+
+
+def test_aborted_downloads_do_not_count_the_advertised_length(crawler, server_url, monkeypatch):
+    monkeypatch.setattr(crawler, "MAX_RESPONSE_BYTES", 1024)
+
+    _, content = crawler._stream_page(url=f"{server_url}/large")
+
+    assert content is None
+    assert sum(METRICS.downloaded_bytes.values()) == 0
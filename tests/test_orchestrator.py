@@ -0,0 +1,58 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from pyBrNews.orchestrator import _BudgetAdapter, validate_plan
+
+PLAN = {"platforms": [{"name": "exame", "discover": True, "since": "2024-05-01"}]}
+
+
+def test_validate_plan_accepts_a_valid_plan():
+    assert validate_plan(PLAN) is PLAN
+
+
+@pytest.mark.parametrize("plan, message", [
+    ({}, "no platforms"),
+    ({"platforms": [{"name": "estadao", "keywords": ["Saneamento"]}]}, "invalid platform"),
+    ({"platforms": [{"keywords": ["Saneamento"]}]}, "invalid platform"),
+    ({"platforms": [{"name": "g1"}]}, "needs keywords, regions or discover"),
+    ({"platforms": [{"name": "exame", "discover": True, "since": "ontem"}]}, "invalid since date"),
+    ({"platforms": [{"name": "folha", "regions": ["sp"]}]}, "only supported by the g1 platform"),
+    ({"platforms": [{"name": "exame", "keywords": ["Juros"], "comments": True}]}, "not supported"),
+    (dict(PLAN, sink={"type": "csv"}), "invalid sink type"),
+])
+def test_validate_plan_rejects_invalid_plans(plan, message):
+    with pytest.raises(ValueError, match=message):
+        validate_plan(plan)
+
+
+def test_budget_adapter_holds_a_slot_during_each_request():
+    budget = threading.BoundedSemaphore(1)
+    slots_free = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            slots_free.append(budget.acquire(blocking=False))
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    session = requests.Session()
+    session.mount("http://", _BudgetAdapter(budget=budget))
+    try:
+        for _ in range(2):
+            assert session.get(f"http://127.0.0.1:{server.server_port}/").content == b"ok"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert slots_free == [False, False]
+    assert budget.acquire(blocking=False)
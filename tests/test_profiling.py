@@ -0,0 +1,40 @@
+import time
+
+from pyBrNews.news.g1 import G1News
+from pyBrNews.pipeline import NewsPipeline
+
+ARTICLE = {"title": "Saneamento", "url": "https://g1.globo.com/sp/noticia/a.ghtml", "platform": "Portal G1"}
+
+
+def _crawl(crawler: G1News, articles: int) -> None:
+    for _ in crawler.parse_news(news_urls=[dict(ARTICLE)] * articles, fields=["title"]):
+        time.sleep(0.02)
+
+
+def test_report_covers_the_last_run_and_the_store_phase():
+    crawler = G1News(use_database=False, profile=True)
+
+    _crawl(crawler, articles=3)
+    _crawl(crawler, articles=2)
+
+    report = crawler.PROFILER.report()
+    assert report["phases"]["parse"]["calls"] == 2
+    assert report["phases"]["store"]["calls"] == 2
+    assert 0.04 <= report["phases"]["store"]["wall"] <= report["wall_time"] < 0.5
+
+
+def test_pipeline_phases_report_their_share_per_thread(monkeypatch):
+    crawler = G1News(use_database=False, profile=True)
+    monkeypatch.setattr(crawler.PROFILER, "use_cprofile", True)
+
+    def fetch(news_item, head_only=False):
+        time.sleep(0.05)
+
+    monkeypatch.setattr(crawler, "_fetch_article", fetch)
+    NewsPipeline(crawler=crawler, fetch_workers=4).run(news_urls=[ARTICLE["url"]] * 8)
+
+    report = crawler.PROFILER.report()
+    assert report["phases"]["fetch"]["threads"] == 4
+    assert report["phases"]["fetch"]["wall"] > report["wall_time"]
+    assert 0 < report["phases"]["fetch"]["wall_share"] <= 1
+    assert report["hot_spots"] == []
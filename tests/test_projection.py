@@ -0,0 +1,34 @@
+from pyBrNews.news.g1 import G1News
+
+METADATA = {
+    "title": "Saneamento", "abstract": None, "date": None, "section": "São Paulo", "region": "SP",
+    "url": "https://g1.globo.com/sp/sao-paulo/noticia/2024/05/01/saneamento.ghtml", "platform": "Portal G1",
+    "tags": None, "type": "noticia", "body": None, "id_data": None, "html": None,
+}
+
+
+def test_metadata_fields_without_value_need_the_page():
+    crawler = G1News(use_database=False)
+
+    assert not crawler._needs_page(fields=crawler._select_fields(["title", "section", "region"]), news_item=METADATA)
+    assert crawler._needs_page(fields=crawler._select_fields(["tags"]), news_item=METADATA)
+    assert crawler._needs_page(fields=crawler._select_fields(["abstract"]), news_item=METADATA)
+    assert not crawler._needs_page(fields=crawler._select_fields(["abstract"]),
+                                   news_item=dict(METADATA, abstract="Resumo"))
+
+
+def test_default_metadata_crawl_does_not_download_the_pages(monkeypatch):
+    crawler = G1News(use_database=False)
+
+    def download(*args, **kwargs):
+        raise AssertionError("the article page was downloaded")
+
+    monkeypatch.setattr(crawler.SESSION, "get", download)
+    parsed_news, = crawler.parse_news(news_urls=[dict(METADATA)], save_html=False)
+
+    assert parsed_news["title"] == "Saneamento" and parsed_news["tags"] is None
+    assert parsed_news["body"] is None and parsed_news["html"] is None
+    assert crawler._needs_page(fields=None, save_html=True, news_item=METADATA)
+
+    partial, = crawler.parse_news(news_urls=[{"title": "Saneamento", "url": METADATA["url"]}], save_html=False)
+    assert partial["title"] == "Saneamento" and partial["abstract"] is None and partial["region"] == "SP"
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+
+from pyBrNews.config.database import PyBrNewsFS
+from pyBrNews.config.record_log import PyBrNewsRecordLog
+
+
+def _article(html: bytes) -> dict:
+    return {"title": "Saneamento", "url": "https://g1.globo.com/sp/noticia/a.ghtml", "platform": "Portal G1",
+            "date": datetime(2024, 5, 1, 10, 0), "html": html}
+
+
+@pytest.mark.parametrize("html, expected", [
+    ("<html>é</html>".encode("utf-8"), "<html>é</html>"),
+    ("<html>é</html>".encode("latin-1"), "<html>é</html>".encode("latin-1")),
+])
+def test_record_log_keeps_the_html(tmp_path, html, expected):
+    record_log = PyBrNewsRecordLog(log_path=str(tmp_path))
+    location = record_log.append(parsed_data=_article(html))
+
+    stored = record_log.read(location)
+    assert stored["html"] == expected
+    assert stored["date"] == "2024-05-01 10:00:00"
+    record_log.close()
+
+
+@pytest.mark.parametrize("use_record_log", [False, True])
+def test_file_system_keeps_the_html(tmp_path, use_record_log):
+    file_system = PyBrNewsFS(use_record_log=use_record_log)
+    file_system.set_save_path(fs_save_path=f"{tmp_path}/")
+    file_system.to_json(parsed_data=_article("<html>é</html>".encode("utf-8")))
+
+    stored = list(file_system.find_news(platform="Portal G1", include_html=True))
+    assert len(stored) == 1 and stored[0]["html"] == "<html>é</html>"
@@ -0,0 +1,32 @@
+import pytest
+
+from pyBrNews.records import ArticleRef, CommentRecord, NewsRecord
+
+
+def test_records_compare_by_value_and_are_not_hashable():
+    assert NewsRecord(title="Saneamento") == NewsRecord(title="Saneamento")
+    assert NewsRecord(title="Saneamento") != NewsRecord(title="Enchentes")
+    with pytest.raises(TypeError):
+        hash(NewsRecord(title="Saneamento"))
+
+
+def test_comment_id_is_read_under_the_platform_key():
+    record = CommentRecord(author="Ana", date=None, upvote=3, news_data=ArticleRef(title="Saneamento"),
+                           comment="Ótimo", comment_id=42, platform="Portal G1", id_key="g1_id")
+
+    assert record["g1_id"] == record["comment_id"] == record.to_dict()["g1_id"] == 42
+    assert record.get("g1_id") == 42
+    assert record.get("missing") is None
+    with pytest.raises(KeyError):
+        record["missing"]
+
+
+def test_keys_match_the_parsed_data_dictionary():
+    news_data = ArticleRef(title="Saneamento", url="https://g1.globo.com/a.ghtml")
+    record = CommentRecord(author="Ana", date=None, upvote=3, news_data=news_data, comment="Ótimo", comment_id=42,
+                           platform="Portal G1", id_key="g1_id")
+
+    assert record.keys() == tuple(record.to_dict().keys())
+    assert news_data.keys() == tuple(news_data.to_dict().keys()) == ("title", "region", "url")
+    assert dict(news_data) == news_data.to_dict()
+    assert dict(NewsRecord(title="Saneamento")) == NewsRecord(title="Saneamento").to_dict()
@@ -0,0 +1,55 @@
+import functools
+import http.server
+import threading
+from pathlib import Path
+
+import pytest
+from pyppeteer import chromium_downloader
+
+from pyBrNews.config.renderer import PyBrNewsRenderer
+from pyBrNews.news.g1 import G1News
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+RULES = {"G1News": [{"pattern": r"/video/", "wait_xpath": '//meta[@itemprop="uploadDate"]'}]}
+
+
+@pytest.fixture
+def fixture_server():
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(FIXTURES))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_rules_match_only_the_configured_urls():
+    renderer = PyBrNewsRenderer(rules=RULES)
+
+    wait_xpath = RULES["G1News"][0]["wait_xpath"]
+    assert renderer.rule(platform="G1News", url="https://g1.globo.com/sp/video/abc.ghtml")[1] == wait_xpath
+    assert renderer.rule(platform="G1News", url="https://g1.globo.com/sp/noticia/abc.ghtml") is None
+    assert renderer.rule(platform="ExameNews", url="https://exame.com/video/abc") is None
+
+
+def test_failed_launch_disables_the_renderer(fixture_server):
+    renderer = PyBrNewsRenderer(rules=RULES, launch_options={"executablePath": str(FIXTURES / "no-chromium")})
+
+    crawler = G1News(use_database=False, renderer=renderer)
+
+    assert crawler._render_page(url=f"{fixture_server}/video/render_page.html") is None
+    assert renderer.disabled
+    assert renderer.render(url=f"{fixture_server}/render_page.html") is None
+
+
+@pytest.mark.skipif(not chromium_downloader.check_chromium(), reason="Chromium is not installed for pyppeteer.")
+def test_render_waits_for_the_node_inserted_by_javascript(fixture_server):
+    renderer = PyBrNewsRenderer(pool_size=1, timeout=10, wait_until="load", rules=RULES)
+    try:
+        page = renderer.render(url=f"{fixture_server}/render_page.html", wait_xpath=RULES["G1News"][0]["wait_xpath"])
+    finally:
+        renderer.close()
+
+    assert page is not None
+    assert page.xpath('//meta[@itemprop="uploadDate"]/@content', first=True) == "2024-05-01T10:00:00-03:00"
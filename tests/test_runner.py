@@ -0,0 +1,33 @@
+import os
+
+from pyBrNews.config.work_queue import PyBrNewsLocalQueue
+from pyBrNews.runner import ShardedRunner, shard_of
+
+URLS = [f"https://g1.globo.com/sp/sao-paulo/noticia/2024/05/01/saneamento-{i}.ghtml" for i in range(3)]
+
+
+def test_shard_of_is_stable():
+    shards = [shard_of(item=url, shards=4) for url in URLS]
+
+    assert shards == [shard_of(item=url, shards=4) for url in URLS]
+    assert all(0 <= shard < 4 for shard in shards)
+    assert shard_of(item={"link": URLS[0]}, shards=4) == shards[0]
+    assert shard_of(item=URLS[0], shards=1) == 0
+
+
+def test_single_writer_run_consumes_a_local_queue(tmp_path):
+    queue_path = str(tmp_path / "queue.db")
+    save_path = tmp_path / "data"
+    save_path.mkdir()
+    # Metadata items: the default projection without body and HTML needs no download.
+    items = [{"title": f"Saneamento {i}", "url": url, "platform": "Portal G1"} for i, url in enumerate(URLS)]
+    PyBrNewsLocalQueue(db_path=queue_path).enqueue(items, platform="G1News")
+
+    runner = ShardedRunner(platform="g1", workers=2, use_database=False, save_path=f"{save_path}/",
+                           parse_body=False, save_html=False)
+    summary = runner.run(queue_path=queue_path)
+
+    assert summary["stored"] == 3 and summary["errors"] == 0
+    assert sorted(summary["shards"].keys()) == [0, 1]
+    assert len([name for name in os.listdir(save_path) if name.endswith(".json")]) == 3
+    assert PyBrNewsLocalQueue(db_path=queue_path).stats()["done"] == 3
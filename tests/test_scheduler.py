@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from requests_html import HTML
+
+from pyBrNews.news.g1 import G1News
+from pyBrNews.scheduler import NewsScheduler
+
+FIXTURES = Path(__file__).resolve().parents[1] / "benchmarks" / "fixtures"
+ARTICLE_URL = "https://g1.globo.com/sp/sao-paulo/noticia/2024/05/01/saneamento.ghtml"
+
+
+def test_failed_items_are_retried_on_the_next_poll(tmp_path):
+    scheduler = NewsScheduler(use_database=False, save_path=f"{tmp_path}/")
+    crawler = scheduler._get_crawler(G1News)
+    attempts = {"bad": 0}
+
+    def parse_news(news_urls, **kwargs):
+        if news_urls[0] == "bad":
+            attempts["bad"] += 1
+            if attempts["bad"] == 1:
+                raise KeyError("falkor")
+        yield {"url": news_urls[0]}
+
+    stored = []
+    crawler.parse_news = parse_news
+    scheduler._store = lambda crawler, parsed_data: stored.append(parsed_data["url"])
+    scheduler._add_target(name="G1", crawler=crawler, retrieve=lambda: ["a", "bad", "c"], interval=1)
+
+    assert scheduler._poll(scheduler.targets[0]) == 3
+    assert stored == ["a", "c"]
+    assert scheduler._poll(scheduler.targets[0]) == 1
+    assert stored == ["a", "c", "bad"]
+    assert scheduler._poll(scheduler.targets[0]) == 0
+
+
+def test_polling_errors_do_not_stop_the_scheduler():
+    scheduler = NewsScheduler(use_database=False)
+
+    def retrieve():
+        raise ConnectionError("G1 unavailable")
+
+    scheduler._add_target(name="G1", crawler=scheduler._get_crawler(G1News), retrieve=retrieve, interval=1)
+
+    assert scheduler._poll(scheduler.targets[0]) == 0
+
+
+def test_failed_downloads_are_retried_and_duplicates_are_not(tmp_path, monkeypatch):
+    scheduler = NewsScheduler(use_database=False, save_path=f"{tmp_path}/")
+    crawler = scheduler._get_crawler(G1News)
+    reports = []
+    monkeypatch.setattr(crawler.PROFILER, "enabled", True)
+    monkeypatch.setattr(crawler.PROFILER, "format_report", lambda top=15: reports.append(top) or "")
+    scheduler._add_target(name="G1", crawler=crawler, retrieve=lambda: [ARTICLE_URL], interval=1)
+
+    monkeypatch.setattr(crawler, "_fetch_article", lambda news_item, head_only=False: None)
+    assert scheduler._poll(scheduler.targets[0]) == 1
+    assert len(reports) == 1
+
+    page = HTML(html=(FIXTURES / "g1_article.html").read_bytes(), url=ARTICLE_URL)
+    monkeypatch.setattr(crawler, "_fetch_article", lambda news_item, head_only=False: page)
+    monkeypatch.setattr(crawler.DB, "check_duplicates", lambda parsed_data: True)
+    assert scheduler._poll(scheduler.targets[0]) == 1
+    assert scheduler._poll(scheduler.targets[0]) == 0
@@ -0,0 +1,51 @@
+import os
+
+from pyBrNews.search_index import NewsIndex, analyze
+
+ARTICLES = [
+    {"url": "https://g1.globo.com/a.ghtml", "title": "Saneamento básico chega a bairros", "platform": "Portal G1",
+     "body": "A obra de saneamento básico atende três bairros."},
+    {"url": "https://www1.folha.uol.com.br/b.shtml", "title": "Inflação sobe em maio",
+     "platform": "Folha de São Paulo", "body": "A inflação de maio foi puxada pelos alimentos e pelo saneamento."},
+    {"url": "https://exame.com/c/", "title": "Juros e inflação", "platform": "Exame",
+     "body": "O Banco Central manteve os juros."},
+]
+
+
+def test_analyze_folds_accents_and_drops_stopwords():
+    assert analyze("A Inflação de São Paulo") == ["inflacao", "paulo"]
+
+
+def test_index_flush_merge_and_search(tmp_path):
+    index = NewsIndex(index_path=str(tmp_path), flush_every=1)
+    for article in ARTICLES:
+        assert index.add(article)
+    assert not index.add(ARTICLES[0])
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith(".postings")) == [
+        "segment_000001.postings", "segment_000002.postings", "segment_000003.postings",
+    ]
+
+    before = index.search("saneamento básico")
+    index.merge()
+
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith(".postings")) == ["segment_000004.postings"]
+    assert index.search("saneamento básico") == before
+    assert [result["url"] for result in before] == [ARTICLES[0]["url"], ARTICLES[1]["url"]]
+    assert before[0]["score"] > before[1]["score"] > 0
+    assert [result["url"] for result in index.search("inflação", platform="Exame")] == [ARTICLES[2]["url"]]
+    assert index.search("inexistente") == []
+    index.close()
+
+
+def test_index_is_reopened_from_disk_with_the_buffered_articles(tmp_path):
+    index = NewsIndex(index_path=str(tmp_path), flush_every=100)
+    assert list(index.indexed(iter(ARTICLES))) == ARTICLES
+    assert index.search("juros")[0]["url"] == ARTICLES[2]["url"]
+    results = index.search("inflação")
+    index.close()
+
+    reopened = NewsIndex(index_path=str(tmp_path))
+    assert {result["url"] for result in results} == {ARTICLES[1]["url"], ARTICLES[2]["url"]}
+    assert reopened.search("inflação") == results
+    assert not reopened.add(ARTICLES[1])
+    reopened.close()
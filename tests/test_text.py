@@ -0,0 +1,25 @@
+from requests_html import HTML
+
+from pyBrNews.news.exame import ExameNews
+from pyBrNews.news.g1 import G1News
+
+
+def test_inline_tags_do_not_split_words():
+    page = HTML(html='<div id="news-body"><p>A <b>infla</b>ção, segundo o Banco <a href="#">Central</a>, subiu.</p>'
+                     '<script>var x = 1;</script></div>')
+
+    assert ExameNews._extract_body(article_page=page) == "A inflação, segundo o Banco Central, subiu."
+
+
+def test_boilerplate_block_is_dropped_whole():
+    page = HTML(html='<div class="mc-article-body"><p>O <a href="#">g1</a> apurou.</p>'
+                     '<p>Leia também: <a href="#">Outra notícia sobre juros</a></p></div>')
+
+    assert G1News._extract_body(article_page=page) == "O g1 apurou."
+
+
+def test_line_breaks_and_nested_blocks_separate_words():
+    page = HTML(html='<div class="mc-article-body"><p>Texto<br>Outro</p>'
+                     '<p>Fim<span>da</span><div>lista</div><!-- nota -->final</p></div>')
+
+    assert G1News._extract_body(article_page=page) == "Texto Outro Fimda lista final"
@@ -0,0 +1,102 @@
+import time
+from pathlib import Path
+
+import pytest
+from requests_html import HTML
+
+from pyBrNews.config import work_queue
+from pyBrNews.news.g1 import G1News
+
+mongomock = pytest.importorskip("mongomock")
+
+FIXTURES = Path(__file__).resolve().parents[1] / "benchmarks" / "fixtures"
+ARTICLE_URL = "https://g1.globo.com/sp/sao-paulo/noticia/2024/05/01/saneamento.ghtml"
+
+
+@pytest.fixture(params=["mongo", "local"])
+def queue(request, monkeypatch):
+    if request.param == "mongo":
+        # mongomock does not accept the sort argument that recent pymongo versions pass for the bulk updates.
+        add_update = mongomock.collection.BulkOperationBuilder.add_update
+        monkeypatch.setattr(mongomock.collection.BulkOperationBuilder, "add_update",
+                            lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs))
+        monkeypatch.setattr(work_queue.pymongo, "MongoClient", mongomock.MongoClient)
+        return work_queue.PyBrNewsQueue(visibility_timeout=0, max_retries=2)
+
+    return work_queue.PyBrNewsLocalQueue(visibility_timeout=0, max_retries=2)
+
+
+def _lease(queue, **kwargs) -> list:
+    # Lets the visibility timeouts of 0 seconds expire.
+    time.sleep(0.01)
+    return queue.lease(platform="G1News", **kwargs)
+
+
+def test_enqueue_ignores_the_items_already_queued(queue):
+    assert queue.enqueue([ARTICLE_URL, {"link": "https://g1.globo.com/b.ghtml"}], platform="G1News") == 2
+    assert queue.enqueue([ARTICLE_URL], platform="G1News") == 0
+    assert queue.stats()["pending"] == 2
+
+
+def test_leased_items_are_hidden_until_the_visibility_timeout(queue):
+    queue.enqueue([ARTICLE_URL], platform="G1News")
+
+    job, = _lease(queue, visibility_timeout=60)
+    assert job["payload"] == ARTICLE_URL and job["attempts"] == 1
+    assert _lease(queue) == []
+    assert queue.extend(job=job)
+    assert queue.ack(job=job)
+    assert queue.stats() == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_failed_items_are_retried_until_the_maximum_attempts(queue):
+    queue.enqueue([ARTICLE_URL], platform="G1News")
+
+    job, = _lease(queue, visibility_timeout=60)
+    assert queue.fail(job=job, error="timeout")
+    assert queue.stats()["pending"] == 1
+
+    job, = _lease(queue, visibility_timeout=60)
+    assert job["attempts"] == 2
+    assert queue.fail(job=job, error="timeout")
+    assert _lease(queue) == []
+    assert queue.stats() == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
+
+
+def test_expired_lease_on_the_last_attempt_is_failed(queue):
+    queue.enqueue([ARTICLE_URL], platform="G1News")
+
+    for attempt in range(1, 3):
+        assert [job["attempts"] for job in _lease(queue)] == [attempt]
+
+    assert _lease(queue) == []
+    assert queue.stats() == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
+
+
+def test_expired_lease_cannot_be_acknowledged(queue):
+    queue.enqueue([ARTICLE_URL], platform="G1News")
+
+    expired, = _lease(queue)
+    _lease(queue)
+
+    assert not queue.ack(job=expired)
+
+
+def test_consume_queue_retries_the_failed_downloads(queue, monkeypatch):
+    crawler = G1News(use_database=False)
+    page = HTML(html=(FIXTURES / "g1_article.html").read_bytes(), url=ARTICLE_URL)
+    downloads = iter([None, page])
+    monkeypatch.setattr(crawler, "_fetch_article", lambda news_item, head_only=False: next(downloads))
+    queue.enqueue([ARTICLE_URL], platform="G1News")
+
+    assert [parsed_news["url"] for parsed_news in crawler.consume_queue(queue=queue, save_html=False)] == [ARTICLE_URL]
+    assert queue.stats() == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_consume_queue_fails_the_items_never_downloaded(queue, monkeypatch):
+    crawler = G1News(use_database=False)
+    monkeypatch.setattr(crawler, "_fetch_article", lambda news_item, head_only=False: None)
+    queue.enqueue([ARTICLE_URL], platform="G1News")
+
+    assert list(crawler.consume_queue(queue=queue, save_html=False)) == []
+    assert queue.stats() == {"pending": 0, "leased": 0, "done": 0, "failed": 1}